@@ -0,0 +1,39 @@
+"""© Cigav Productions LLC
+ASGI entry point for the JSON game API: ``uvicorn asgi:app`` (uvicorn is in requirements-prod.txt).
+
+Serves the /api/game/... endpoints and the JSON action posts that game pages make to
+/game/<game_id>; route everything else (pages, static files) to the WSGI server. One
+process holds thousands of idle connections on its event loop and runs game actions on a
+thread pool. Environment variables:
+
+    MATH_GAME_ASGI_THREADS     threads running game actions (default: CPU cores + 4, at most 32)
+    MATH_GAME_ASGI_IO_THREADS  threads for session store I/O (default 8)
+
+Set MATH_GAME_SESSION_BACKEND=sqlite (and the same MATH_GAME_SECRET_KEY) when this runs
+next to the WSGI server or with several worker processes, so they share sessions."""
+import os
+import sys
+
+from web_app import app as flask_app
+from web_support import AsyncGameAPI
+
+app = AsyncGameAPI(
+    flask_app,
+    workers=int(os.environ.get('MATH_GAME_ASGI_THREADS', '0')) or None,
+    io_workers=int(os.environ.get('MATH_GAME_ASGI_IO_THREADS', '8')),
+)
+
+
+def main() -> int:
+    """Serve with uvicorn, which must be installed (pip install -r requirements-prod.txt)."""
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is not installed (pip install -r requirements-prod.txt)", file=sys.stderr)
+        return 1
+    uvicorn.run(app, host=os.environ.get('MATH_GAME_HOST', '127.0.0.1'), port=int(os.environ.get('MATH_GAME_PORT', '8001')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
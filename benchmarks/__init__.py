@@ -0,0 +1,2 @@
+"""© Cigav Productions LLC
+Performance benchmarks for the game engines and web app."""
@@ -0,0 +1,46 @@
+"""© Cigav Productions LLC
+Batch round generation and grading against the per-round start_round/submit_answer loop.
+
+Run with ``python -m benchmarks.batch``; NumPy is used when installed."""
+import sys
+from typing import Any, Dict
+from math_games import batch
+from .engines import CASES, correct_answer, make_engine
+from .harness import measure, run_suite
+
+BATCH_SIZE = 500
+
+
+def bench_case(game_class, overrides: Dict[str, Any], iterations: int) -> Dict[str, Dict[str, float]]:
+    """Time one worksheet of BATCH_SIZE rounds played round by round and in one batch."""
+    engine = make_engine(game_class, overrides)
+    rounds = engine.generate_rounds(BATCH_SIZE)
+    answers = []
+    for data in rounds:
+        engine.load_round(data)
+        answers.append(correct_answer(engine))
+
+    def loop(_: Any) -> None:
+        for answer in answers:
+            engine.start_round()
+            engine.submit_answer(answer)
+
+    return {
+        'loop': measure(loop, iterations=iterations, warmup=2),
+        'generate_rounds': measure(lambda _: engine.generate_rounds(BATCH_SIZE), iterations=iterations, warmup=2),
+        'check_answers': measure(lambda _: engine.check_answers(rounds, answers), iterations=iterations, warmup=2),
+    }
+
+
+def collect(iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Run every engine case; iterations count whole batches."""
+    print(f"batches of {BATCH_SIZE} rounds, numpy {'enabled' if batch.np is not None else 'not installed'}\n")
+    return {name: bench_case(game_class, overrides, max(1, iterations // 100)) for name, game_class, overrides in CASES}
+
+
+def main(argv=None) -> int:
+    return run_suite('batch', collect, argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
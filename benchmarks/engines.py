@@ -0,0 +1,87 @@
+"""© Cigav Productions LLC
+Benchmarks for engine round generation, answer checking and per-request rebuilds.
+
+Run with ``python -m benchmarks.engines`` (``--save-baseline`` to refresh the stored baseline)."""
+import sys
+from typing import Any, Dict, List, Tuple, Type
+from math_games import AdditionGameEngine, ChangeGameEngine, MoneyGameEngine, RoundingGameEngine
+from math_games.base_game import BaseGameEngine
+from .harness import measure, run_suite
+
+SEED = 1234
+ENDLESS = 10 ** 9
+
+# (case name, engine class, config overrides); the worst cases are the largest numbers,
+# limited-bill money modes (payment solver) and taxed change
+CASES: List[Tuple[str, Type[BaseGameEngine], Dict[str, Any]]] = [
+    ('rounding', RoundingGameEngine, {}),
+    ('rounding[max_number=1e9]', RoundingGameEngine, {'max_number': 10 ** 9, 'factor': 1000}),
+    ('addition', AdditionGameEngine, {}),
+    ('addition[max_number=1e9]', AdditionGameEngine, {'max_number': 10 ** 9}),
+    ('money[easy]', MoneyGameEngine, {'bill_limit_mode': 'easy'}),
+    ('money[intermediate]', MoneyGameEngine, {'bill_limit_mode': 'intermediate'}),
+    ('money[hard]', MoneyGameEngine, {'bill_limit_mode': 'hard'}),
+    ('change[show_tax]', ChangeGameEngine, {'show_tax': True}),
+    ('change[no_tax]', ChangeGameEngine, {'show_tax': False}),
+]
+
+
+def _counts_answer(counts: Dict[int, int]) -> str:
+    return ",".join(f"{den}:{cnt}" for den, cnt in counts.items())
+
+
+def correct_answer(engine: BaseGameEngine) -> str:
+    """Correct answer string for the engine's current round."""
+    if isinstance(engine, RoundingGameEngine):
+        state = engine.get_game_state()
+        lower, upper = state.lower_multiple, state.upper_multiple
+        return 'down' if state.current_number - lower < upper - state.current_number else 'up'
+    if isinstance(engine, AdditionGameEngine):
+        return str(engine.get_game_state().correct_answer)
+    if isinstance(engine, MoneyGameEngine):
+        return _counts_answer(engine.get_best_combo())
+    if isinstance(engine, ChangeGameEngine):
+        return _counts_answer(engine._best_change_counts)
+    raise TypeError(f"no answer helper for {type(engine).__name__}")
+
+
+def make_engine(game_class: Type[BaseGameEngine], overrides: Dict[str, Any]) -> BaseGameEngine:
+    """Seeded engine that never runs out of rounds."""
+    config = dict(game_class.get_default_config(), rounds=ENDLESS, **overrides)
+    return game_class(seed=SEED, **config)
+
+
+def bench_case(game_class: Type[BaseGameEngine], overrides: Dict[str, Any], iterations: int) -> Dict[str, Dict[str, float]]:
+    """Measure start_round, submit_answer (correct answers) and a state rebuild for one config."""
+    engine = make_engine(game_class, overrides)
+    engine.start_round()
+
+    def prepare_answer() -> str:
+        engine.start_round()
+        return correct_answer(engine)
+
+    def prepare_state() -> Dict[str, Any]:
+        return engine.serialize_state()
+
+    def rebuild(state: Dict[str, Any]) -> None:
+        fresh = game_class(**state['config'])
+        fresh.deserialize_state(state)
+
+    return {
+        'start_round': measure(lambda _: engine.start_round(), iterations=iterations),
+        'submit_answer': measure(engine.submit_answer, prepare_answer, iterations=iterations),
+        'rebuild': measure(rebuild, prepare_state, iterations=iterations),
+    }
+
+
+def collect(iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Run every engine case."""
+    return {name: bench_case(game_class, overrides, iterations) for name, game_class, overrides in CASES}
+
+
+def main(argv=None) -> int:
+    return run_suite('engines', collect, argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
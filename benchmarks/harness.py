@@ -0,0 +1,151 @@
+"""© Cigav Productions LLC
+Timing, reporting and baseline comparison shared by the benchmark suites."""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _calibration_op(_: Any) -> None:
+    sorted(str(i) for i in range(200))
+
+
+def _timed_loop(op: Callable[[Any], Any], prepare: Optional[Callable[[], Any]], iterations: int, warmup: int) -> List[int]:
+    clock = time.perf_counter_ns
+    timings: List[int] = []
+    for i in range(warmup + iterations):
+        arg = prepare() if prepare is not None else None
+        start = clock()
+        op(arg)
+        elapsed = clock() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def measure(
+    op: Callable[[Any], Any],
+    prepare: Optional[Callable[[], Any]] = None,
+    iterations: int = 2000,
+    warmup: int = 200,
+    repeat: int = 5,
+) -> Dict[str, float]:
+    """Time ``op(prepare())`` repeatedly; only the op itself is timed.
+
+    Each of the ``repeat`` runs is preceded by a short fixed calibration workload, and
+    ``relative`` (op throughput over calibration throughput) is what baselines are
+    compared on, so a slower or busier machine does not read as a regression.
+    The run with the best relative score is reported.
+    """
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        calibration = _timed_loop(_calibration_op, None, 200, 20)
+        timings = _timed_loop(op, prepare, iterations, warmup)
+        ops_per_sec = iterations * 1e9 / (sum(timings) or 1)
+        relative = ops_per_sec / (len(calibration) * 1e9 / (sum(calibration) or 1))
+        if best is None or relative > best['relative']:
+            best = {'timings': timings, 'ops_per_sec': ops_per_sec, 'relative': relative}
+    timings = sorted(best['timings'])
+    return {
+        'iterations': iterations,
+        'ops_per_sec': round(best['ops_per_sec'], 1),
+        'relative': round(best['relative'], 4),
+        'p50_us': round(percentile(timings, 50) / 1000, 3),
+        'p99_us': round(percentile(timings, 99) / 1000, 3),
+    }
+
+
+def build_report(suite: str, results: Dict[str, Dict[str, Dict[str, float]]]) -> Dict[str, Any]:
+    """Wrap suite results with environment details."""
+    return {
+        'suite': suite,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print results as a table."""
+    print(f"{'case':<34}{'op':<16}{'ops/sec':>14}{'p50 us':>12}{'p99 us':>12}")
+    for case, ops in report['results'].items():
+        for op, stats in ops.items():
+            print(f"{case:<34}{op:<16}{stats['ops_per_sec']:>14,.0f}{stats['p50_us']:>12.2f}{stats['p99_us']:>12.2f}")
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """Write a report as JSON, creating the directory if needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a line for every op whose calibrated throughput fell more than ``tolerance`` below the baseline."""
+    regressions = []
+    base_results = baseline.get('results', {})
+    for case, ops in report['results'].items():
+        for op, stats in ops.items():
+            base = base_results.get(case, {}).get(op)
+            if not base:
+                continue
+            change = stats['relative'] / base['relative'] - 1
+            if change < -tolerance:
+                regressions.append(
+                    f"{case} {op}: {stats['ops_per_sec']:,.0f} ops/sec, "
+                    f"{change:+.0%} against baseline after calibration"
+                )
+    return regressions
+
+
+def run_suite(suite: str, collect: Callable[[int], Dict[str, Dict[str, Dict[str, float]]]], argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: run a suite, save its report and check it against the baseline."""
+    parser = argparse.ArgumentParser(description=f"Run the {suite} benchmarks.")
+    parser.add_argument('--iterations', type=int, default=2000, help='timed iterations per op')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT.replace('latest', suite), help='where to write the JSON report')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.30, help='allowed fractional drop in ops/sec')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args(argv)
+
+    report = build_report(suite, collect(args.iterations))
+    print_report(report)
+    write_report(report, args.output)
+    print(f"\nreport written to {args.output}")
+
+    baselines: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            baselines = json.load(fh)
+    if args.save_baseline:
+        baselines[suite] = report
+        write_report(baselines, args.baseline)
+        print(f"baseline updated in {args.baseline}")
+        return 0
+    if suite not in baselines:
+        print(f"no {suite} baseline in {args.baseline}; run with --save-baseline to create one")
+        return 0
+    regressions = compare_to_baseline(report, baselines[suite], args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION ({len(regressions)} ops more than {args.tolerance:.0%} below baseline):", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print(f"no regressions against baseline (tolerance {args.tolerance:.0%})")
+    return 0
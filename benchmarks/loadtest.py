@@ -0,0 +1,241 @@
+"""© Cigav Productions LLC
+End-to-end load test: simulated players drive every registered game through the web app.
+
+Run with ``python -m benchmarks.loadtest --players 2000 --concurrency 200``; pass
+``--http`` to go through a local threaded WSGI server instead of Flask's test client, or
+``--url http://host:port`` to load a running server (e.g. the gunicorn deployment)."""
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from math_games import GameRegistry
+from game_handlers import HandlerRegistry
+from .harness import DEFAULT_OUTPUT, percentile, write_report
+
+# (status, response body, cookie bytes the client holds after the response)
+Response = Tuple[int, bytes, int]
+
+
+class TestClientTransport:
+    """One player's connection through Flask's in-process test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Response:
+        resp = self.client.open(path, method=method, json=payload)
+        cookie = self.client.get_cookie('session')
+        cookie_bytes = len(cookie.key) + len(cookie.value) + 1 if cookie is not None else 0
+        return resp.status_code, resp.get_data(), cookie_bytes
+
+
+class HTTPTransport:
+    """One player's connection over real HTTP with its own cookie jar."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Response:
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with self.opener.open(req) as resp:
+                status, body = resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            status, body = exc.code, exc.read()
+        cookie_bytes = sum(len(c.name) + len(c.value or '') + 1 for c in self.cookies)
+        return status, body, cookie_bytes
+
+
+def _greedy(amount: int, denoms: Tuple[int, ...]) -> str:
+    parts = []
+    for den in denoms:
+        parts.append(f"{den}:{amount // den}")
+        amount %= den
+    return ",".join(parts)
+
+
+# game_id -> answer built from the game's JSON state; unknown games answer "0"
+ANSWERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    'rounding': lambda d: 'up' if d['number'] % d['factor'] >= d['factor'] / 2 else 'down',
+    'addition': lambda d: str(d['number1'] + d['number2']),
+    'money': lambda d: _greedy(math.ceil(d['item']['total_due']), (20, 10, 5, 1)),
+    'change': lambda d: _greedy(round(d['change_due'] * 100), (1000, 500, 100, 25, 10, 5, 1)),
+}
+
+
+class Stats:
+    """Thread-safe per-(game, action) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[Tuple[str, str], List[Tuple[float, int, int, bool]]] = {}
+
+    def add(self, game_id: str, action: str, seconds: float, response_bytes: int, cookie_bytes: int, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault((game_id, action), []).append((seconds, response_bytes, cookie_bytes, ok))
+
+    def summary(self, wall_seconds: float) -> Dict[str, Dict[str, Any]]:
+        """Per-action throughput, latency percentiles, byte sizes and error rate."""
+        results = {}
+        for (game_id, action), samples in sorted(self.samples.items()):
+            latencies = sorted(s[0] * 1000 for s in samples)
+            errors = sum(1 for s in samples if not s[3])
+            results[f"{game_id}/{action}"] = {
+                'requests': len(samples),
+                'req_per_sec': round(len(samples) / wall_seconds, 1),
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'avg_response_bytes': round(sum(s[1] for s in samples) / len(samples)),
+                'max_cookie_bytes': max(s[2] for s in samples),
+                'error_rate': round(errors / len(samples), 4),
+            }
+        return results
+
+
+class Player:
+    """A simulated student playing one session of every game."""
+
+    def __init__(self, transport, stats: Stats, answers_per_game: int):
+        self.transport = transport
+        self.stats = stats
+        self.answers_per_game = answers_per_game
+
+    def call(self, game_id: str, action: str, method: str, path: str, payload=None) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            status, body, cookie_bytes = self.transport.request(method, path, payload)
+        except Exception:
+            self.stats.add(game_id, action, time.perf_counter() - start, 0, 0, False)
+            return None
+        elapsed = time.perf_counter() - start
+        data = None
+        ok = status < 400
+        if ok and payload is not None:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                ok = False
+            else:
+                ok = 'error' not in data
+        self.stats.add(game_id, action, elapsed, len(body), cookie_bytes, ok)
+        return data
+
+    def play(self, game_id: str) -> None:
+        path = f"/game/{game_id}"
+        config = dict(GameRegistry.get_game(game_id).get_default_config(), rounds=self.answers_per_game + 2)
+        self.call(game_id, 'page', 'GET', path + '?fresh=1')
+        data = self.call(game_id, 'start_game', 'POST', path, dict(config, action='start_game'))
+        answer = ANSWERS.get(game_id, lambda d: '0')
+        for _ in range(self.answers_per_game):
+            if not data or not data.get('game_active'):
+                break
+            try:
+                text = answer(data)
+            except (KeyError, TypeError, ZeroDivisionError):
+                text = '0'
+            data = self.call(game_id, 'answer', 'POST', path, {'action': 'answer', 'answer': text})
+        if HandlerRegistry.get_action(game_id, 'skip_round') and data and data.get('game_active'):
+            self.call(game_id, 'skip_round', 'POST', path, {'action': 'skip_round'})
+        self.call(game_id, 'restart', 'POST', path, {'action': 'restart'})
+        if HandlerRegistry.get_action(game_id, 'reset_to_config'):
+            self.call(game_id, 'reset_to_config', 'POST', path, {'action': 'reset_to_config'})
+
+    def run(self) -> None:
+        for game_id in GameRegistry.list_games():
+            self.play(game_id)
+
+
+def start_server(app) -> Tuple[str, Callable[[], None]]:
+    """Serve the app on a free local port from a background thread; returns (base URL, shutdown)."""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+def run_load(app, players: int, concurrency: int, answers_per_game: int, http: bool, url: Optional[str] = None) -> Dict[str, Any]:
+    """Run the simulated players and return the report."""
+    stats = Stats()
+    shutdown = None
+    if url:
+        base_url = url.rstrip('/')
+        make_transport = lambda: HTTPTransport(base_url)
+    elif http:
+        base_url, shutdown = start_server(app)
+        make_transport = lambda: HTTPTransport(base_url)
+    else:
+        make_transport = lambda: TestClientTransport(app)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(Player(make_transport(), stats, answers_per_game).run) for _ in range(players)]
+            for future in futures:
+                future.result()
+    finally:
+        if shutdown is not None:
+            shutdown()
+    wall = time.perf_counter() - start
+    total = sum(len(s) for s in stats.samples.values())
+    errors = sum(1 for s in stats.samples.values() for sample in s if not sample[3])
+    return {
+        'suite': 'loadtest',
+        'transport': url or ('http' if http else 'test_client'),
+        'players': players,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'total_requests': total,
+        'req_per_sec': round(total / wall, 1),
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'results': stats.summary(wall),
+    }
+
+
+def print_load_report(report: Dict[str, Any]) -> None:
+    """Print the per-action table and totals."""
+    print(f"{'game/action':<26}{'reqs':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'resp B':>9}{'cookie B':>10}{'errors':>8}")
+    for key, row in report['results'].items():
+        print(f"{key:<26}{row['requests']:>8}{row['req_per_sec']:>10,.0f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row['avg_response_bytes']:>9}{row['max_cookie_bytes']:>10}{row['error_rate']:>8.2%}")
+    print(f"\n{report['total_requests']} requests from {report['players']} players "
+          f"({report['concurrency']} concurrent, {report['transport']}) in {report['wall_seconds']:.1f}s: "
+          f"{report['req_per_sec']:,.0f} req/s, {report['error_rate']:.2%} errors")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the web app with simulated players.")
+    parser.add_argument('--players', type=int, default=1000, help='number of simulated players')
+    parser.add_argument('--concurrency', type=int, default=100, help='players running at the same time')
+    parser.add_argument('--answers', type=int, default=3, help='answers submitted per game')
+    parser.add_argument('--http', action='store_true', help='use a local WSGI server instead of the test client')
+    parser.add_argument('--url', help='base URL of a running server to load instead of this process')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT.replace('latest', 'loadtest'), help='where to write the JSON report')
+    args = parser.parse_args(argv)
+
+    app = None
+    if not args.url:
+        from web_app import app
+    report = run_load(app, args.players, args.concurrency, args.answers, args.http, args.url)
+    print_load_report(report)
+    write_report(report, args.output)
+    print(f"report written to {args.output}")
+    return 1 if report['error_rate'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""© Cigav Productions LLC
+Round-trip checks and size/speed comparison for the compact game state codec.
+
+Run with ``python -m benchmarks.state_codec``; every run first fuzzes encode/decode over
+seeded random states and exits non-zero on the first mismatch."""
+import itertools
+import json
+import pickle
+import random
+import sys
+from typing import Any, Dict, List, Tuple
+from math_games import GameRegistry, StateCodec
+from .engines import SEED, correct_answer, make_engine
+from .harness import measure, run_suite
+
+FUZZ_STATES = 300
+
+
+def _json_ready(state: Dict[str, Any]) -> Dict[str, Any]:
+    """What a plain json.dumps session would store: denomination dict keys become strings."""
+    return {k: {str(d): c for d, c in v.items()} if isinstance(v, dict) and k != 'config' else v
+            for k, v in state.items()}
+
+
+def sample_states(count: int, seed: int = SEED) -> List[Tuple[str, Dict[str, Any]]]:
+    """Engine states from every registered game at random points of play, with random keys dropped or added."""
+    rng = random.Random(seed)
+    samples = []
+    for game_id in GameRegistry.list_games():
+        game_class = GameRegistry.get_game(game_id)
+        engine = make_engine(game_class, {})
+        for _ in range(count):
+            engine.start_round()
+            if rng.random() < 0.5:
+                engine.submit_answer(correct_answer(engine) if rng.random() < 0.7 else '0')
+            state = engine.serialize_state()
+            if rng.random() < 0.2:
+                del state[rng.choice(sorted(state))]
+            if rng.random() < 0.1:
+                state['extra_flag'] = rng.randint(0, 9)
+            samples.append((game_id, state))
+    return samples
+
+
+def _cycle(items: List[Any]):
+    return itertools.cycle(items).__next__
+
+
+def check_round_trips(samples: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Raise AssertionError unless every sample decodes back to an equal state."""
+    for game_id, state in samples:
+        decoded_id, decoded = StateCodec.decode(StateCodec.encode(game_id, state))
+        if decoded_id != game_id or decoded != state:
+            raise AssertionError(f"{game_id} state did not round-trip:\n  {state!r}\n  {decoded!r}")
+
+
+def collect(iterations: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Encode/decode speed and average size per game for the codec, JSON dicts and pickle."""
+    samples = sample_states(FUZZ_STATES)
+    check_round_trips(samples)
+    print(f"{len(samples)} states round-tripped\n")
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for game_id in GameRegistry.list_games():
+        states = [state for gid, state in samples if gid == game_id]
+        blobs = [StateCodec.encode(game_id, s) for s in states]
+        json_blobs = [json.dumps(_json_ready(s)).encode() for s in states]
+        pickles = [pickle.dumps(s, protocol=pickle.HIGHEST_PROTOCOL) for s in states]
+        ops = {
+            'codec_encode': measure(lambda s: StateCodec.encode(game_id, s), _cycle(states), iterations=iterations),
+            'codec_decode': measure(StateCodec.decode, _cycle(blobs), iterations=iterations),
+            'json_encode': measure(lambda s: json.dumps(_json_ready(s)), _cycle(states), iterations=iterations),
+            'json_decode': measure(json.loads, _cycle(json_blobs), iterations=iterations),
+            'pickle_encode': measure(pickle.dumps, _cycle(states), iterations=iterations),
+            'pickle_decode': measure(pickle.loads, _cycle(pickles), iterations=iterations),
+        }
+        sizes = []
+        for name, blob_list in (('codec', blobs), ('json', json_blobs), ('pickle', pickles)):
+            size = sum(map(len, blob_list)) / len(blob_list)
+            ops[f'{name}_encode']['avg_bytes'] = round(size, 1)
+            sizes.append(f"{name} {size:.0f} B")
+        print(f"{game_id:<12}average state size: {', '.join(sizes)}")
+        results[game_id] = ops
+    return results
+
+
+def main(argv=None) -> int:
+    return run_suite('state_codec', collect, argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
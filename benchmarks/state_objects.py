@@ -0,0 +1,55 @@
+"""© Cigav Productions LLC
+Micro-benchmark for game state objects: construction speed and bytes allocated per state.
+
+Run with ``python -m benchmarks.state_objects``."""
+import sys
+import tracemalloc
+from typing import Any, Dict
+from .engines import CASES, correct_answer, make_engine
+from .harness import measure, run_suite
+
+ALLOC_SAMPLES = 200
+
+
+def bytes_per_call(op, samples: int = ALLOC_SAMPLES) -> float:
+    """Average bytes still held by the results of ``op()``, keeping every result alive."""
+    keep = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(samples):
+            keep.append(op())
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / samples
+
+
+def collect(iterations: int) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """get_game_state and a full answer cycle for every engine case."""
+    results = {}
+    for name, game_class, overrides in CASES:
+        engine = make_engine(game_class, overrides)
+        engine.start_round()
+        state = measure(lambda _: engine.get_game_state(), iterations=iterations)
+        state['bytes_per_state'] = round(bytes_per_call(engine.get_game_state), 1)
+
+        def prepare_answer() -> str:
+            engine.start_round()
+            return correct_answer(engine)
+
+        results[name] = {
+            'get_game_state': state,
+            'round_cycle': measure(engine.submit_answer, prepare_answer, iterations=iterations),
+        }
+        print(f"{name:<34}{state['bytes_per_state']:>8.0f} bytes per state")
+    print()
+    return results
+
+
+def main(argv=None) -> int:
+    return run_suite('state_objects', collect, argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@ from .addition_handler import AdditionGameHandler
 from .money_handler import MoneyGameHandler
 from .change_handler import ChangeGameHandler
 from .handler_registry import HandlerRegistry
+from .views import AdditionView, GameView, PurchaseHistoryRow, PurchaseView, RoundingView
 
 # Register handlers
 HandlerRegistry.register('rounding', RoundingGameHandler)
@@ -20,6 +21,11 @@ __all__ = [
     'AdditionGameHandler',
     'MoneyGameHandler',
     'ChangeGameHandler',
+    'GameView',
+    'RoundingView',
+    'AdditionView',
+    'PurchaseView',
+    'PurchaseHistoryRow',
 ]
 
 
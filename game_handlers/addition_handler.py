@@ -1,24 +1,33 @@
 """© Cigav Productions LLC
 Handler for addition game-specific web logic."""
-from typing import Dict, Any
+from typing import Dict, Any, List
 from flask import session
 from .base_handler import BaseGameHandler
+from .history import record_type
+from .views import AdditionView
+
+AdditionHistoryRecord = record_type(
+    "AdditionHistoryRecord", ("number1", "number2", "user_answer", "correct_answer", "is_correct"), module=__name__
+)
 
 
 class AdditionGameHandler(BaseGameHandler):
     """Handler for addition game web logic."""
     
-    def create_history_entry(self, answer: str, state, is_correct: bool) -> Dict[str, Any]:
+    RECENT_HISTORY = 5
+    VIEW = AdditionView
+    
+    def create_history_entry(self, answer: str, state, is_correct: bool) -> AdditionHistoryRecord:
         """Create a history entry for addition game."""
-        return {
-            'number1': session.get('last_number1'),
-            'number2': session.get('last_number2'),
-            'user_answer': answer,
-            'correct_answer': getattr(state, 'correct_answer', None) or (
+        return AdditionHistoryRecord(
+            session.get('last_number1'),
+            session.get('last_number2'),
+            answer,
+            getattr(state, 'correct_answer', None) or (
                 session.get('last_number1', 0) + session.get('last_number2', 0)
             ),
-            'is_correct': is_correct
-        }
+            is_correct,
+        )
     
     def save_state_to_session(self, game_state: Dict[str, Any], new_state) -> None:
         """Save addition game state to session."""
@@ -59,6 +68,18 @@ class AdditionGameHandler(BaseGameHandler):
         """Setup UI display after processing answer."""
         # Addition game template handles display directly
         pass
-
-
-
+    
+    def build_json_state(self, messages: List[str]) -> Dict[str, Any]:
+        """JSON payload with the current pair of numbers."""
+        resp = super().build_json_state(messages)
+        gs = session['games'][self.game_id]
+        resp["number1"] = gs.get('number1')
+        resp["number2"] = gs.get('number2')
+        return resp
+    
+    def view_fields(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> Dict[str, Any]:
+        """View fields with the current pair of numbers."""
+        fields = super().view_fields(game_state, messages, debug_counts)
+        fields['number1'] = game_state.get('number1', '?')
+        fields['number2'] = game_state.get('number2', '?')
+        return fields
@@ -1,46 +1,280 @@
 """© Cigav Productions LLC
 Base handler for game-specific web logic."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from flask import session
+from math_games import GameRegistry
+from web_support.metrics import phase
+from .history import append_history, entry_json, reset_history
+from .views import GameView
+
+
+def parse_bool(val: Any, default: bool) -> bool:
+    """Parse a JSON/form boolean, accepting common string spellings."""
+    if isinstance(val, bool):
+        return val
+    if isinstance(val, str):
+        return val.lower() in ('1', 'true', 'yes', 'on')
+    return default
+
+
+def parse_int(val: Any, default: int) -> int:
+    """Parse an integer, falling back to the default."""
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_float(val: Any, default: float) -> float:
+    """Parse a float, falling back to the default."""
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return default
 
 
 class BaseGameHandler(ABC):
     """Base class for game-specific web handlers."""
-    
-    def __init__(self, game_id: str, engine):
-        """Initialize the handler with a game ID and engine."""
+
+    # JSON action name -> handler method; HandlerRegistry builds its dispatch table from this
+    ACTIONS: Dict[str, str] = {
+        'start_game': 'action_start_game',
+        'restart': 'action_restart',
+        'reset_to_config': 'action_reset_to_config',
+        'answer': 'action_answer',
+    }
+    # Number of most recent history entries returned in JSON responses (None for all)
+    RECENT_HISTORY: Optional[int] = None
+    # History entries kept in the session; older ones move to the server-side archive
+    HISTORY_LIMIT: int = 50
+    # Bulky response fields left out when slim_responses is set (e.g. for the /api endpoints)
+    HEAVY_FIELDS: Tuple[str, ...] = ()
+    # View model class the game page renders from, and the order of its game-over history list
+    VIEW = GameView
+    ALL_HISTORY_NEWEST_FIRST = True
+
+    def __init__(self, game_id: str, engine, engine_factory: Optional[Callable] = None):
+        """Initialize the handler with a game ID, engine and optional engine factory."""
         self.game_id = game_id
         self.engine = engine
-    
+        self.engine_factory = engine_factory
+        self.slim_responses = False
+
     @abstractmethod
-    def create_history_entry(self, answer: str, state, is_correct: bool) -> Dict[str, Any]:
-        """Create a history entry for this game type."""
+    def create_history_entry(self, answer: str, state, is_correct: bool) -> Any:
+        """Create a history entry (a compact record from history.record_type, or a dict) for this game type."""
         pass
-    
+
     @abstractmethod
     def save_state_to_session(self, game_state: Dict[str, Any], new_state) -> None:
         """Save game-specific state to the session."""
         pass
-    
+
     @abstractmethod
     def get_initial_state(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Get the initial state structure for this game type."""
         pass
-    
+
+    def save_round_state(self, game_state: Dict[str, Any], new_state) -> None:
+        """Save a newly started round, along with the engine's RNG seed for the next one."""
+        self.save_state_to_session(game_state, new_state)
+        game_state['rng_seed'] = self.engine.rng_seed
+
     def save_pre_answer_state(self, game_state: Dict[str, Any]) -> None:
         """Save state needed before processing answer (for history)."""
         pass
-    
+
     def setup_ui_display(self, ui, game_state: Dict[str, Any]) -> None:
         """Setup UI display for GET requests."""
         pass
-    
+
     def setup_post_answer_ui(self, ui, new_state) -> None:
         """Setup UI display after processing answer."""
         pass
-    
+
     def should_display_round(self) -> bool:
         """Return True if this game should display round info via UI."""
         return False
 
+    def save_submission(self, data: Dict[str, Any]) -> None:
+        """Record the raw answer payload before it is processed."""
+        pass
+
+    def save_answer_result(self, is_correct: bool) -> None:
+        """Record engine results right after an answer is checked."""
+        pass
+
+    @property
+    def default_config(self) -> Dict[str, Any]:
+        """Default configuration of the handled game."""
+        return GameRegistry.get_game(self.game_id).get_default_config()
+
+    def parse_config(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a game config from a JSON payload, typed after the default config."""
+        config = {}
+        for key, default in self.default_config.items():
+            val = data.get(key)
+            # Handle bool before int (bool is subclass of int)
+            if isinstance(default, bool):
+                config[key] = parse_bool(val, default)
+            elif isinstance(default, int):
+                config[key] = parse_int(val, default)
+            elif isinstance(default, float):
+                config[key] = parse_float(val, default)
+            else:
+                config[key] = default if val is None else val
+        return config
+
+    def rebuild_engine(self, game_state: Dict[str, Any]):
+        """Replace the handler's engine with one restored from the given state."""
+        if self.engine_factory is not None:
+            self.engine = self.engine_factory(self.game_id, game_state)
+        else:
+            engine = GameRegistry.get_game(self.game_id)(**game_state.get('config', {}))
+            engine.deserialize_state(game_state)
+            self.engine = engine
+        return self.engine
+
+    def recent_history(self) -> List[Any]:
+        """The last RECENT_HISTORY history entries (all when None), newest first."""
+        hist = session.get('history', [])
+        recent = hist[-self.RECENT_HISTORY:] if self.RECENT_HISTORY is not None else hist
+        return recent[::-1]
+
+    def history_row(self, entry: Any) -> Any:
+        """Display form of a history entry for the page's history lists."""
+        return entry
+
+    def view_fields(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> Dict[str, Any]:
+        """Field values of the game page's view model; subclasses add their game's fields."""
+        config = game_state.get('config', {})
+        defaults = self.default_config
+        over = game_state.get('over', False)
+        all_history = []
+        if over:
+            hist = session.get('history', [])
+            all_history = [self.history_row(entry) for entry in (hist[::-1] if self.ALL_HISTORY_NEWEST_FIRST else hist)]
+        return {
+            'game_id': self.game_id,
+            'active': game_state.get('active', False),
+            'over': over,
+            'score': game_state.get('score', 0),
+            'current_round': game_state.get('current_round', 0),
+            'total_rounds': config.get('rounds', defaults.get('rounds', game_state.get('current_round', 0))),
+            'settings': {**defaults, **config},
+            'messages': messages,
+            'recent_history': [self.history_row(entry) for entry in self.recent_history()],
+            'all_history': all_history,
+        }
+
+    def build_view(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> GameView:
+        """Precompute everything the game page template shows; ``debug_counts`` turns on the count debug panel."""
+        return self.VIEW(**self.view_fields(game_state, messages, debug_counts))
+
+    def build_json_state(self, messages: List[str]) -> Dict[str, Any]:
+        """Build the JSON payload describing the current game for AJAX clients."""
+        gs = session['games'][self.game_id]
+        return {
+            "game_active": gs.get('active', False),
+            "game_over": gs.get('over', False),
+            "score": gs.get('score', 0),
+            "current_round": gs.get('current_round', 0),
+            "total_rounds": gs.get('config', {}).get('rounds', gs.get('current_round', 0)),
+            "messages": messages,
+            "history": [entry_json(entry) for entry in self.recent_history()],
+        }
+
+    def json_response(self, messages: List[str], extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSON payload for the current game with optional overrides."""
+        resp = self.build_json_state(messages)
+        if extra:
+            resp.update(extra)
+        if self.slim_responses:
+            for field in self.HEAVY_FIELDS:
+                resp.pop(field, None)
+        return resp
+
+    def _begin_game(self, ui, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Start a fresh active game with the given config and play its first round."""
+        reset_history(self.game_id)
+        initial_state = self.get_initial_state(config)
+        initial_state['config'] = config
+        initial_state['active'] = True
+        initial_state['over'] = False
+        session['games'][self.game_id] = initial_state
+        self.rebuild_engine(initial_state)
+        with phase('engine'):
+            state = self.engine.start_round()
+        if state:
+            self.save_round_state(initial_state, state)
+            if self.should_display_round():
+                ui.display_round(state)
+        session['games'][self.game_id] = initial_state
+        session.modified = True
+        msgs = ui.get_messages(); ui.clear_messages()
+        return self.json_response(msgs, {"started": True, "config": config})
+
+    def action_start_game(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Start a new game using the config in the payload."""
+        return self._begin_game(ui, self.parse_config(data))
+
+    def action_restart(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Restart the game with its current config."""
+        return self._begin_game(ui, game_state.get('config', self.default_config))
+
+    def action_reset_to_config(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Drop the current game and return to the config screen."""
+        cfg = game_state.get('config', self.default_config)
+        fresh_state = self.get_initial_state(cfg)
+        fresh_state['active'] = False
+        fresh_state['over'] = False
+        reset_history(self.game_id)
+        session['games'][self.game_id] = fresh_state
+        session.modified = True
+        ui.clear_messages()
+        return self.json_response([], {"config": cfg, "game_active": False, "game_over": False})
+
+    def action_skip_round(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Skip the current round (games that implement handle_skip_round)."""
+        if not game_state.get('active') or not hasattr(self, 'handle_skip_round'):
+            return None
+        self.handle_skip_round(game_state)
+        session.modified = True
+        ui.clear_messages()
+        return self.json_response(["Item skipped. Moving to next round."])
+
+    def action_answer(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Check an answer, record history and advance the game."""
+        if not game_state.get('active'):
+            return None
+        self.save_submission(data)
+        answer = str(data.get('answer', '')).strip()
+        session['last_answer'] = answer
+        self.save_pre_answer_state(game_state)
+        with phase('engine'):
+            is_correct, state = self.engine.submit_answer(answer)
+        self.save_answer_result(is_correct)
+        ui.display_result(is_correct)
+        with phase('history'):
+            append_history(self.create_history_entry(answer, state, is_correct), self.HISTORY_LIMIT)
+        game_state['score'] = self.engine.score
+        game_state['current_round'] = self.engine.current_round
+        self.advance_after_answer(game_state, ui, state, is_correct)
+        session['games'][self.game_id] = game_state
+        msgs = ui.get_messages(); ui.clear_messages()
+        return self.json_response(msgs)
+
+    def advance_after_answer(self, game_state: Dict[str, Any], ui, state, is_correct: bool) -> None:
+        """Start the next round after an answer, or end the game."""
+        with phase('engine'):
+            new_state = self.engine.start_round()
+        if new_state is None:
+            ui.display_game_over(state)
+            game_state['active'] = False
+            game_state['over'] = True
+        else:
+            self.save_round_state(game_state, new_state)
+            self.setup_post_answer_ui(ui, new_state)
+            game_state['active'] = True
+            game_state['over'] = False
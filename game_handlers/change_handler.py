@@ -1,33 +1,58 @@
 """© Cigav Productions LLC
 Handler for the change game web logic."""
-from typing import Dict, Any
-from flask import session
+from typing import Dict, Any, List
+from flask import session, url_for
+from web_support.assets import item_image_url
+from web_support.metrics import phase
+from math_games import ChangeGameEngine
 from .base_handler import BaseGameHandler
+from .history import append_history, counts_tuple, entry_json, record_type
+from .views import PurchaseHistoryRow, PurchaseView, counts_text
+
+PAY_DENOMS = ChangeGameEngine.PAY_DENOMS
+CHANGE_DENOMS = ChangeGameEngine.CHANGE_DENOMS
+CHANGE_LABELS = ("$10", "$5", "$1", "25¢", "10¢", "5¢", "1¢")
+DEFAULT_AVAILABLE_CHANGE = {1000: 5, 500: 5, 100: 20, 25: 20, 10: 20, 5: 20, 1: 40}
+# Counts are stored as tuples in denomination order; pay_breakdown/user_counts/best_counts are dict views
+ChangeHistoryRecord = record_type(
+    "ChangeHistoryRecord",
+    ("item_name", "item_price", "tax_amount", "total_due", "pay_total", "pay_bills", "user_coins",
+     "best_coins", "user_total", "change_due", "is_correct", "show_tax", "skipped"),
+    counts={
+        "pay_breakdown": ("pay_bills", PAY_DENOMS),
+        "user_counts": ("user_coins", CHANGE_DENOMS),
+        "best_counts": ("best_coins", CHANGE_DENOMS),
+    },
+    module=__name__,
+)
 
 
 class ChangeGameHandler(BaseGameHandler):
     """Handles state persistence and history for Change Game."""
 
-    def create_history_entry(self, answer: str, state, is_correct: bool) -> Dict[str, Any]:
+    ACTIONS = {**BaseGameHandler.ACTIONS, 'skip_round': 'action_skip_round'}
+    RECENT_HISTORY = 6
+    VIEW = PurchaseView
+    ALL_HISTORY_NEWEST_FIRST = False
+
+    def create_history_entry(self, answer: str, state, is_correct: bool) -> ChangeHistoryRecord:
         last_round = session.get("last_change_round", {})
         last_result = getattr(self.engine, "get_last_result", lambda: {})() or {}
-        return {
-            "item_name": last_round.get("item_name", ""),
-            "item_price": last_round.get("item_price", 0),
-            "tax_amount": last_round.get("tax_amount", 0),
-            "total_due": last_round.get("total_due", 0),
-            "pay_total": last_round.get("pay_total", 0),
-            "pay_breakdown": last_round.get("pay_breakdown", {}),
-            "user_counts": last_result.get("counts", {}),
-            "best_counts": last_result.get("best_combo", {}),
-            "user_total": last_result.get("user_total", 0),
-            "change_due": last_result.get("change_due", 0),
-            "is_correct": is_correct,
-            "show_tax": last_round.get("show_tax", True),
-            "skipped": False,
-            "raw_answer": answer,
-            "debug_payload": session.get("debug_payload"),
-        }
+        return ChangeHistoryRecord(
+            item_name=last_round.get("item_name", ""),
+            item_price=last_round.get("item_price", 0),
+            tax_amount=last_round.get("tax_amount", 0),
+            total_due=last_round.get("total_due", 0),
+            pay_total=last_round.get("pay_total", 0),
+            pay_bills=counts_tuple(last_round.get("pay_breakdown"), PAY_DENOMS),
+            user_coins=counts_tuple(last_result.get("counts"), CHANGE_DENOMS),
+            best_coins=counts_tuple(last_result.get("best_combo"), CHANGE_DENOMS),
+            user_total=last_result.get("user_total", 0),
+            change_due=last_result.get("change_due", 0),
+            is_correct=is_correct,
+            show_tax=last_round.get("show_tax", True),
+            skipped=False,
+        )
 
     def save_state_to_session(self, game_state: Dict[str, Any], new_state) -> None:
         game_state["item_name"] = new_state.item_name
@@ -36,7 +61,7 @@ class ChangeGameHandler(BaseGameHandler):
         game_state["total_due"] = new_state.total_due
         game_state["tax_rate"] = new_state.tax_rate
         game_state["show_tax"] = new_state.show_tax
-        game_state["item_image"] = new_state.item_image
+        game_state["item_id"] = new_state.item_id
         game_state["pay_total"] = new_state.pay_total
         game_state["pay_counts"] = new_state.pay_counts
         game_state["change_due"] = new_state.change_due
@@ -54,11 +79,11 @@ class ChangeGameHandler(BaseGameHandler):
             "item_price": 0,
             "tax_amount": 0,
             "total_due": 0,
-            "item_image": "",
+            "item_id": None,
             "pay_total": 0,
             "pay_counts": {},
             "change_due": 0,
-            "available_counts": {1000: 5, 500: 5, 100: 20, 25: 20, 10: 20, 5: 20, 1: 40},
+            "available_counts": dict(DEFAULT_AVAILABLE_CHANGE),
             "awaiting_retry": False,
         }
 
@@ -75,24 +100,26 @@ class ChangeGameHandler(BaseGameHandler):
         }
 
     def handle_skip_round(self, game_state: Dict[str, Any]) -> None:
-        if "history" not in session:
-            session["history"] = []
-        session["history"].append({
-            "item_name": game_state.get("item_name", ""),
-            "item_price": game_state.get("item_price", 0),
-            "tax_amount": game_state.get("tax_amount", 0),
-            "total_due": game_state.get("total_due", 0),
-            "pay_total": game_state.get("pay_total", 0),
-            "pay_breakdown": game_state.get("pay_counts", {}),
-            "user_counts": {},
-            "best_counts": {},
-            "user_total": 0,
-            "change_due": game_state.get("change_due", 0),
-            "is_correct": False,
-            "show_tax": game_state.get("show_tax", True),
-            "skipped": True,
-        })
-        new_state = self.engine.skip_round()
+        append_history(
+            ChangeHistoryRecord(
+                item_name=game_state.get("item_name", ""),
+                item_price=game_state.get("item_price", 0),
+                tax_amount=game_state.get("tax_amount", 0),
+                total_due=game_state.get("total_due", 0),
+                pay_total=game_state.get("pay_total", 0),
+                pay_bills=counts_tuple(game_state.get("pay_counts"), PAY_DENOMS),
+                user_coins=counts_tuple({}, CHANGE_DENOMS),
+                best_coins=counts_tuple({}, CHANGE_DENOMS),
+                user_total=0,
+                change_due=game_state.get("change_due", 0),
+                is_correct=False,
+                show_tax=game_state.get("show_tax", True),
+                skipped=True,
+            ),
+            self.HISTORY_LIMIT,
+        )
+        with phase("engine"):
+            new_state = self.engine.skip_round()
         game_state["score"] = self.engine.score
         game_state["current_round"] = self.engine.current_round
         if new_state is None:
@@ -100,5 +127,85 @@ class ChangeGameHandler(BaseGameHandler):
             game_state["over"] = True
         else:
             game_state["active"] = True
-            self.save_state_to_session(game_state, new_state)
+            self.save_round_state(game_state, new_state)
         session["games"][self.game_id] = game_state
+
+    def save_submission(self, data: Dict[str, Any]) -> None:
+        session["last_submit_payload"] = data
+        session["debug_payload"] = data.get("debug_payload")
+
+    def advance_after_answer(self, game_state: Dict[str, Any], ui, state, is_correct: bool) -> None:
+        if is_correct:
+            super().advance_after_answer(game_state, ui, state, is_correct)
+        else:
+            # stay on same item, keep awaiting retry
+            game_state["active"] = True
+            game_state["over"] = False
+            game_state["awaiting_retry"] = True
+
+    def build_json_state(self, messages: List[str]) -> Dict[str, Any]:
+        resp = super().build_json_state(messages)
+        gs = session["games"][self.game_id]
+        cfg = gs.get("config", {})
+        defaults = self.default_config
+        resp.update({
+            "item": {
+                "name": gs.get("item_name", ""),
+                "price": gs.get("item_price", 0),
+                "tax_amount": gs.get("tax_amount", 0),
+                "total_due": gs.get("total_due", 0),
+                "tax_rate": cfg.get("tax_rate", defaults.get("tax_rate", 0.0)),
+                "show_tax": gs.get("show_tax", cfg.get("show_tax", defaults.get("show_tax", True))),
+                "image": item_image_url(gs.get("item_id")),
+                "pay_total": gs.get("pay_total", 0),
+                "pay_counts": gs.get("pay_counts", {}),
+                "change_due": gs.get("change_due", 0),
+            },
+            "available_change": gs.get("available_counts", DEFAULT_AVAILABLE_CHANGE),
+            "config": cfg,
+            "change_due": gs.get("change_due", 0),
+            "awaiting_retry": gs.get("awaiting_retry", False),
+        })
+        return resp
+
+    def history_row(self, entry) -> PurchaseHistoryRow:
+        """History entry with the player's change spelled out."""
+        data = entry_json(entry)
+        return PurchaseHistoryRow(
+            item_name=data.get("item_name", ""),
+            item_price=data.get("item_price", ""),
+            tax_amount=data.get("tax_amount", ""),
+            show_tax=data.get("show_tax", False),
+            user_total=data.get("user_total") or 0,
+            is_correct=data.get("is_correct", False),
+            skipped=data.get("skipped", False),
+            user_counts=counts_text(data.get("user_counts"), CHANGE_DENOMS, CHANGE_LABELS),
+            pay_total=data.get("pay_total", ""),
+            change_due=data.get("change_due") or 0,
+        )
+
+    def view_fields(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> Dict[str, Any]:
+        """View fields for the current item, the payment and the change available to give."""
+        fields = super().view_fields(game_state, messages, debug_counts)
+        tax_rate = game_state.get("tax_rate", self.default_config.get("tax_rate", 0.08))
+        available = {int(den): count for den, count in game_state.get("available_counts", {}).items()}
+        fields.update({
+            "item_name": game_state.get("item_name", ""),
+            "item_image": item_image_url(game_state.get("item_id")),
+            "item_price": game_state.get("item_price", 0),
+            "show_tax": game_state.get("show_tax", True),
+            "tax_rate_percent": "%.2f" % (tax_rate * 100),
+            "tax_amount": "%.2f" % game_state.get("tax_amount", 0),
+            "total_due": "%.2f" % game_state.get("total_due", 0),
+            "pay_total": "%.2f" % game_state.get("pay_total", 0),
+            "change_due": "%.2f" % game_state.get("change_due", 0),
+            "available_counts": {den: available.get(den, 999) for den in CHANGE_DENOMS},
+            "page_data": {
+                "availableCounts": game_state.get("available_counts", DEFAULT_AVAILABLE_CHANGE),
+                "changeDue": "%.2f" % (game_state.get("change_due", 0) if fields["active"] else 0),
+                "debugCounts": debug_counts,
+                # The game-over panel pages the full history from here
+                "historyUrl": url_for("api_game_history", game_id=self.game_id),
+            },
+        })
+        return fields
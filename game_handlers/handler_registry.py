@@ -1,31 +1,41 @@
 """© Cigav Productions LLC
 Registry for game handlers."""
-from typing import Dict, Type, Optional
+from typing import Callable, Dict, Tuple, Type, Optional
 from .base_handler import BaseGameHandler
 
 
 class HandlerRegistry:
     """Registry for game handlers."""
-    
+
     _handlers: Dict[str, Type[BaseGameHandler]] = {}
-    
+    # (game_id, action) -> unbound handler method, built at registration time
+    _actions: Dict[Tuple[str, str], Callable] = {}
+
     @classmethod
     def register(cls, game_id: str, handler_class: Type[BaseGameHandler]) -> None:
-        """Register a game handler class."""
+        """Register a game handler class and its JSON actions."""
         cls._handlers[game_id] = handler_class
-    
+        for key in [key for key in cls._actions if key[0] == game_id]:
+            del cls._actions[key]
+        for action, method_name in handler_class.ACTIONS.items():
+            cls._actions[(game_id, action)] = getattr(handler_class, method_name)
+
     @classmethod
-    def get_handler(cls, game_id: str, engine) -> Optional[BaseGameHandler]:
+    def get_handler(cls, game_id: str, engine, engine_factory: Optional[Callable] = None) -> Optional[BaseGameHandler]:
         """Get a handler instance for a game."""
         handler_class = cls._handlers.get(game_id)
         if handler_class is None:
             # Fallback to a generic handler if available
             return None
-        return handler_class(game_id, engine)
-    
+        return handler_class(game_id, engine, engine_factory)
+
+    @classmethod
+    def get_action(cls, game_id: str, action: Optional[str]) -> Optional[Callable]:
+        """Get the handler method for a JSON action, called as ``method(handler, data, game_state, ui)``."""
+        return cls._actions.get((game_id, action))
+
     @classmethod
     def has_handler(cls, game_id: str) -> bool:
         """Check if a handler exists for a game."""
         return game_id in cls._handlers
 
-
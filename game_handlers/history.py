@@ -0,0 +1,104 @@
+"""© Cigav Productions LLC
+Compact history records and the bounded per-session history buffer."""
+import secrets
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from flask import current_app, session
+from math_games.base_game import counts_tuple
+
+
+def record_type(name: str, fields: Sequence[str], counts: Optional[Dict[str, Tuple[str, Sequence[int]]]] = None, module: str = __name__):
+    """Build a fixed-width, namedtuple-based history record class.
+
+    ``counts`` maps a dict-valued attribute (e.g. ``user_counts``) to the tuple field that
+    stores it and the denominations giving the tuple's order; the attribute is exposed as
+    a read-only ``{denomination: count}`` view so templates can keep using ``.get(den, 0)``.
+    The class must be assigned to ``name`` in ``module`` so sessions can pickle it.
+    """
+    counts = counts or {}
+    base = namedtuple(f"_{name}", fields)
+    namespace: Dict[str, Any] = {"__slots__": (), "COUNTS": counts}
+
+    def make_view(field: str, denoms: Sequence[int]):
+        return property(lambda self: dict(zip(denoms, getattr(self, field))))
+
+    for attr, (field, denoms) in counts.items():
+        namespace[attr] = make_view(field, tuple(denoms))
+
+    def to_json(self) -> Dict[str, Any]:
+        """Entry as a JSON-ready dict, with count tuples expanded back into dicts."""
+        data = self._asdict()
+        for attr, (field, _) in self.COUNTS.items():
+            del data[field]
+            data[attr] = getattr(self, attr)
+        return data
+
+    namespace["to_json"] = to_json
+    cls = type(name, (base,), namespace)
+    cls.__module__ = module
+    return cls
+
+
+def entry_json(entry: Any) -> Dict[str, Any]:
+    """JSON form of a history entry (records or plain dicts from older sessions)."""
+    return entry.to_json() if hasattr(entry, "to_json") else entry
+
+
+def _archive():
+    return current_app.extensions.get("history_archive")
+
+
+def reset_history(game_id: Optional[str] = None) -> None:
+    """Start an empty history; entries archived before stay under the previous key."""
+    session["history"] = []
+    session["history_key"] = secrets.token_urlsafe(12)
+    session["history_game"] = game_id
+    session["history_archived"] = 0
+
+
+def append_history(entry: Any, limit: int) -> None:
+    """Append an entry, moving the oldest ones to the server-side archive beyond ``limit``."""
+    history = session.get("history")
+    if history is None:
+        reset_history()
+        history = session["history"]
+    history.append(entry)
+    overflow = len(history) - limit
+    if overflow > 0:
+        evicted = history[:overflow]
+        del history[:overflow]
+        archive = _archive()
+        if archive is not None:
+            if not session.get("history_key"):
+                session["history_key"] = secrets.token_urlsafe(12)
+            archive.append(session["history_key"], [entry_json(e) for e in evicted])
+            # Without an archive evicted entries are dropped, so only archived ones count
+            session["history_archived"] = session.get("history_archived", 0) + overflow
+    session.modified = True
+
+
+def history_page(game_id: str, offset: int, limit: int) -> Dict[str, Any]:
+    """A page of the game's full history, oldest first: archived entries followed by the live buffer.
+
+    Archived entries the archive no longer holds (expired, or written by another process's
+    in-memory archive) are left out of the offsets and the total.
+    """
+    if session.get("history_game") not in (None, game_id):
+        return {"entries": [], "offset": offset, "limit": limit, "total": 0}
+    live: List[Any] = session.get("history", [])
+    archived = session.get("history_archived", 0)
+    entries: List[Dict[str, Any]] = []
+    archive = _archive()
+    if archived and archive is not None and session.get("history_key"):
+        entries, stored = archive.page(session["history_key"], offset, limit)
+        archived = min(archived, stored)
+        entries = entries[:max(0, archived - offset)]
+    else:
+        archived = 0
+    # A short archive page (rows expired between calls) ends the page rather than shifting live entries up
+    if offset + len(entries) >= archived:
+        start = max(0, offset - archived)
+        remaining = limit - len(entries)
+        if remaining > 0:
+            entries.extend(entry_json(e) for e in live[start:start + remaining])
+    return {"entries": entries, "offset": offset, "limit": limit, "total": archived + len(live)}
@@ -1,41 +1,54 @@
 """© Cigav Productions LLC
 Handler for the money game web-specific logic."""
-from typing import Dict, Any
-from flask import session
+from typing import Dict, Any, List
+from flask import session, url_for
+from web_support.assets import item_image_url
+from web_support.metrics import phase
+from math_games import MoneyGameEngine
 from .base_handler import BaseGameHandler
+from .history import append_history, counts_tuple, entry_json, record_type
+from .views import PurchaseHistoryRow, PurchaseView, counts_text
+
+BILLS = MoneyGameEngine.BILL_DENOMS
+BILL_LABELS = tuple(f"${den}" for den in BILLS)
+DEFAULT_AVAILABLE_BILLS = {den: 999 for den in BILLS}
+# Bill counts are stored as tuples in BILLS order; user_counts/best_counts are dict views
+MoneyHistoryRecord = record_type(
+    "MoneyHistoryRecord",
+    ("item_name", "item_price", "tax_amount", "total_due", "user_bills", "best_bills",
+     "user_total", "is_correct", "show_tax", "skipped"),
+    counts={"user_counts": ("user_bills", BILLS), "best_counts": ("best_bills", BILLS)},
+    module=__name__,
+)
 
 
 class MoneyGameHandler(BaseGameHandler):
     """Handler for money game web interactions."""
     
-    def create_history_entry(self, answer: str, state, is_correct: bool) -> Dict[str, Any]:
+    ACTIONS = {**BaseGameHandler.ACTIONS, 'skip_round': 'action_skip_round'}
+    RECENT_HISTORY = 6
+    VIEW = PurchaseView
+    ALL_HISTORY_NEWEST_FIRST = False
+    
+    def create_history_entry(self, answer: str, state, is_correct: bool) -> MoneyHistoryRecord:
         """Create a history entry for the money game."""
         last_round = session.get("last_money_round", {})
         last_result = {}
         if hasattr(self.engine, "get_last_result"):
             last_result = self.engine.get_last_result()
-        counts_raw = last_result.get("counts", {})
-        # When stored in the session, dict keys become strings; normalize to ints for display
-        counts = {int(k): v for k, v in counts_raw.items()} if counts_raw else {}
-        user_total = last_result.get("user_total")
-        best_raw = last_result.get("best_combo") or {}
-        best_combo = {int(k): v for k, v in best_raw.items()} if best_raw else {}
         total_due = last_result.get("total_due") or last_round.get("total_due")
-        
-        return {
-            "item_name": last_round.get("item_name", ""),
-            "item_price": last_round.get("item_price", 0),
-            "tax_amount": last_round.get("tax_amount", 0),
-            "total_due": total_due,
-            "user_counts": counts,
-            "best_counts": best_combo,
-            "user_total": user_total,
-            "is_correct": is_correct,
-            "show_tax": last_round.get("show_tax", True),
-            "skipped": False,
-            "raw_answer": answer,
-            "debug_payload": session.get("debug_payload"),
-        }
+        return MoneyHistoryRecord(
+            item_name=last_round.get("item_name", ""),
+            item_price=last_round.get("item_price", 0),
+            tax_amount=last_round.get("tax_amount", 0),
+            total_due=total_due,
+            user_bills=counts_tuple(last_result.get("counts"), BILLS),
+            best_bills=counts_tuple(last_result.get("best_combo"), BILLS),
+            user_total=last_result.get("user_total"),
+            is_correct=is_correct,
+            show_tax=last_round.get("show_tax", True),
+            skipped=False,
+        )
     
     def save_state_to_session(self, game_state: Dict[str, Any], new_state) -> None:
         """Persist the current round data for the money game."""
@@ -45,7 +58,7 @@ class MoneyGameHandler(BaseGameHandler):
         game_state["total_due"] = new_state.total_due
         game_state["tax_rate"] = new_state.tax_rate
         game_state["show_tax"] = new_state.show_tax
-        game_state["item_image"] = new_state.item_image
+        game_state["item_id"] = new_state.item_id
         game_state["awaiting_retry"] = new_state.awaiting_retry
         if hasattr(new_state, "available_counts"):
             game_state["available_counts"] = new_state.available_counts
@@ -64,9 +77,9 @@ class MoneyGameHandler(BaseGameHandler):
             "total_due": 0,
             "tax_rate": config.get("tax_rate", 0.08),
             "show_tax": config.get("show_tax", True),
-            "item_image": "",
+            "item_id": None,
             "awaiting_retry": False,
-            "available_counts": {20: 999, 10: 999, 5: 999, 1: 999},
+            "available_counts": dict(DEFAULT_AVAILABLE_BILLS),
         }
     
     def save_pre_answer_state(self, game_state: Dict[str, Any]) -> None:
@@ -109,8 +122,6 @@ class MoneyGameHandler(BaseGameHandler):
     
     def handle_skip_round(self, game_state: Dict[str, Any]) -> None:
         """Skip the current round and update session state."""
-        if "history" not in session:
-            session["history"] = []
         # Clear retry state explicitly
         game_state["awaiting_retry"] = False
         if hasattr(self.engine, "_awaiting_retry"):
@@ -119,22 +130,24 @@ class MoneyGameHandler(BaseGameHandler):
         # Clear any last result so we don't show stale messages
         if hasattr(self.engine, "_last_result"):
             self.engine._last_result = {}
-        session["history"].append(
-            {
-                "item_name": game_state.get("item_name", ""),
-                "item_price": game_state.get("item_price", 0),
-                "tax_amount": game_state.get("tax_amount", 0),
-                "total_due": game_state.get("total_due", 0),
-                "user_counts": {},
-                "best_counts": getattr(self.engine, "get_best_combo", lambda: {})(),
-                "user_total": 0,
-                "is_correct": False,
-                "show_tax": game_state.get("show_tax", True),
-                "skipped": True,
-            }
+        append_history(
+            MoneyHistoryRecord(
+                item_name=game_state.get("item_name", ""),
+                item_price=game_state.get("item_price", 0),
+                tax_amount=game_state.get("tax_amount", 0),
+                total_due=game_state.get("total_due", 0),
+                user_bills=counts_tuple({}, BILLS),
+                best_bills=counts_tuple(getattr(self.engine, "get_best_combo", lambda: {})(), BILLS),
+                user_total=0,
+                is_correct=False,
+                show_tax=game_state.get("show_tax", True),
+                skipped=True,
+            ),
+            self.HISTORY_LIMIT,
         )
         game_state["awaiting_retry"] = False
-        new_state = self.engine.skip_round()
+        with phase("engine"):
+            new_state = self.engine.skip_round()
         game_state["score"] = self.engine.score
         game_state["current_round"] = self.engine.current_round
         if new_state is None:
@@ -142,6 +155,82 @@ class MoneyGameHandler(BaseGameHandler):
             game_state["over"] = True
         else:
             game_state["active"] = True
-            self.save_state_to_session(game_state, new_state)
+            self.save_round_state(game_state, new_state)
             game_state["awaiting_retry"] = False
         session["games"][self.game_id] = game_state
+    
+    def save_submission(self, data: Dict[str, Any]) -> None:
+        """Keep the raw submit payload for debugging."""
+        session['last_submit_payload'] = data
+        session['debug_payload'] = data.get('debug_payload')
+    
+    def save_answer_result(self, is_correct: bool) -> None:
+        """Keep the engine's evaluation of the last answer for debugging."""
+        try:
+            session['engine_last_result'] = self.engine.get_last_result()
+        except Exception:
+            session['engine_last_result'] = {}
+        try:
+            session['engine_submit_debug'] = getattr(self.engine, "_last_result", {})
+        except Exception:
+            session['engine_submit_debug'] = {}
+    
+    def build_json_state(self, messages: List[str]) -> Dict[str, Any]:
+        """JSON payload with the current item, bill limits and full history."""
+        resp = super().build_json_state(messages)
+        gs = session['games'][self.game_id]
+        cfg = gs.get('config', {})
+        defaults = self.default_config
+        resp.update({
+            "item": {
+                "name": gs.get('item_name', ''),
+                "price": gs.get('item_price', 0),
+                "tax_amount": gs.get('tax_amount', 0),
+                "total_due": gs.get('total_due', 0),
+                "tax_rate": gs.get('tax_rate', cfg.get('tax_rate', defaults.get('tax_rate', 0.0))),
+                "show_tax": gs.get('show_tax', cfg.get('show_tax', defaults.get('show_tax', True))),
+                "image": item_image_url(gs.get('item_id')),
+            },
+            "awaiting_retry": gs.get('awaiting_retry', False),
+            "available_counts": gs.get('available_counts', DEFAULT_AVAILABLE_BILLS),
+            "config": cfg,
+        })
+        return resp
+    
+    def history_row(self, entry) -> PurchaseHistoryRow:
+        """History entry with its bill counts spelled out."""
+        data = entry_json(entry)
+        return PurchaseHistoryRow(
+            item_name=data.get("item_name", ""),
+            item_price=data.get("item_price", ""),
+            tax_amount=data.get("tax_amount", ""),
+            show_tax=data.get("show_tax", False),
+            user_total=data.get("user_total") or 0,
+            is_correct=data.get("is_correct", False),
+            skipped=data.get("skipped", False),
+            user_counts=counts_text(data.get("user_counts"), BILLS, BILL_LABELS),
+            best_counts=counts_text(data.get("best_counts"), BILLS, BILL_LABELS),
+        )
+    
+    def view_fields(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> Dict[str, Any]:
+        """View fields for the current item and the bills available to pay with."""
+        fields = super().view_fields(game_state, messages, debug_counts)
+        tax_rate = game_state.get("tax_rate", self.default_config.get("tax_rate", 0.08))
+        available = game_state.get("available_counts", DEFAULT_AVAILABLE_BILLS)
+        fields.update({
+            "item_name": game_state.get("item_name", ""),
+            "item_image": item_image_url(game_state.get("item_id")),
+            "item_price": game_state.get("item_price", 0),
+            "show_tax": game_state.get("show_tax", True),
+            "tax_rate_percent": "%.2f" % (tax_rate * 100),
+            "tax_amount": "%.2f" % game_state.get("tax_amount", 0),
+            "total_due": "%.2f" % game_state.get("total_due", 0),
+            "page_data": {
+                "availableCounts": available,
+                "totalDue": "%.2f" % (game_state.get("total_due", 0) if fields["active"] else 0),
+                "debugCounts": debug_counts,
+                # The game-over panel pages the full history from here
+                "historyUrl": url_for("api_game_history", game_id=self.game_id),
+            },
+        })
+        return fields
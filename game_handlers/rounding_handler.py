@@ -1,20 +1,22 @@
 """© Cigav Productions LLC
 Handler for rounding game-specific web logic."""
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from flask import session
 from .base_handler import BaseGameHandler
+from .history import record_type
+from .views import RoundingView
+
+RoundingHistoryRecord = record_type("RoundingHistoryRecord", ("number", "answer", "is_correct"), module=__name__)
 
 
 class RoundingGameHandler(BaseGameHandler):
     """Handler for rounding game web logic."""
     
-    def create_history_entry(self, answer: str, state, is_correct: bool) -> Dict[str, Any]:
+    VIEW = RoundingView
+    
+    def create_history_entry(self, answer: str, state, is_correct: bool) -> RoundingHistoryRecord:
         """Create a history entry for rounding game."""
-        return {
-            'number': session.get('current_number'),
-            'answer': answer,
-            'is_correct': is_correct
-        }
+        return RoundingHistoryRecord(session.get('current_number'), answer, is_correct)
     
     def save_state_to_session(self, game_state: Dict[str, Any], new_state) -> None:
         """Save rounding game state to session."""
@@ -57,4 +59,35 @@ class RoundingGameHandler(BaseGameHandler):
     def should_display_round(self) -> bool:
         """Return True if this game should display round info via UI."""
         return True
-
+    
+    def build_json_state(self, messages: List[str]) -> Dict[str, Any]:
+        """JSON payload with the current number and axis settings."""
+        resp = super().build_json_state(messages)
+        gs = session['games'][self.game_id]
+        cfg = gs.get('config', {})
+        defaults = self.default_config
+        resp.update({
+            "number": gs.get('current_number'),
+            "factor": cfg.get('factor', defaults.get('factor', 10)),
+            "max_number": cfg.get('max_number', defaults.get('max_number', 100)),
+            "show_axis": cfg.get('show_axis', defaults.get('show_axis', True)),
+        })
+        return resp
+    
+    def view_fields(self, game_state: Dict[str, Any], messages: List[str], debug_counts: bool = False) -> Dict[str, Any]:
+        """View fields with the number being rounded."""
+        fields = super().view_fields(game_state, messages, debug_counts)
+        fields['number'] = session.get('current_number', '?')
+        fields['page_data'] = {'currentNumber': session.get('current_number')}
+        return fields
+    
+    def action_reset_to_config(self, data: Dict[str, Any], game_state: Dict[str, Any], ui) -> Optional[Dict[str, Any]]:
+        """Return to the config screen and forget the current number."""
+        session['current_number'] = None
+        return super().action_reset_to_config(data, game_state, ui)
+    
+    def advance_after_answer(self, game_state: Dict[str, Any], ui, state, is_correct: bool) -> None:
+        """Advance to the next number, clearing it once the game is over."""
+        super().advance_after_answer(game_state, ui, state, is_correct)
+        if game_state['over']:
+            session['current_number'] = None
@@ -0,0 +1,80 @@
+"""© Cigav Productions LLC
+View models: the precomputed values each game page template renders."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from math_games.base_game import counts_tuple
+
+
+@dataclass
+class GameView:
+    """What every game page shows, flattened out of the session by the game's handler.
+
+    Templates render only from a view (plus the game's static registry info), so rendering
+    never reads the session or calls the engine. History is already windowed and ordered
+    for display; ``all_history`` is only filled once the game is over, when its panel shows
+    (the page scripts refill both lists from JSON responses after that).
+    """
+    game_id: str
+    active: bool
+    over: bool
+    score: int
+    current_round: int
+    total_rounds: int
+    # The game's config over its defaults, for the config form
+    settings: Dict[str, Any]
+    messages: List[str]
+    # Newest first
+    recent_history: List[Any] = field(default_factory=list)
+    all_history: List[Any] = field(default_factory=list)
+    # JSON handed to the page script
+    page_data: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RoundingView(GameView):
+    number: Any = '?'
+
+
+@dataclass
+class AdditionView(GameView):
+    number1: Any = '?'
+    number2: Any = '?'
+
+
+@dataclass
+class PurchaseHistoryRow:
+    """One money or change game attempt, formatted for a history list."""
+    item_name: str
+    item_price: Any
+    tax_amount: Any
+    show_tax: bool
+    user_total: Any
+    is_correct: bool
+    skipped: bool
+    # e.g. "1x$20, 0x$10, 1x$5, 2x$1"
+    user_counts: str
+    best_counts: str = ''
+    pay_total: Any = ''
+    change_due: Any = 0
+
+
+@dataclass
+class PurchaseView(GameView):
+    """Money and change game pages: the current item and what is owed."""
+    item_name: str = ''
+    item_image: str = ''
+    item_price: Any = 0
+    show_tax: bool = True
+    tax_rate_percent: str = '0.00'
+    tax_amount: str = '0.00'
+    total_due: str = '0.00'
+    pay_total: str = '0.00'
+    change_due: str = '0.00'
+    # Denomination -> count the player may use
+    available_counts: Dict[int, int] = field(default_factory=dict)
+
+
+def counts_text(counts: Any, denoms: Sequence[int], labels: Sequence[str]) -> str:
+    """``"<count>x<label>"`` pairs, in ``denoms`` order, for a ``{denomination: count}`` dict."""
+    return ', '.join(f'{count}x{label}' for count, label in zip(counts_tuple(counts, denoms), labels))
@@ -0,0 +1,44 @@
+"""© Cigav Productions LLC
+Gunicorn settings for serving the games on every core: ``gunicorn -c gunicorn.conf.py wsgi:app``.
+
+Pre-forked worker processes each run a pool of threads. Engines are pure Python, so
+throughput scales with processes; threads keep a worker busy while others wait on session
+I/O. Environment variables:
+
+    MATH_GAME_BIND      address to listen on (default 0.0.0.0:8000)
+    MATH_GAME_WORKERS   worker processes (default: one per CPU core)
+    MATH_GAME_THREADS   threads per worker (default 4)
+    MATH_GAME_SECRET_KEY  session signing key, shared by all workers (required)
+
+wsgi.py defaults sessions and history to the SQLite backend so any worker can serve any player (the
+memory backend is rejected with more than one worker); set
+MATH_GAME_SESSION_PATH / MATH_GAME_HISTORY_PATH to put them on fast local storage.
+Each worker keeps its own engine cache and round pools and falls back to the shared
+session state, and /metrics reports the worker that answers the scrape.
+
+Reloading: ``kill -HUP <master>`` restarts workers gracefully with new settings. Because
+the app is preloaded in the master, deploy new code with ``kill -USR2 <master>`` (starts a new
+master and workers), then ``kill -QUIT`` the old master once the new one is serving.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('MATH_GAME_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('MATH_GAME_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('MATH_GAME_THREADS', '4'))
+worker_class = 'gthread'
+preload_app = True
+# Recycle workers now and then so memory growth from long-lived caches stays bounded
+max_requests = int(os.environ.get('MATH_GAME_MAX_REQUESTS', '20000'))
+max_requests_jitter = max_requests // 10
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+accesslog = os.environ.get('MATH_GAME_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def on_starting(server):
+    """Refuse in-memory sessions with several workers: a player's game would vanish whenever another worker answers."""
+    if server.cfg.workers > 1 and os.environ.get('MATH_GAME_SESSION_BACKEND', 'sqlite').lower() == 'memory':
+        raise RuntimeError("MATH_GAME_SESSION_BACKEND=memory needs a single worker; use sqlite with several workers")
@@ -5,6 +5,8 @@ from .game_engine import RoundingGameEngine
 from .addition_game import AdditionGameEngine
 from .money_game import MoneyGameEngine
 from .change_game import ChangeGameEngine
+from .round_pool import RoundPool, RoundPoolRegistry
+from .state_codec import StateCodec
 
 # Register all games
 GameRegistry.register('rounding', RoundingGameEngine)
@@ -12,4 +14,4 @@ GameRegistry.register('addition', AdditionGameEngine)
 GameRegistry.register('money', MoneyGameEngine)
 GameRegistry.register('change', ChangeGameEngine)
 
-__all__ = ['GameRegistry', 'RoundingGameEngine', 'AdditionGameEngine', 'MoneyGameEngine', 'ChangeGameEngine']
+__all__ = ['GameRegistry', 'RoundingGameEngine', 'AdditionGameEngine', 'MoneyGameEngine', 'ChangeGameEngine', 'RoundPool', 'RoundPoolRegistry', 'StateCodec']
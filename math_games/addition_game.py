@@ -1,13 +1,11 @@
 """© Cigav Productions LLC
 Example addition game to demonstrate how to add new games."""
-import random
-from dataclasses import dataclass
-from typing import Tuple, Optional, Dict, Any
-from datetime import datetime
-from .base_game import BaseGameEngine, GameState as BaseGameState
+from typing import List, Sequence, Tuple, Optional, Dict, Any
+from .base_game import BaseGameEngine, GameState as BaseGameState, state_dataclass
+from .batch import equal_ints, parse_int, random_ints
 
 
-@dataclass
+@state_dataclass
 class AdditionGameState(BaseGameState):
     """Extended game state for addition game."""
     number1: int
@@ -18,6 +16,9 @@ class AdditionGameState(BaseGameState):
 class AdditionGameEngine(BaseGameEngine):
     """A simple addition game where players solve addition problems."""
     
+    STATE_FIELDS = BaseGameEngine.STATE_FIELDS + ('number1', 'number2')
+    SUPPORTS_ROUND_POOL = True
+    
     def __init__(self, max_number=50, rounds=10, **kwargs):
         super().__init__(max_number=max_number, rounds=rounds, **kwargs)
         self.max_number = max_number
@@ -26,14 +27,33 @@ class AdditionGameEngine(BaseGameEngine):
         self.current_round = 0
         self._number1 = None
         self._number2 = None
-        random.seed(datetime.now().timestamp())
     
     def _generate_problem(self) -> Tuple[int, int]:
         """Generate two random numbers for addition."""
-        num1 = random.randint(1, self.max_number)
-        num2 = random.randint(1, self.max_number)
+        num1 = self.rng.randint(1, self.max_number)
+        num2 = self.rng.randint(1, self.max_number)
         return num1, num2
     
+    def generate_round(self) -> Dict[str, Any]:
+        """Generate the numbers for a new round."""
+        num1, num2 = self._generate_problem()
+        return {'number1': num1, 'number2': num2}
+    
+    def load_round(self, data: Dict[str, Any]) -> None:
+        """Make the given problem the current round."""
+        self._number1 = data['number1']
+        self._number2 = data['number2']
+    
+    def generate_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Generate the numbers for ``count`` problems in one draw."""
+        numbers = random_ints(self.rng, 1, self.max_number, 2 * count)
+        return [{'number1': a, 'number2': b} for a, b in zip(numbers[::2], numbers[1::2])]
+    
+    def check_answers(self, rounds: Sequence[Dict[str, Any]], answers: Sequence[str]) -> List[bool]:
+        """Grade sums for a batch of problems."""
+        sums = [r['number1'] + r['number2'] for r in rounds]
+        return equal_ints(sums, [parse_int(answer) for answer in answers])
+    
     def _check_answer(self, num1: int, num2: int, answer: str) -> bool:
         """Check if the answer is correct."""
         try:
@@ -59,7 +79,7 @@ class AdditionGameEngine(BaseGameEngine):
         if self.current_round >= self.rounds:
             return None
         
-        self._number1, self._number2 = self._generate_problem()
+        self._next_round()
         return self.get_game_state()
     
     def submit_answer(self, answer: str) -> Tuple[bool, AdditionGameState]:
@@ -96,6 +116,7 @@ class AdditionGameEngine(BaseGameEngine):
         return {
             'score': state.score,
             'current_round': state.current_round,
+            'rng_seed': self.rng_seed,
             'number1': state.number1,
             'number2': state.number2,
             'config': {
@@ -108,6 +129,7 @@ class AdditionGameEngine(BaseGameEngine):
         """Deserialize game state from a dictionary."""
         self.score = data.get('score', 0)
         self.current_round = data.get('current_round', 0)
+        self.seed_rng(data.get('rng_seed', self.rng_seed))
         self._number1 = data.get('number1')
         self._number2 = data.get('number2')
         config = data.get('config', {})
@@ -1,10 +1,38 @@
 """© Cigav Productions LLC"""
+import os
+import random
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Tuple, Optional, Dict, Any
+from typing import Callable, List, Tuple, Optional, Dict, Any, Sequence
 
 
-@dataclass
+def state_dataclass(cls=None, *, frozen: bool = False):
+    """Dataclass decorator for game states: slotted on Python 3.10+, optionally frozen.
+
+    Denomination counts in states are tuples the engine shares without copying. Frozen
+    instances cost several times more to construct, so states leave it off by default;
+    subclasses of a frozen state must be frozen too.
+    """
+    options = {'frozen': frozen}
+    if sys.version_info >= (3, 10):
+        options['slots'] = True
+
+    def wrap(klass):
+        return dataclass(klass, **options)
+
+    return wrap if cls is None else wrap(cls)
+
+
+def counts_tuple(counts: Optional[Dict[Any, int]], denoms: Sequence[int]) -> Tuple[int, ...]:
+    """Denomination counts as a tuple in ``denoms`` order, accepting int or string keys."""
+    if not counts:
+        return (0,) * len(denoms)
+    normalized = {int(k): v for k, v in counts.items()}
+    return tuple(normalized.get(den, 0) for den in denoms)
+
+
+@state_dataclass
 class GameState:
     """Base game state that all games should use or extend."""
     current_round: int
@@ -16,11 +44,27 @@ class GameState:
 class BaseGameEngine(ABC):
     """Abstract base class for all game engines."""
     
+    # Serialized state layout used by StateCodec: keys of serialize_state() and of the web
+    # handler's session state, in encoding order. Only append fields; reordering or removing
+    # them requires bumping STATE_VERSION.
+    STATE_VERSION = 1
+    STATE_FIELDS: Tuple[str, ...] = ('score', 'current_round', 'active', 'over', 'config', 'rng_seed')
+    # Fields holding {denomination: count} dicts, stored as counts in this denomination order
+    STATE_COUNTS: Dict[str, Tuple[int, ...]] = {}
+    # Set by engines that split round creation into generate_round() (round data, engine
+    # untouched) and load_round(data); the web app then serves their rounds from a RoundPool,
+    # and generate_rounds/check_answers work for them
+    SUPPORTS_ROUND_POOL = False
+    
     def __init__(self, **kwargs):
-        """Initialize the game engine with configuration."""
+        """Initialize the game engine with configuration (and an optional ``seed`` for its RNG)."""
         self.score = 0
         self.current_round = 0
+        self.rng_seed: Optional[int] = kwargs.pop('seed', None)
+        self._rng: Optional[random.Random] = None
         self._config = kwargs
+        # Optional supplier of pre-generated rounds (e.g. RoundPool.take); see _next_round
+        self.round_source: Optional[Callable[[], Dict[str, Any]]] = None
     
     @abstractmethod
     def get_game_state(self) -> GameState:
@@ -41,6 +85,48 @@ class BaseGameEngine(ABC):
         """
         pass
     
+    @property
+    def rng(self) -> random.Random:
+        """This engine's own random generator, seeded from rng_seed (drawn from os.urandom if unset)."""
+        if self._rng is None:
+            if self.rng_seed is None:
+                self.rng_seed = int.from_bytes(os.urandom(8), 'big')
+            self._rng = random.Random(self.rng_seed)
+        return self._rng
+    
+    def seed_rng(self, seed: Optional[int]) -> None:
+        """Reseed the engine's generator; None picks a fresh seed on next use."""
+        self.rng_seed = seed
+        self._rng = None
+    
+    def generate_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Generate data for ``count`` rounds at once, as generate_round would."""
+        return [self.generate_round() for _ in range(count)]
+    
+    def check_answers(self, rounds: Sequence[Dict[str, Any]], answers: Sequence[str]) -> List[bool]:
+        """Grade one answer per round (rounds from generate_rounds) as submit_answer would, without changing the engine.
+
+        Each answer goes through load_round and submit_answer on a throwaway engine with this
+        engine's config; override to grade a whole batch at once.
+        """
+        results = []
+        for data, answer in zip(rounds, answers):
+            grader = type(self)(**self._config)
+            grader.load_round(data)
+            is_correct, _ = grader.submit_answer(answer)
+            results.append(is_correct)
+        return results
+    
+    def _next_round(self) -> None:
+        """Load the next round from the round source, generating it if there is none."""
+        if self.round_source is not None:
+            data = self.round_source()
+        else:
+            data = self.generate_round()
+            # Chain to a new seed so a persisted rng_seed always yields the next round
+            self.seed_rng(self.rng.getrandbits(64))
+        self.load_round(data)
+    
     @classmethod
     @abstractmethod
     def get_default_config(cls) -> Dict[str, Any]:
@@ -63,7 +149,8 @@ class BaseGameEngine(ABC):
         return {
             'score': state.score,
             'current_round': state.current_round,
-            'config': self._config
+            'config': self._config,
+            'rng_seed': self.rng_seed,
         }
     
     def deserialize_state(self, data: Dict[str, Any]) -> None:
@@ -71,3 +158,4 @@ class BaseGameEngine(ABC):
         self.score = data.get('score', 0)
         self.current_round = data.get('current_round', 0)
         self._config = data.get('config', {})
+        self.seed_rng(data.get('rng_seed', self.rng_seed))
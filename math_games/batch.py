@@ -0,0 +1,140 @@
+"""© Cigav Productions LLC
+Array helpers for generating and grading many rounds at once (NumPy when installed)."""
+import random
+from typing import Any, Dict, List, Optional, Sequence
+from .greedy_table import GreedyTable
+
+try:
+    import numpy as np
+except ImportError:  # optional; plain Python loops are used instead
+    np = None
+
+# Largest magnitude kept in int64 arrays; bigger values take the Python path
+_INT64_SAFE = 2 ** 62
+
+
+def random_ints(rng: random.Random, low: int, high: int, count: int) -> List[int]:
+    """``count`` integers drawn uniformly from ``[low, high]``, seeded from ``rng``."""
+    if np is not None and -_INT64_SAFE < low <= high < _INT64_SAFE:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        return generator.integers(low, high, size=count, endpoint=True).tolist()
+    return [rng.randint(low, high) for _ in range(count)]
+
+
+def parse_int(text: str) -> Optional[int]:
+    """``int(text)``, or None when the text is not an integer."""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fits_int64(values: Sequence[int]) -> bool:
+    return all(-_INT64_SAFE < v < _INT64_SAFE for v in values)
+
+
+def equal_ints(expected: Sequence[int], given: Sequence[Optional[int]]) -> List[bool]:
+    """Element-wise ``expected == given``; None never matches."""
+    if np is not None and expected:
+        valid = [v is not None for v in given]
+        values = [v if v is not None else 0 for v in given]
+        if _fits_int64(expected) and _fits_int64(values):
+            return (np.asarray(valid) & (np.asarray(expected, dtype=np.int64) == np.asarray(values, dtype=np.int64))).tolist()
+    return [v is not None and e == v for e, v in zip(expected, given)]
+
+
+def greedy_breakdown(amounts: Sequence[int], denoms: Sequence[int]) -> List[List[int]]:
+    """Greedy count of each denomination (largest first) for every amount; negatives count as 0."""
+    if np is not None and amounts and _fits_int64(amounts):
+        remaining = np.maximum(np.asarray(amounts, dtype=np.int64), 0)
+        columns = []
+        for den in denoms:
+            columns.append(remaining // den)
+            remaining = remaining % den
+        return np.stack(columns, axis=1).tolist()
+    table = GreedyTable.for_denoms(denoms)
+    return [list(table.breakdown(amount)) for amount in amounts]
+
+
+def counts_rows(answers: Sequence[str], denoms: Sequence[int]) -> List[List[int]]:
+    """Parse ``den:count,...`` answers into count rows in ``denoms`` order.
+
+    Follows the engines' ``_parse_answer``: malformed parts and unknown denominations are
+    ignored, negative counts become 0 and a repeated denomination keeps its last count.
+    """
+    index = {den: i for i, den in enumerate(denoms)}
+    empty = [0] * len(denoms)
+    rows = []
+    for answer in answers:
+        row = list(empty)
+        if answer:
+            for part in answer.split(","):
+                denom_str, sep, count_str = part.partition(":")
+                if not sep:
+                    continue
+                try:
+                    position = index.get(int(denom_str))
+                    count = int(count_str)
+                except ValueError:
+                    continue
+                if position is not None:
+                    row[position] = max(0, count)
+        rows.append(row)
+    return rows
+
+
+def reference_rows(counts: Sequence[Dict[int, int]], denoms: Sequence[int]) -> List[List[int]]:
+    """Count dicts from round data as rows in ``denoms`` order."""
+    return [[c.get(den, 0) for den in denoms] for c in counts]
+
+
+def _int64_matrix(rows: List[List[int]], width: int) -> Any:
+    """Rows as an int64 array, or None without NumPy or when a value does not fit."""
+    if np is None or not rows:
+        return None
+    try:
+        return np.asarray(rows, dtype=np.int64).reshape(len(rows), width)
+    except OverflowError:
+        return None
+
+
+class CountsBatch:
+    """Submitted denomination counts for a batch, compared against per-round reference rows."""
+
+    def __init__(self, submitted: List[List[int]], denoms: Sequence[int]):
+        self.denoms = tuple(denoms)
+        self.submitted = submitted
+        self._array = _int64_matrix(submitted, len(self.denoms))
+
+    def totals(self) -> List[int]:
+        """Value of each submission."""
+        # int64 sums wrap silently, so only use them when no total can overflow
+        if self._array is not None and int(np.abs(self._array).max()) * sum(self.denoms) < 2 ** 63:
+            return (self._array @ np.asarray(self.denoms, dtype=np.int64)).tolist()
+        return [sum(den * cnt for den, cnt in zip(self.denoms, row)) for row in self.submitted]
+
+    def equals(self, reference: List[List[int]]) -> List[bool]:
+        """Whether each submission has exactly the reference counts."""
+        other = _int64_matrix(reference, len(self.denoms)) if self._array is not None else None
+        if other is not None:
+            return np.all(self._array == other, axis=1).tolist()
+        return [row == list(ref) for row, ref in zip(self.submitted, reference)]
+
+    def exceeds(self, limits: List[List[int]]) -> List[bool]:
+        """Whether any count of a submission is above its limit."""
+        other = _int64_matrix(limits, len(self.denoms)) if self._array is not None else None
+        if other is not None:
+            return np.any(self._array > other, axis=1).tolist()
+        return [any(c > l for c, l in zip(row, lim)) for row, lim in zip(self.submitted, limits)]
+
+
+def round_up_flags(numbers: Sequence[int], factor: int) -> List[bool]:
+    """Whether each number rounds up to the next multiple of ``factor`` (ties round up)."""
+    if np is not None and numbers and _fits_int64(numbers) and abs(factor) < _INT64_SAFE:
+        rem = np.asarray(numbers, dtype=np.int64) % factor
+        return (np.abs(rem) >= np.abs(rem - factor)).tolist()
+    flags = []
+    for number in numbers:
+        rem = number % factor
+        flags.append(abs(rem) >= abs(rem - factor))
+    return flags
@@ -1,16 +1,23 @@
 """© Cigav Productions LLC
 Change game where players determine the correct change for a purchase."""
+import bisect
+import itertools
 import math
-import random
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from urllib.parse import quote
-from .base_game import BaseGameEngine, GameState
+from .base_game import BaseGameEngine, GameState, counts_tuple, state_dataclass
+from .batch import CountsBatch, counts_rows, greedy_breakdown, reference_rows
+from .greedy_table import GreedyTable
 from .item_catalog import ItemCatalog
+from .payment_solver import solve_payment
 
+CHANGE_DENOMS = (1000, 500, 100, 25, 10, 5, 1)
+PAY_DENOMS = (2000, 1000, 500, 100)
+# Coins and bills in the register, in CHANGE_DENOMS order
+CHANGE_LIMITS = (5, 5, 20, 20, 20, 20, 40)
 
-@dataclass
+
+@state_dataclass
 class ChangeGameState(GameState):
     """State object for the change game."""
     item_name: str
@@ -19,19 +26,40 @@ class ChangeGameState(GameState):
     total_due: float
     tax_rate: float
     show_tax: bool
-    item_image: str
+    item_id: Optional[int]
     pay_total: float
-    pay_counts: Dict[int, int]
+    pay_bills: Tuple[int, ...]  # counts in PAY_DENOMS order
     change_due: float
-    available_change: Dict[int, int]
+    change_limits: Tuple[int, ...]  # counts in CHANGE_DENOMS order
     awaiting_retry: bool
 
+    @property
+    def pay_counts(self) -> Dict[int, int]:
+        return dict(zip(PAY_DENOMS, self.pay_bills))
+
+    @property
+    def available_change(self) -> Dict[int, int]:
+        return dict(zip(CHANGE_DENOMS, self.change_limits))
+
 
 class ChangeGameEngine(BaseGameEngine):
     """Engine for figuring out the change a customer should receive."""
 
-    CHANGE_DENOMS = [1000, 500, 100, 25, 10, 5, 1]  # cents: $10, $5, $1, coins
-    PAY_DENOMS = [2000, 1000, 500, 100]  # cents: $20, $10, $5, $1
+    CHANGE_DENOMS = list(CHANGE_DENOMS)  # cents: $10, $5, $1, coins
+    PAY_DENOMS = list(PAY_DENOMS)  # cents: $20, $10, $5, $1
+    # Inclusive bill-count ranges for the customer's wallet (kids often have $20s)
+    WALLET_RANGES = {2000: (1, 3), 1000: (0, 2), 500: (0, 2), 100: (0, 3)}
+    _WALLETS: Optional[Tuple[List[Tuple[int, ...]], List[int]]] = None
+    SUPPORTS_ROUND_POOL = True
+    STATE_FIELDS = BaseGameEngine.STATE_FIELDS + (
+        'item_name', 'item_price', 'tax_amount', 'total_due', 'tax_rate', 'show_tax', 'item_id',
+        'pay_total', 'pay_counts', 'change_due', 'available_change', 'available_counts', 'awaiting_retry',
+    )
+    STATE_COUNTS = {
+        'pay_counts': tuple(PAY_DENOMS),
+        'available_change': tuple(CHANGE_DENOMS),
+        'available_counts': tuple(CHANGE_DENOMS),
+    }
 
     def __init__(
         self,
@@ -63,95 +91,115 @@ class ChangeGameEngine(BaseGameEngine):
         self._total_due: float = 0.0
         self._total_due_cents: int = 0
         self._pay_total_cents: int = 0
-        self._pay_counts: Dict[int, int] = {den: 0 for den in self.PAY_DENOMS}
+        self._pay_bills: Tuple[int, ...] = (0,) * len(PAY_DENOMS)
         self._change_due_cents: int = 0
         self._best_change_counts: Dict[int, int] = {den: 0 for den in self.CHANGE_DENOMS}
         self._last_result: Dict[str, Any] = {}
-        self._available_change = {1000: 5, 500: 5, 100: 20, 25: 20, 10: 20, 5: 20, 1: 40}
-        self._item_image: str = ""
+        self._change_limits: Tuple[int, ...] = CHANGE_LIMITS
+        self._item_id: Optional[int] = None
         self._awaiting_retry: bool = False
         self._items = ItemCatalog.items()
-        random.seed(datetime.now().timestamp())
-
-    def _build_item_image(self, label: str, color: str, emoji: str) -> str:
-        return ItemCatalog.build_image(label, color, emoji)
 
     def _choose_price(self, item: Dict[str, Any]) -> int:
-        return ItemCatalog.choose_price(item, self.max_price, random)
+        return ItemCatalog.choose_price(item, self.max_price, self.rng)
+
+    @classmethod
+    def _wallets_by_capacity(cls) -> Tuple[List[Tuple[int, ...]], List[int]]:
+        """Every possible wallet (counts in PAY_DENOMS order) sorted by total value."""
+        if cls._WALLETS is None:
+            ranges = [range(low, high + 1) for low, high in (cls.WALLET_RANGES[den] for den in cls.PAY_DENOMS)]
+            wallets = sorted(
+                itertools.product(*ranges),
+                key=lambda counts: sum(den * cnt for den, cnt in zip(cls.PAY_DENOMS, counts)),
+            )
+            capacities = [sum(den * cnt for den, cnt in zip(cls.PAY_DENOMS, counts)) for counts in wallets]
+            cls._WALLETS = (wallets, capacities)
+        return cls._WALLETS
 
     def _pick_payment_combo(self, total_due_cents: int) -> Tuple[Dict[int, int], int]:
         """Select a realistic payment combination of bills based on a random wallet."""
-        for _ in range(40):
-            wallet = {
-                2000: random.randint(1, 3),  # kids often have $20s
-                1000: random.randint(0, 2),
-                500: random.randint(0, 2),
-                100: random.randint(0, 3),
-            }
-            capacity = sum(den * cnt for den, cnt in wallet.items())
-            if capacity < total_due_cents:
-                continue
-            best_total = None
-            best_counts = None
-            for c20 in range(wallet[2000] + 1):
-                for c10 in range(wallet[1000] + 1):
-                    for c5 in range(wallet[500] + 1):
-                        for c1 in range(wallet[100] + 1):
-                            total = c20 * 2000 + c10 * 1000 + c5 * 500 + c1 * 100
-                            if total < total_due_cents:
-                                continue
-                            bills = c20 + c10 + c5 + c1
-                            if (
-                                best_total is None
-                                or total < best_total
-                                or (total == best_total and bills < sum(best_counts.values()))
-                                or (
-                                    total == best_total
-                                    and bills == sum(best_counts.values())
-                                    and c20 > best_counts.get(2000, 0)
-                                )
-                            ):
-                                best_total = total
-                                best_counts = {2000: c20, 1000: c10, 500: c5, 100: c1}
-            if best_counts is not None:
-                return best_counts, best_total
+        # Draw uniformly among the wallets that can cover the total, which matches
+        # rejection-sampling random wallets without the retries.
+        wallets, capacities = self._wallets_by_capacity()
+        start = bisect.bisect_left(capacities, total_due_cents)
+        if start < len(wallets):
+            wallet = wallets[self.rng.randrange(start, len(wallets))]
+            result = solve_payment(total_due_cents, tuple(self.PAY_DENOMS), wallet, prefer_largest=True)
+            if result is not None:
+                best_counts, best_total = result
+                return dict(zip(self.PAY_DENOMS, best_counts)), best_total
         pay_cents = int(math.ceil(total_due_cents / 100)) * 100
-        best_counts = {den: 0 for den in self.PAY_DENOMS}
-        remaining = pay_cents
-        for denom in self.PAY_DENOMS:
-            best_counts[denom] = remaining // denom
-            remaining %= denom
-        return best_counts, pay_cents
+        return GreedyTable.for_denoms(PAY_DENOMS).breakdown_dict(pay_cents), pay_cents
 
     def _best_change_combo(self, change_cents: int) -> Dict[int, int]:
-        remaining = max(0, change_cents)
-        best = {den: 0 for den in self.CHANGE_DENOMS}
-        for denom in self.CHANGE_DENOMS:
-            best[denom] = remaining // denom
-            remaining %= denom
-        return best
+        return GreedyTable.for_denoms(CHANGE_DENOMS).breakdown_dict(change_cents)
 
-    def _choose_item(self) -> None:
-        item = random.choice(self._items)
+    def _draw_round(self) -> Dict[str, Any]:
+        """Pick an item, the customer's payment and the change owed for a new round."""
+        item_id = self.rng.randrange(len(self._items))
+        item = self._items[item_id]
         price = self._choose_price(item)
-        self._item_name = item["name"]
-        self._item_price = float(price)
         price_cents = price * 100
         if self.show_tax:
             raw_tax = price_cents * self.tax_rate
             tax_cents = int(round(raw_tax))
         else:
             tax_cents = 0
-        self._tax_amount = tax_cents / 100
-        self._total_due_cents = price_cents + tax_cents
+        total_due_cents = price_cents + tax_cents
+        pay_counts, pay_total_cents = self._pick_payment_combo(total_due_cents)
+        if pay_total_cents < total_due_cents:
+            pay_total_cents = math.ceil(total_due_cents / 100) * 100
+        change_due_cents = pay_total_cents - total_due_cents
+        return {
+            "item_id": item_id,
+            "item_name": item["name"],
+            "item_price": float(price),
+            "tax_cents": tax_cents,
+            "total_due_cents": total_due_cents,
+            "pay_counts": pay_counts,
+            "pay_total_cents": pay_total_cents,
+            "change_due_cents": change_due_cents,
+        }
+
+    def generate_round(self) -> Dict[str, Any]:
+        """Pick an item, the customer's payment and the change owed, with the best change, for a new round."""
+        data = self._draw_round()
+        data["best_change_counts"] = self._best_change_combo(data["change_due_cents"])
+        return data
+
+    def generate_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Generate ``count`` rounds, breaking all the change down in one pass."""
+        rounds = [self._draw_round() for _ in range(count)]
+        breakdowns = greedy_breakdown([data["change_due_cents"] for data in rounds], CHANGE_DENOMS)
+        for data, best in zip(rounds, breakdowns):
+            data["best_change_counts"] = dict(zip(CHANGE_DENOMS, best))
+        return rounds
+
+    def check_answers(self, rounds: Sequence[Dict[str, Any]], answers: Sequence[str]) -> List[bool]:
+        """Grade change answers for a batch of rounds."""
+        batch = CountsBatch(counts_rows(answers, CHANGE_DENOMS), CHANGE_DENOMS)
+        results = [total == data["change_due_cents"] for total, data in zip(batch.totals(), rounds)]
+        if self.require_minimal_change:
+            best = reference_rows([data["best_change_counts"] for data in rounds], CHANGE_DENOMS)
+            results = [ok and matches for ok, matches in zip(results, batch.equals(best))]
+        return results
+
+    def load_round(self, data: Dict[str, Any]) -> None:
+        """Make the given round current."""
+        self._item_id = data["item_id"]
+        self._item_name = data["item_name"]
+        self._item_price = data["item_price"]
+        self._tax_amount = data["tax_cents"] / 100
+        self._total_due_cents = data["total_due_cents"]
         self._total_due = self._total_due_cents / 100
-        self._pay_counts, self._pay_total_cents = self._pick_payment_combo(self._total_due_cents)
-        if self._pay_total_cents < self._total_due_cents:
-            self._pay_total_cents = math.ceil(self._total_due_cents / 100) * 100
-        self._change_due_cents = self._pay_total_cents - self._total_due_cents
-        self._available_change = {1000: 5, 500: 5, 100: 20, 25: 20, 10: 20, 5: 20, 1: 40}
-        self._best_change_counts = self._best_change_combo(self._change_due_cents)
-        self._item_image = self._build_item_image(item["name"], item["color"], item["emoji"])
+        self._pay_bills = counts_tuple(data["pay_counts"], PAY_DENOMS)
+        self._pay_total_cents = data["pay_total_cents"]
+        self._change_due_cents = data["change_due_cents"]
+        self._change_limits = CHANGE_LIMITS
+        self._best_change_counts = dict(data["best_change_counts"])
+
+    def _choose_item(self) -> None:
+        self._next_round()
 
     def get_game_state(self) -> ChangeGameState:
         return ChangeGameState(
@@ -164,11 +212,11 @@ class ChangeGameEngine(BaseGameEngine):
             total_due=self._total_due,
             tax_rate=self.tax_rate,
             show_tax=self.show_tax,
-            item_image=self._item_image,
+            item_id=self._item_id,
             pay_total=self._pay_total_cents / 100,
-            pay_counts={den: self._pay_counts.get(den, 0) for den in self.PAY_DENOMS},
+            pay_bills=self._pay_bills,
             change_due=self._change_due_cents / 100,
-            available_change=self._available_change,
+            change_limits=self._change_limits,
             awaiting_retry=self._awaiting_retry,
         )
 
@@ -220,7 +268,7 @@ class ChangeGameEngine(BaseGameEngine):
             "user_total": user_total_cents / 100,
             "change_due": correct_total / 100,
             "is_correct": is_correct,
-            "pay_counts": self._pay_counts.copy(),
+            "pay_counts": dict(zip(PAY_DENOMS, self._pay_bills)),
             "pay_total": self._pay_total_cents / 100,
             "total_due": self._total_due,
         }
@@ -257,13 +305,14 @@ class ChangeGameEngine(BaseGameEngine):
             "score": state.score,
             "current_round": state.current_round,
             "config": self._config,
+            "rng_seed": self.rng_seed,
             "item_name": state.item_name,
             "item_price": state.item_price,
             "tax_amount": state.tax_amount,
             "total_due": state.total_due,
             "tax_rate": state.tax_rate,
             "show_tax": state.show_tax,
-            "item_image": state.item_image,
+            "item_id": state.item_id,
             "pay_total": state.pay_total,
             "pay_counts": state.pay_counts,
             "change_due": state.change_due,
@@ -278,9 +327,11 @@ class ChangeGameEngine(BaseGameEngine):
         self._total_due = data.get("total_due", 0)
         self._total_due_cents = int(round(self._total_due * 100))
         self._pay_total_cents = int(round(data.get("pay_total", 0) * 100))
-        self._pay_counts = {int(k): v for k, v in (data.get("pay_counts") or {}).items()}
+        self._pay_bills = counts_tuple(data.get("pay_counts"), PAY_DENOMS)
         self._change_due_cents = int(round(data.get("change_due", 0) * 100))
-        self._available_change = {int(k): v for k, v in (data.get("available_change") or {}).items()}
+        # Handler session state keeps the limits under "available_counts"
+        limits = data.get("available_change") or data.get("available_counts")
+        self._change_limits = counts_tuple(limits, CHANGE_DENOMS) if limits else CHANGE_LIMITS
         self._best_change_counts = self._best_change_combo(self._change_due_cents)
-        self._item_image = data.get("item_image", "")
+        self._item_id = data.get("item_id")
         self._awaiting_retry = data.get("awaiting_retry", False)
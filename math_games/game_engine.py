@@ -1,12 +1,10 @@
 """© Cigav Productions LLC"""
-import random
-from dataclasses import dataclass
-from typing import Tuple, Optional, Dict, Any
-from datetime import datetime
-from .base_game import BaseGameEngine, GameState as BaseGameState
+from typing import List, Sequence, Tuple, Optional, Dict, Any
+from .base_game import BaseGameEngine, GameState as BaseGameState, state_dataclass
+from .batch import random_ints, round_up_flags
 
 
-@dataclass
+@state_dataclass
 class RoundingGameState(BaseGameState):
     """Extended game state for rounding game."""
     current_number: int
@@ -20,6 +18,9 @@ GameState = RoundingGameState
 
 
 class RoundingGameEngine(BaseGameEngine):
+    STATE_FIELDS = BaseGameEngine.STATE_FIELDS + ('current_number',)
+    SUPPORTS_ROUND_POOL = True
+
     def __init__(self, max_number=100, rounds=10, factor=5, show_axis=True, **kwargs):
         super().__init__(max_number=max_number, rounds=rounds, factor=factor, show_axis=show_axis, **kwargs)
         self.max_number = max_number
@@ -29,10 +30,26 @@ class RoundingGameEngine(BaseGameEngine):
         self.score = 0
         self.current_round = 0
         self._current_number = None
-        random.seed(datetime.now().timestamp()) 
 
     def _generate_number(self):
-        return random.randint(1, self.max_number)
+        return self.rng.randint(1, self.max_number)
+
+    def generate_round(self) -> Dict[str, Any]:
+        """Generate the number for a new round."""
+        return {'current_number': self._generate_number()}
+
+    def load_round(self, data: Dict[str, Any]) -> None:
+        """Make the given number the current round."""
+        self._current_number = data['current_number']
+
+    def generate_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Generate the numbers for ``count`` rounds in one draw."""
+        return [{'current_number': number} for number in random_ints(self.rng, 1, self.max_number, count)]
+
+    def check_answers(self, rounds: Sequence[Dict[str, Any]], answers: Sequence[str]) -> List[bool]:
+        """Grade 'up'/'down' answers for a batch of rounds."""
+        ups = round_up_flags([r['current_number'] for r in rounds], self.factor)
+        return [answer.lower() == ('up' if up else 'down') for up, answer in zip(ups, answers)]
 
     def _get_closest_multiples(self, number) -> Tuple[int, int]:
         lower = (number // self.factor) * self.factor
@@ -72,7 +89,7 @@ class RoundingGameEngine(BaseGameEngine):
         if self.current_round >= self.rounds:
             return None
             
-        self._current_number = self._generate_number()
+        self._next_round()
         return self.get_game_state()
 
     def submit_answer(self, answer: str) -> Tuple[bool, RoundingGameState]:
@@ -115,6 +132,7 @@ class RoundingGameEngine(BaseGameEngine):
         return {
             'score': state.score,
             'current_round': state.current_round,
+            'rng_seed': self.rng_seed,
             'current_number': state.current_number,
             'config': {
                 'max_number': self.max_number,
@@ -128,6 +146,7 @@ class RoundingGameEngine(BaseGameEngine):
         """Deserialize game state from a dictionary."""
         self.score = data.get('score', 0)
         self.current_round = data.get('current_round', 0)
+        self.seed_rng(data.get('rng_seed', self.rng_seed))
         self._current_number = data.get('current_number')
         config = data.get('config', {})
         self.max_number = config.get('max_number', 100)
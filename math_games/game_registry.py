@@ -1,58 +1,73 @@
 """© Cigav Productions LLC
 Game registry for managing and discovering available games."""
-from typing import Dict, Type, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Type, Optional
 from .base_game import BaseGameEngine
 
 
 class GameRegistry:
     """Registry for game engines."""
-    
+
     _games: Dict[str, Type[BaseGameEngine]] = {}
-    
+    # Read-only game_id -> info index, rebuilt copy-on-write whenever a game is (re)registered
+    _info: Mapping[str, Mapping[str, str]] = MappingProxyType({})
+
     @classmethod
     def register(cls, game_id: str, game_class: Type[BaseGameEngine]) -> None:
         """Register a game engine class."""
         cls._games[game_id] = game_class
-    
+        cls.invalidate(game_id)
+
+    @classmethod
+    def invalidate(cls, game_id: Optional[str] = None) -> None:
+        """Recompute cached game information for one game, or for all games."""
+        info = dict(cls._info)
+        game_ids = [game_id] if game_id is not None else list(cls._games.keys())
+        for gid in game_ids:
+            game_class = cls._games.get(gid)
+            if game_class is None:
+                info.pop(gid, None)
+            else:
+                info[gid] = cls._build_game_info(gid, game_class)
+        cls._info = MappingProxyType(info)
+
     @classmethod
     def get_game(cls, game_id: str) -> Optional[Type[BaseGameEngine]]:
         """Get a game engine class by ID."""
         return cls._games.get(game_id)
-    
+
     @classmethod
     def list_games(cls) -> Dict[str, Type[BaseGameEngine]]:
         """List all registered games."""
         return cls._games.copy()
-    
-    @classmethod
-    def get_game_info(cls, game_id: str) -> Optional[Dict[str, str]]:
-        """Get game information (name, description) by ID."""
-        game_class = cls.get_game(game_id)
-        if game_class is None:
-            return None
-        
-        # Create a temporary instance to get game info
+
+    @staticmethod
+    def _build_game_info(game_id: str, game_class: Type[BaseGameEngine]) -> Mapping[str, str]:
+        """Build game information (name, description) from a temporary instance."""
         # Use default config to avoid errors
         try:
             default_config = game_class.get_default_config()
             instance = game_class(**default_config)
-            return {
+            info = {
                 'id': game_id,
                 'name': instance.get_game_name(),
                 'description': instance.get_game_description()
             }
         except Exception:
             # Fallback if we can't instantiate
-            return {
+            info = {
                 'id': game_id,
                 'name': game_id.replace('_', ' ').title(),
                 'description': 'Math game'
             }
-    
+        return MappingProxyType(info)
+
+    @classmethod
+    def get_game_info(cls, game_id: str) -> Optional[Mapping[str, str]]:
+        """Get game information (name, description) by ID."""
+        return cls._info.get(game_id)
+
     @classmethod
-    def list_game_info(cls) -> Dict[str, Dict[str, str]]:
+    def list_game_info(cls) -> Mapping[str, Mapping[str, str]]:
         """List information for all registered games."""
-        return {
-            game_id: cls.get_game_info(game_id)
-            for game_id in cls._games.keys()
-        }
+        return cls._info
@@ -0,0 +1,80 @@
+"""© Cigav Productions LLC
+Shared lookup tables of greedy breakdowns, indexed by amount, per denomination set."""
+import threading
+from array import array
+from typing import Dict, Sequence, Tuple
+
+
+class GreedyTable:
+    """Greedy breakdowns (largest denomination first) of every amount from 0 up to a growing bound.
+
+    Counts are packed into one flat ``array`` with a row of ``len(denoms)`` counts per
+    amount, so a lookup is an indexed slice and the table holds no per-row Python
+    objects, which keeps its pages shared between forked workers. Tables grow on
+    demand up to ``MAX_AMOUNT``; larger amounts are computed directly.
+    """
+
+    MAX_AMOUNT = 100_000
+    INITIAL_SIZE = 1024
+    _tables: Dict[Tuple[int, ...], "GreedyTable"] = {}
+    _tables_lock = threading.Lock()
+
+    def __init__(self, denoms: Sequence[int]):
+        self.denoms = tuple(denoms)
+        self.width = len(self.denoms)
+        self._counts = array("I")
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_denoms(cls, denoms: Sequence[int]) -> "GreedyTable":
+        """Get (or create) the shared table for a denomination set."""
+        key = tuple(denoms)
+        table = cls._tables.get(key)
+        if table is None:
+            with cls._tables_lock:
+                table = cls._tables.setdefault(key, cls(key))
+        return table
+
+    def _compute(self, amount: int) -> Tuple[int, ...]:
+        counts = []
+        for den in self.denoms:
+            count, amount = divmod(amount, den)
+            counts.append(count)
+        return tuple(counts)
+
+    def _grow(self, amount: int) -> None:
+        with self._lock:
+            if amount < self._size:
+                return
+            size = max(self.INITIAL_SIZE, self._size)
+            while size <= amount:
+                size *= 2
+            size = min(size, self.MAX_AMOUNT + 1)
+            extra = array("I")
+            for value in range(self._size, size):
+                extra.extend(self._compute(value))
+            # Build the whole new array before publishing it so readers never see a partial table
+            self._counts = self._counts + extra
+            self._size = size
+
+    def _row(self, amount: int) -> Sequence[int]:
+        if amount <= 0:
+            return (0,) * self.width
+        if amount >= self._size:
+            if amount > self.MAX_AMOUNT:
+                return self._compute(amount)
+            self._grow(amount)
+        start = amount * self.width
+        return self._counts[start:start + self.width]
+
+    def breakdown(self, amount: int) -> Tuple[int, ...]:
+        """Counts in denomination order for ``amount`` (negative amounts count as 0)."""
+        return tuple(self._row(amount))
+
+    def breakdown_dict(self, amount: int) -> Dict[int, int]:
+        """``{denomination: count}`` form of :meth:`breakdown`."""
+        return dict(zip(self.denoms, self._row(amount)))
+
+    def __len__(self) -> int:
+        return self._size
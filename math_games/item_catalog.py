@@ -1,9 +1,9 @@
 """© Cigav Productions LLC
 Shared catalog and helpers for grocery/food items used across games."""
 
+import hashlib
 import random
-from typing import Any, Dict, List
-from urllib.parse import quote
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class ItemCatalog:
@@ -44,22 +44,44 @@ class ItemCatalog:
         {"name": "Diet Chocolate Bar", "min_price": 3, "max_price": 10, "color": "#8b5cf6", "emoji": "🍫"},
     ]
 
+    # item_id -> (svg bytes, etag); filled lazily by image_svg
+    _image_cache: Dict[int, Tuple[bytes, str]] = {}
+
     @classmethod
     def items(cls) -> List[Dict[str, Any]]:
         """Return the shared item catalog."""
         return cls.ITEMS
 
+    @classmethod
+    def get_item(cls, item_id: int) -> Optional[Dict[str, Any]]:
+        """Return the catalog item for an ID (its position in the catalog)."""
+        if 0 <= item_id < len(cls.ITEMS):
+            return cls.ITEMS[item_id]
+        return None
+
     @staticmethod
-    def build_image(label: str, color: str, emoji: str) -> str:
-        """Create an inline SVG data URI for the item card."""
-        svg = (
+    def render_svg(label: str, color: str, emoji: str) -> str:
+        """Render the SVG markup for an item card."""
+        return (
             f'<svg xmlns="http://www.w3.org/2000/svg" width="240" height="210" viewBox="0 0 240 210">'
             f'<rect width="240" height="210" rx="22" fill="{color}"/>'
             f'<text x="120" y="100" font-size="68" text-anchor="middle" dominant-baseline="middle">{emoji}</text>'
             f'<text x="120" y="178" font-size="24" text-anchor="middle" fill="#fff" font-family="Arial,sans-serif">{label}</text>'
             f"</svg>"
         )
-        return f"data:image/svg+xml;utf8,{quote(svg)}"
+
+    @classmethod
+    def image_svg(cls, item_id: int) -> Optional[Tuple[bytes, str]]:
+        """Return the rendered SVG bytes and ETag for an item, rendering it once."""
+        cached = cls._image_cache.get(item_id)
+        if cached is None:
+            item = cls.get_item(item_id)
+            if item is None:
+                return None
+            body = cls.render_svg(item["name"], item["color"], item["emoji"]).encode("utf-8")
+            cached = (body, hashlib.sha1(body).hexdigest()[:16])
+            cls._image_cache[item_id] = cached
+        return cached
 
     @staticmethod
     def choose_price(item: Dict[str, Any], max_price: int, rng: Any = None) -> int:
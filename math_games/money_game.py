@@ -1,15 +1,18 @@
 """© Cigav Productions LLC
 Money game where players build payments with $20, $5, and $1 bills."""
-import random
 import math
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
-from .base_game import BaseGameEngine, GameState as BaseGameState
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from .base_game import BaseGameEngine, GameState as BaseGameState, counts_tuple, state_dataclass
+from .batch import CountsBatch, counts_rows, greedy_breakdown, reference_rows
+from .greedy_table import GreedyTable
 from .item_catalog import ItemCatalog
+from .payment_solver import solve_payment
 
+BILL_DENOMS = (20, 10, 5, 1)
+UNLIMITED_BILLS = (999, 999, 999, 999)
 
-@dataclass
+
+@state_dataclass
 class MoneyGameState(BaseGameState):
     """Extended game state for the money game."""
     item_name: str
@@ -18,13 +21,25 @@ class MoneyGameState(BaseGameState):
     total_due: int
     tax_rate: float
     show_tax: bool
-    item_image: str
+    item_id: Optional[int]
     awaiting_retry: bool
-    available_counts: Dict[int, int]
+    available_bills: Tuple[int, ...]  # counts in BILL_DENOMS order
+
+    @property
+    def available_counts(self) -> Dict[int, int]:
+        return dict(zip(BILL_DENOMS, self.available_bills))
 
 
 class MoneyGameEngine(BaseGameEngine):
     """Game engine for building the best bill combination to match a price."""
+
+    BILL_DENOMS = BILL_DENOMS
+    SUPPORTS_ROUND_POOL = True
+    STATE_FIELDS = BaseGameEngine.STATE_FIELDS + (
+        'item_name', 'item_price', 'tax_amount', 'total_due', 'tax_rate', 'show_tax', 'item_id',
+        'awaiting_retry', 'available_counts',
+    )
+    STATE_COUNTS = {'available_counts': BILL_DENOMS}
     
     def __init__(
         self,
@@ -51,20 +66,16 @@ class MoneyGameEngine(BaseGameEngine):
         self._item_price: int = 0
         self._tax_amount: int = 0
         self._total_due: int = 0
-        self._item_image: str = ""
+        self._item_id: Optional[int] = None
         self._awaiting_retry: bool = False
         self._last_result: Dict[str, Any] = {}
-        self._available_counts: Dict[int, int] = {20: 999, 10: 999, 5: 999, 1: 999}
+        self._available_bills: Tuple[int, ...] = UNLIMITED_BILLS
+        self._round_best: Optional[Tuple[Dict[int, int], int]] = None
         self._items = ItemCatalog.items()
-        random.seed(datetime.now().timestamp())
-
-    def _build_item_image(self, label: str, color: str, emoji: str) -> str:
-        """Create a small inline SVG data URI for the item."""
-        return ItemCatalog.build_image(label, color, emoji)
 
     def _choose_price(self, item: Dict[str, Any]) -> int:
         """Choose a whole-dollar price for the given item honoring the max price cap."""
-        return ItemCatalog.choose_price(item, self.max_price, random)
+        return ItemCatalog.choose_price(item, self.max_price, self.rng)
 
     def _generate_limits(self, pay_total: float) -> Dict[int, int]:
         """Generate available bill counts based on difficulty."""
@@ -73,76 +84,127 @@ class MoneyGameEngine(BaseGameEngine):
         if self.bill_limit_mode == "intermediate":
             return {20: 1, 10: 2, 5: 3, 1: 4}
         for _ in range(20):
-            limits = {20: random.randint(0, 4), 10: random.randint(0, 4), 5: random.randint(0, 4), 1: random.randint(0, 4)}
+            limits = {20: self.rng.randint(0, 4), 10: self.rng.randint(0, 4), 5: self.rng.randint(0, 4), 1: self.rng.randint(0, 4)}
             capacity = limits[20]*20 + limits[10]*10 + limits[5]*5 + limits[1]
             if capacity >= math.ceil(pay_total):
                 return limits
         return {20: 2, 10: 2, 5: 3, 1: 5}
 
-    def _choose_item(self) -> None:
+    def _draw_round(self) -> Dict[str, Any]:
+        """Pick an item, price and bill limits for a new round."""
         for _ in range(30):
-            item = random.choice(self._items)
-            self._item_name = item["name"]
-            self._item_price = self._choose_price(item)
+            item_id = self.rng.randrange(len(self._items))
+            item = self._items[item_id]
+            item_price = self._choose_price(item)
             if self.show_tax:
-                raw_tax = self._item_price * self.tax_rate
-                self._tax_amount = round(raw_tax, 2)
+                raw_tax = item_price * self.tax_rate
+                tax_amount = round(raw_tax, 2)
             else:
-                self._tax_amount = 0.0
-            self._total_due = round(self._item_price + self._tax_amount, 2)
-            pay_total = math.ceil(self._total_due)
+                tax_amount = 0.0
+            total_due = round(item_price + tax_amount, 2)
+            pay_total = math.ceil(total_due)
             limits = self._generate_limits(pay_total)
             capacity = limits[20]*20 + limits[10]*10 + limits[5]*5 + limits[1]
             if capacity >= pay_total:
-                self._available_counts = limits
                 break
         else:
-            self._available_counts = {20: 2, 10: 2, 5: 3, 1: 5}
-        self._item_image = self._build_item_image(item["name"], item["color"], item["emoji"])
+            limits = {20: 2, 10: 2, 5: 3, 1: 5}
+        return {
+            "item_id": item_id,
+            "item_name": item["name"],
+            "item_price": item_price,
+            "tax_amount": tax_amount,
+            "total_due": total_due,
+            "available_counts": limits,
+        }
+
+    def generate_round(self) -> Dict[str, Any]:
+        """Pick an item, price and bill limits for a new round and solve its best payment."""
+        data = self._draw_round()
+        data["best_combo"], data["best_total"] = self._solve_best(data["total_due"], data["available_counts"])
+        return data
+
+    def generate_rounds(self, count: int) -> List[Dict[str, Any]]:
+        """Generate ``count`` rounds; without bill limits the best payments are one greedy breakdown."""
+        rounds = [self._draw_round() for _ in range(count)]
+        if self.bill_limit_mode != "easy":
+            for data in rounds:
+                data["best_combo"], data["best_total"] = self._solve_best(data["total_due"], data["available_counts"])
+            return rounds
+        targets = [math.ceil(data["total_due"]) for data in rounds]
+        for data, target, best in zip(rounds, targets, greedy_breakdown(targets, BILL_DENOMS)):
+            data["best_combo"] = dict(zip(BILL_DENOMS, best))
+            data["best_total"] = target
+        return rounds
+
+    def check_answers(self, rounds: Sequence[Dict[str, Any]], answers: Sequence[str]) -> List[bool]:
+        """Grade bill answers for a batch of rounds with the engine's payment rules."""
+        batch = CountsBatch(counts_rows(answers, BILL_DENOMS), BILL_DENOMS)
+        totals = batch.totals()
+        best_totals = [data["best_total"] for data in rounds]
+        pay_targets = [math.ceil(data["total_due"]) for data in rounds]
+        matches_best = batch.equals(reference_rows([data["best_combo"] for data in rounds], BILL_DENOMS))
+        over_limit = batch.exceeds(reference_rows([data["available_counts"] for data in rounds], BILL_DENOMS))
+        results = []
+        for total, best_total, pay_target, matches, over in zip(totals, best_totals, pay_targets, matches_best, over_limit):
+            # Same rules as submit_answer; when an exact payment exists best_total == pay_target
+            if over:
+                is_correct = False
+            elif self.require_minimal_bills:
+                is_correct = matches and total == best_total
+            elif self.allow_overpay:
+                is_correct = total >= pay_target or (matches and total == best_total)
+            else:
+                is_correct = total == best_total
+            results.append(is_correct)
+        return results
+
+    def load_round(self, data: Dict[str, Any]) -> None:
+        """Make the given round current."""
+        self._item_id = data["item_id"]
+        self._item_name = data["item_name"]
+        self._item_price = data["item_price"]
+        self._tax_amount = data["tax_amount"]
+        self._total_due = data["total_due"]
+        self._available_bills = counts_tuple(data["available_counts"], BILL_DENOMS)
+        self._round_best = (dict(data["best_combo"]), data["best_total"])
         self._awaiting_retry = False
 
+    def _choose_item(self) -> None:
+        self._next_round()
+
     def _best_combo(self, amount: float) -> Dict[int, int]:
         """Return the optimal bill breakdown for paying at least the amount (ceiled)."""
-        remaining = math.ceil(amount)
-        twenties = remaining // 20
-        remaining = remaining % 20
-        tens = remaining // 10
-        remaining = remaining % 10
-        fives = remaining // 5
-        ones = remaining % 5
-        return {20: twenties, 10: tens, 5: fives, 1: ones}
+        return GreedyTable.for_denoms(BILL_DENOMS).breakdown_dict(math.ceil(amount))
 
     def _best_combo_with_limits(self, amount: float, available: Dict[int, int]) -> Tuple[Dict[int, int], int]:
         """Return minimal payable total >= amount within availability; tie-break on fewest bills."""
         available = {int(k): v for k, v in available.items()}
         target = math.ceil(amount)
-        best_combo: Dict[int, int] = {20: 0, 10: 0, 5: 0, 1: 0}
-        best_total = None
-        best_bills = None
-        for c20 in range(available.get(20, 0) + 1):
-            for c10 in range(available.get(10, 0) + 1):
-                for c5 in range(available.get(5, 0) + 1):
-                    for c1 in range(available.get(1, 0) + 1):
-                        total = c20 * 20 + c10 * 10 + c5 * 5 + c1
-                        if total < target:
-                            continue
-                        bills = c20 + c10 + c5 + c1
-                        if best_total is None or total < best_total or (total == best_total and bills < best_bills):
-                            best_total = total
-                            best_bills = bills
-                            best_combo = {20: c20, 10: c10, 5: c5, 1: c1}
+        counts = tuple(available.get(den, 0) for den in self.BILL_DENOMS)
+        result = solve_payment(target, self.BILL_DENOMS, counts)
         # If nothing found (should not happen because we guard capacity), fall back to zeros
-        if best_total is None:
+        if result is None:
             return {20: 0, 10: 0, 5: 0, 1: 0}, 0
-        return best_combo, best_total
+        best_counts, best_total = result
+        return dict(zip(self.BILL_DENOMS, best_counts)), best_total
+    
+    def _solve_best(self, amount: float, available: Dict[int, int]) -> Tuple[Dict[int, int], int]:
+        """Best bill combo and its total for the amount under the current limit mode."""
+        if self.bill_limit_mode != "easy":
+            return self._best_combo_with_limits(amount, available)
+        return self._best_combo(amount), math.ceil(amount)
+
+    def _current_best(self) -> Tuple[Dict[int, int], int]:
+        """Best combo for the current round, reusing the one solved when it was generated."""
+        if self._round_best is None:
+            self._round_best = self._solve_best(self._total_due, dict(zip(BILL_DENOMS, self._available_bills)))
+        combo, total = self._round_best
+        return dict(combo), total
     
     def get_best_combo(self) -> Dict[int, int]:
         """Public helper for the best combo of the current total."""
-        if self.bill_limit_mode != "easy":
-            avail = getattr(self, "_available_counts", {20:999,10:999,5:999,1:999})
-            combo, _ = self._best_combo_with_limits(self._total_due, {int(k): v for k, v in avail.items()})
-            return combo
-        return self._best_combo(self._total_due)
+        return self._current_best()[0]
 
     def _parse_answer(self, answer: str) -> Dict[int, int]:
         """Parse an answer string like '20:2,5:1,1:3' into counts."""
@@ -175,9 +237,9 @@ class MoneyGameEngine(BaseGameEngine):
             total_due=self._total_due,
             tax_rate=self.tax_rate,
             show_tax=self.show_tax,
-            item_image=self._item_image,
+            item_id=self._item_id,
             awaiting_retry=self._awaiting_retry,
-            available_counts=self._available_counts if hasattr(self, "_available_counts") else {20:999,10:999,5:999,1:999}
+            available_bills=self._available_bills,
         )
 
     def start_round(self) -> Optional[MoneyGameState]:
@@ -201,13 +263,8 @@ class MoneyGameEngine(BaseGameEngine):
             + counts[1] * 1
         )
         pay_target = math.ceil(self._total_due)
-        available_raw = getattr(self, "_available_counts", {20: 999, 10: 999, 5: 999, 1: 999})
-        available = {int(k): v for k, v in available_raw.items()}
-        if self.bill_limit_mode != "easy":
-            best_combo, best_total = self._best_combo_with_limits(self._total_due, available)
-        else:
-            best_combo = self._best_combo(self._total_due)
-            best_total = pay_target
+        available = dict(zip(BILL_DENOMS, self._available_bills))
+        best_combo, best_total = self._current_best()
         # Pre-store the latest submission for debugging/inspection even if it fails validation
         self._last_result = {
             "counts": counts,
@@ -313,15 +370,16 @@ class MoneyGameEngine(BaseGameEngine):
         return {
             "score": state.score,
             "current_round": state.current_round,
+            "rng_seed": self.rng_seed,
             "item_name": state.item_name,
             "item_price": state.item_price,
             "tax_amount": state.tax_amount,
             "total_due": state.total_due,
             "tax_rate": state.tax_rate,
             "show_tax": state.show_tax,
-            "item_image": state.item_image,
+            "item_id": state.item_id,
             "awaiting_retry": state.awaiting_retry,
-            "available_counts": getattr(self, "_available_counts", {20: 999, 10: 999, 5: 999, 1: 999}),
+            "available_counts": dict(zip(BILL_DENOMS, self._available_bills)),
             "config": {
                 "max_price": self.max_price,
                 "rounds": self.rounds,
@@ -337,15 +395,17 @@ class MoneyGameEngine(BaseGameEngine):
         """Deserialize game state from a dictionary."""
         self.score = data.get("score", 0)
         self.current_round = data.get("current_round", 0)
+        self.seed_rng(data.get("rng_seed", self.rng_seed))
         self._item_name = data.get("item_name")
         self._item_price = data.get("item_price", 0)
         self._tax_amount = data.get("tax_amount", 0)
         self._total_due = data.get("total_due", 0)
         self.tax_rate = data.get("tax_rate", self._config.get("tax_rate", 0.08))
         self.show_tax = data.get("show_tax", self._config.get("show_tax", True))
-        avail = data.get("available_counts", {20: 999, 10: 999, 5: 999, 1: 999})
-        self._available_counts = {int(k): v for k, v in avail.items()}
-        self._item_image = data.get("item_image", "")
+        avail = data.get("available_counts")
+        self._available_bills = UNLIMITED_BILLS if avail is None else counts_tuple(avail, BILL_DENOMS)
+        self._round_best = None
+        self._item_id = data.get("item_id")
         self._awaiting_retry = data.get("awaiting_retry", False)
         config = data.get("config", {})
         self.max_price = config.get("max_price", self.max_price)
@@ -0,0 +1,87 @@
+"""© Cigav Productions LLC
+Bounded-knapsack solver for paying an amount from a limited set of bills."""
+import math
+from functools import lru_cache, reduce
+from typing import Optional, Tuple
+
+
+def _split_counts(count: int) -> Tuple[int, ...]:
+    """Split a bounded count into power-of-two chunks (1, 2, 4, ..., rest)."""
+    chunks = []
+    size = 1
+    while count > 0:
+        take = min(size, count)
+        chunks.append(take)
+        count -= take
+        size *= 2
+    return tuple(chunks)
+
+
+def solve_payment(
+    target: int,
+    denoms: Tuple[int, ...],
+    available: Tuple[int, ...],
+    prefer_largest: bool = False,
+) -> Optional[Tuple[Tuple[int, ...], int]]:
+    """Return ``(counts, total)`` for the smallest payable total >= target.
+
+    ``counts`` follows the order of ``denoms``. Ties on the total are broken by
+    the fewest bills, then by the fewest of ``denoms[0]`` (or the most, with
+    ``prefer_largest``), then the fewest of each remaining denomination in order.
+    Returns None when the available bills cannot cover the target.
+
+    The best total is always below ``target + max(denoms)`` (otherwise a bill
+    could be dropped), so the search runs over amounts up to that bound and
+    costs O(amount * log(count)) instead of the product of all counts.
+    """
+    target = max(0, int(target))
+    unit = reduce(math.gcd, denoms)
+    units = tuple(d // unit for d in denoms)
+    goal = -(-target // unit)
+    result = _solve_units(goal, units, tuple(available), prefer_largest)
+    if result is None:
+        return None
+    counts, total = result
+    return counts, total * unit
+
+
+@lru_cache(maxsize=16384)
+def _solve_units(
+    goal: int,
+    units: Tuple[int, ...],
+    available: Tuple[int, ...],
+    prefer_largest: bool,
+) -> Optional[Tuple[Tuple[int, ...], int]]:
+    """Solve in units of the denominations' GCD so cents and dollars share cache entries."""
+    limit = goal + max(units) - 1
+    capacity = sum(u * max(0, a) for u, a in zip(units, available))
+    if capacity < goal:
+        return None
+    limit = min(limit, capacity)
+
+    signs = tuple(-1 if (prefer_largest and i == 0) else 1 for i in range(len(units)))
+    # best[t] holds the lexicographically smallest (bills, signed counts...) key for total t
+    best: list = [None] * (limit + 1)
+    best[0] = (0,) + (0,) * len(units)
+    for i, (u, count) in enumerate(zip(units, available)):
+        count = min(max(0, count), limit // u)
+        for k in _split_counts(count):
+            weight = u * k
+            for t in range(limit, weight - 1, -1):
+                prev = best[t - weight]
+                if prev is None:
+                    continue
+                cand = list(prev)
+                cand[0] += k
+                cand[i + 1] += signs[i] * k
+                cand = tuple(cand)
+                current = best[t]
+                if current is None or cand < current:
+                    best[t] = cand
+
+    for t in range(goal, limit + 1):
+        key = best[t]
+        if key is not None:
+            counts = tuple(s * c for s, c in zip(signs, key[1:]))
+            return counts, t
+    return None
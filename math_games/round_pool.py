@@ -0,0 +1,111 @@
+"""© Cigav Productions LLC
+Pools of pre-generated rounds, shared per game configuration."""
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple, Type
+from .base_game import BaseGameEngine
+
+
+class RoundPool:
+    """Buffer of pre-generated rounds, refilled in the background when it runs low."""
+
+    def __init__(
+        self,
+        generate: Callable[[], Dict[str, Any]],
+        size: int = 128,
+        refill_at: int = 32,
+        generate_batch: Optional[Callable[[int], List[Dict[str, Any]]]] = None,
+    ):
+        """Initialize the pool with a round generator, a target size, a refill threshold and an optional batch generator."""
+        self.generate = generate
+        self.generate_batch = generate_batch
+        self.size = size
+        self.refill_at = refill_at
+        self._rounds: Deque[Dict[str, Any]] = deque()
+        # Serializes generate() calls; the refill flag has its own lock so draws never wait on generation
+        self._generate_lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._refilling = False
+
+    def take(self) -> Dict[str, Any]:
+        """Pop a pre-generated round, generating one on the spot if the pool is empty."""
+        try:
+            data = self._rounds.popleft()
+        except IndexError:
+            data = None
+        if len(self._rounds) < self.refill_at:
+            self._start_refill()
+        if data is None:
+            with self._generate_lock:
+                data = self.generate()
+        return data
+
+    def fill(self) -> None:
+        """Generate rounds until the pool is full."""
+        while len(self._rounds) < self.size:
+            if self.generate_batch is not None:
+                # Built off the lock so draws from an empty pool never wait for a whole batch
+                batch = self.generate_batch(self.size - len(self._rounds))
+                self._rounds.extend(batch)
+                continue
+            with self._generate_lock:
+                data = self.generate()
+            self._rounds.append(data)
+
+    def _start_refill(self) -> None:
+        """Refill the pool on a daemon thread unless a refill is already running."""
+        with self._refill_lock:
+            if self._refilling:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, daemon=True).start()
+
+    def _refill(self) -> None:
+        try:
+            self.fill()
+        finally:
+            self._refilling = False
+
+    def __len__(self) -> int:
+        return len(self._rounds)
+
+
+class RoundPoolRegistry:
+    """Registry of round pools keyed by game class and configuration."""
+
+    MAX_POOLS = 64
+    _pools: "OrderedDict[Tuple[Type[BaseGameEngine], Hashable], RoundPool]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _config_key(config: Dict[str, Any]) -> Hashable:
+        return tuple(sorted(config.items()))
+
+    @classmethod
+    def get_pool(cls, game_class: Type[BaseGameEngine], config: Dict[str, Any]) -> Optional[RoundPool]:
+        """Get (or create) the round pool for a game class and config, or None if the game does not support round pools."""
+        if not game_class.SUPPORTS_ROUND_POOL:
+            return None
+        try:
+            key = (game_class, cls._config_key(config))
+            hash(key)
+        except TypeError:
+            return None
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is not None:
+                cls._pools.move_to_end(key)
+                return pool
+            # A dedicated engine generates the rounds so player engines are never shared across threads
+            engine = game_class(**config)
+            pool = RoundPool(engine.generate_round, generate_batch=engine.generate_rounds)
+            cls._pools[key] = pool
+            while len(cls._pools) > cls.MAX_POOLS:
+                cls._pools.popitem(last=False)
+        return pool
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all pools."""
+        with cls._lock:
+            cls._pools.clear()
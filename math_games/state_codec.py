@@ -0,0 +1,163 @@
+"""© Cigav Productions LLC
+Compact, versioned encoding of serialized game state, driven by each engine's STATE_FIELDS."""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from .base_game import BaseGameEngine
+from .game_registry import GameRegistry
+
+try:
+    import msgpack
+except ImportError:  # optional; compact JSON arrays are used instead
+    msgpack = None
+
+# Schema: (state fields, {counts field: denominations}, config fields)
+Schema = Tuple[Tuple[str, ...], Dict[str, Tuple[int, ...]], Tuple[str, ...]]
+
+# JSON object keys are always strings, so the JSON form writes any dict with other keys as
+# ``{_KEYED: [[key, value], ...]}``; msgpack keeps int keys natively
+_KEYED = "__keyed__"
+_SCALAR_KEYS = (str, int, float, bool, type(None))
+
+
+def _to_json(value: Any) -> Any:
+    """``value`` with every dict whose keys JSON would stringify rewritten as key/value pairs."""
+    if isinstance(value, dict):
+        if all(type(k) is str for k in value) and _KEYED not in value:
+            return {k: _to_json(v) for k, v in value.items()}
+        for k in value:
+            if not isinstance(k, _SCALAR_KEYS):
+                raise TypeError(f"Unsupported state dict key {k!r}")
+        return {_KEYED: [[k, _to_json(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+def _from_json(obj: Dict[str, Any]) -> Any:
+    """``json.loads`` object hook undoing :func:`_to_json`."""
+    if len(obj) == 1 and _KEYED in obj:
+        return {k: v for k, v in obj[_KEYED]}
+    return obj
+
+
+class StateCodec:
+    """Encodes state dicts as positional arrays: ``[format, game_id, state_version, mask, *values, extras?]``.
+
+    ``mask`` has bit ``i`` set when ``STATE_FIELDS[i]`` is present, so absent keys cost
+    nothing and fields appended to a schema keep older blobs readable. Denomination
+    count dicts become count lists in a fixed order, the config becomes a nested
+    positional array keyed by the game's default config, and keys outside the schema
+    travel in a trailing extras dict so encoding is lossless. Blobs are msgpack when
+    it is installed, compact JSON otherwise (non-string dict keys, e.g. denominations
+    outside STATE_COUNTS, survive both); the first byte records which.
+    """
+
+    FORMAT_VERSION = 1
+    _MSGPACK = b"M"
+    _JSON = b"J"
+    _schemas: Dict[Type[BaseGameEngine], Schema] = {}
+
+    @classmethod
+    def schema(cls, game_class: Type[BaseGameEngine]) -> Schema:
+        """Field layout for an engine class (cached)."""
+        schema = cls._schemas.get(game_class)
+        if schema is None:
+            counts = {name: tuple(denoms) for name, denoms in game_class.STATE_COUNTS.items()}
+            schema = (tuple(game_class.STATE_FIELDS), counts, tuple(game_class.get_default_config()))
+            cls._schemas[game_class] = schema
+        return schema
+
+    @staticmethod
+    def _pack_counts(value: Dict[Any, int], denoms: Tuple[int, ...]) -> Any:
+        if not all(type(k) is int and k in denoms for k in value):
+            return value
+        return [value.get(den) for den in denoms]
+
+    @staticmethod
+    def _unpack_counts(value: Any, denoms: Tuple[int, ...]) -> Any:
+        if not isinstance(value, list):
+            return value
+        return {den: cnt for den, cnt in zip(denoms, value) if cnt is not None}
+
+    @classmethod
+    def _pack(cls, state: Dict[str, Any], fields: Sequence[str], counts: Dict[str, Tuple[int, ...]],
+              config_fields: Optional[Sequence[str]]) -> List[Any]:
+        mask = 0
+        values: List[Any] = [0]
+        for i, name in enumerate(fields):
+            if name not in state:
+                continue
+            mask |= 1 << i
+            value = state[name]
+            if name in counts and isinstance(value, dict):
+                value = cls._pack_counts(value, counts[name])
+            elif name == "config" and config_fields is not None and isinstance(value, dict):
+                value = cls._pack(value, config_fields, {}, None)
+            values.append(value)
+        values[0] = mask
+        if len(state) > len(values) - 1:
+            extras = {k: v for k, v in state.items() if k not in fields}
+            if extras:
+                values.append(extras)
+        return values
+
+    @classmethod
+    def _unpack(cls, values: List[Any], fields: Sequence[str], counts: Dict[str, Tuple[int, ...]],
+                config_fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+        mask = values[0]
+        state: Dict[str, Any] = {}
+        pos = 1
+        i = 0
+        while mask:
+            if mask & 1:
+                if i >= len(fields):
+                    raise ValueError("State blob has fields beyond the schema")
+                name = fields[i]
+                value = values[pos]
+                pos += 1
+                if name in counts:
+                    value = cls._unpack_counts(value, counts[name])
+                elif name == "config" and config_fields is not None and isinstance(value, list):
+                    value = cls._unpack(value, config_fields, {}, None)
+                state[name] = value
+            mask >>= 1
+            i += 1
+        if pos < len(values):
+            state.update(values[pos])
+        return state
+
+    @classmethod
+    def encode(cls, game_id: str, state: Dict[str, Any]) -> bytes:
+        """Encode a state dict (engine serialize_state() or handler session state) for a registered game."""
+        game_class = GameRegistry.get_game(game_id)
+        if game_class is None:
+            raise KeyError(f"Unknown game: {game_id}")
+        fields, counts, config_fields = cls.schema(game_class)
+        payload = [cls.FORMAT_VERSION, game_id, game_class.STATE_VERSION]
+        payload.extend(cls._pack(state, fields, counts, config_fields))
+        if msgpack is not None:
+            return cls._MSGPACK + msgpack.packb(payload, use_bin_type=True)
+        return cls._JSON + json.dumps(_to_json(payload), separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def decode(cls, blob: bytes) -> Tuple[str, Dict[str, Any]]:
+        """Decode a blob from :meth:`encode` into ``(game_id, state)``."""
+        tag, body = blob[:1], blob[1:]
+        if tag == cls._JSON:
+            payload = json.loads(body, object_hook=_from_json)
+        elif tag == cls._MSGPACK:
+            if msgpack is None:
+                raise ValueError("State blob is msgpack-encoded but msgpack is not installed")
+            payload = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        else:
+            raise ValueError("Unrecognized state blob")
+        fmt, game_id, version = payload[0], payload[1], payload[2]
+        if fmt != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported state format version {fmt}")
+        game_class = GameRegistry.get_game(game_id)
+        if game_class is None:
+            raise KeyError(f"Unknown game: {game_id}")
+        if version != game_class.STATE_VERSION:
+            raise ValueError(f"Unsupported {game_id} state version {version}")
+        fields, counts, config_fields = cls.schema(game_class)
+        return game_id, cls._unpack(payload[3:], fields, counts, config_fields)
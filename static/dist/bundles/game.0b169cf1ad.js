@@ -0,0 +1,35 @@
+/* © Cigav Productions LLC */
+const pageData=GameCommon.pageData();document.addEventListener('DOMContentLoaded',function(){const factorButtons=document.querySelectorAll('.factor-btn');const factorInput=document.getElementById('factor');function setFactorSelection(val){if(!factorButtons||!factorButtons.length)return;factorButtons.forEach(btn=>{const isSelected=btn.getAttribute('data-value')===String(val);btn.classList.toggle('selected',isSelected);});if(factorInput)factorInput.value=val;}
+if(factorButtons&&factorInput){factorButtons.forEach(btn=>{btn.addEventListener('click',function(){const val=this.getAttribute('data-value');if(val)setFactorSelection(val);});});}
+function setupStepper(minusSelector,plusSelector,inputSelector){const minus=document.querySelector(minusSelector);const plus=document.querySelector(plusSelector);const input=document.querySelector(inputSelector);if(minus&&plus&&input){minus.addEventListener('click',()=>{const val=Math.max(parseInt(input.value||'0')-1,parseInt(input.min||'1'));input.value=val;});plus.addEventListener('click',()=>{const val=parseInt(input.value||'0')+1;input.value=val;});}}
+setupStepper('.step-minus','.step-plus','#rounds');setupStepper('.max-minus','.max-plus','#max_number');const configContainer=document.getElementById('config-container');const playSection=document.getElementById('play-section');const overSection=document.getElementById('over-section');const gameContainer=document.getElementById('game-container');const startBtn=document.getElementById('start-game-btn');const messagesBox=document.getElementById('messages-box');const roundInfo=document.getElementById('round-info');const numberAxis=document.getElementById('axis-number');const numberSimple=document.getElementById('simple-number');const scoreBox=document.getElementById('score-box');const historyRecent=document.getElementById('history-recent');const historyAll=document.getElementById('history-all');const restartBtn=document.getElementById('restart-ajax');const footerRestart=document.getElementById('footer-restart');const axisContainer=document.getElementById('axis-container');const simpleContainer=document.getElementById('simple-container');const btnUp=document.getElementById('interactive-up');const btnDown=document.getElementById('interactive-down');const btnUpSimple=document.getElementById('interactive-up-simple');const btnDownSimple=document.getElementById('interactive-down-simple');const answerButtons=[btnUp,btnDown,btnUpSimple,btnDownSimple].filter(Boolean);const playWrapper=document.getElementById('play-wrapper');const playShell=document.getElementById('play-shell');function syncFooterRestart(){if(!footerRestart||!gameContainer)return;const active=gameContainer.dataset.active==='true';const over=gameContainer.dataset.over==='true';footerRestart.style.visibility=(active||over)?'visible':'hidden';}
+function applyOrientationLayout(){if(!playWrapper)return;const portrait=window.innerHeight>window.innerWidth;playWrapper.classList.toggle('portrait',portrait);if(playShell)playShell.classList.toggle('portrait',portrait);if(portrait){playWrapper.style.maxWidth='540px';if(playShell)playShell.style.margin='0 auto';}else{playWrapper.style.maxWidth='100%';if(playShell)playShell.style.margin='18px 0';}
+if(messagesBox){messagesBox.style.maxWidth='640px';messagesBox.style.alignSelf=portrait?'center':'stretch';}
+if(axisContainer){axisContainer.style.height=portrait?'420px':'520px';}}
+function renderHistory(list,target){if(!target)return;target.innerHTML='';(list||[]).forEach(entry=>{const div=document.createElement('div');div.className='history-item';div.innerHTML=`
+                <span class="history-number">${entry.number}</span>
+                <span class="history-answer">${entry.answer === 'up' ? '&#9650; Up' : '&#9660; Down'}</span>
+                <span class="history-result ${entry.is_correct ? 'correct' : 'incorrect'}">${entry.is_correct ? 'Correct 👍' : 'Incorrect 👎'}</span>
+            `;target.appendChild(div);});}
+const submitAjax=GameCommon.submitAjax;function renderAxis(maxNum,factor,currentNum,showAxis){if(!axisContainer||!simpleContainer)return;axisContainer.innerHTML='';if(showAxis){axisContainer.style.display='block';simpleContainer.style.display='none';const wrapper=document.createElement('div');wrapper.style.position='absolute';wrapper.style.left='32px';wrapper.style.top='0';wrapper.style.bottom='0';wrapper.style.width='110px';wrapper.style.borderLeft='3px solid #94a3b8';wrapper.style.background='linear-gradient(180deg, rgba(255,255,255,0.04), rgba(255,255,255,0))';wrapper.style.borderRadius='8px';axisContainer.appendChild(wrapper);const last_tick=Math.floor(maxNum/factor)*factor;for(let val=0;val<=maxNum;val+=factor){const pct=maxNum>0?(val/maxNum)*100:0;const tick=document.createElement('div');tick.style.position='absolute';tick.style.left='0';tick.style.width='100%';tick.style.bottom=pct+'%';tick.style.display='flex';tick.style.alignItems='center';tick.style.gap='8px';tick.style.transform='translateY(50%)';tick.innerHTML=`<div style="height:3px; width:18px; background:#94a3b8;"></div><div style="font-size:20px; color:#475569; font-weight:800;">${val}</div>`;wrapper.appendChild(tick);}
+if(last_tick!==maxNum){const pct=maxNum>0?100:0;const tick=document.createElement('div');tick.style.position='absolute';tick.style.left='0';tick.style.width='100%';tick.style.bottom=pct+'%';tick.style.display='flex';tick.style.alignItems='center';tick.style.gap='8px';tick.style.transform='translateY(50%)';tick.innerHTML=`<div style="height:3px; width:18px; background:#94a3b8;"></div><div style="font-size:20px; color:#475569; font-weight:800;">${maxNum}</div>`;wrapper.appendChild(tick);}
+const bottomDot=document.createElement('div');bottomDot.style.position='absolute';bottomDot.style.left='-8px';bottomDot.style.bottom='-6px';bottomDot.style.width='16px';bottomDot.style.height='16px';bottomDot.style.background='#94a3b8';bottomDot.style.borderRadius='50%';wrapper.appendChild(bottomDot);const topDot=document.createElement('div');topDot.style.position='absolute';topDot.style.left='-8px';topDot.style.top='-8px';topDot.style.width='16px';topDot.style.height='16px';topDot.style.background='#94a3b8';topDot.style.borderRadius='50%';topDot.style.opacity='0.6';wrapper.appendChild(topDot);if(currentNum!==null&&currentNum!==undefined&&maxNum>0){const pct=(currentNum/maxNum)*100;const arrow=document.createElement('div');arrow.style.position='absolute';arrow.style.left='-86px';arrow.style.bottom=pct+'%';arrow.style.transform='translateY(50%)';arrow.style.width='84px';arrow.style.height='52px';arrow.style.background="url(\"data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 120 80'><path d='M0 40 L80 40 L80 10 L120 40 L80 70 L80 40 L0 40 Z' fill='%23e11d48' stroke='%23ffffff' stroke-width='6'/></svg>\") center/contain no-repeat";arrow.style.filter='drop-shadow(0 0 10px rgba(225,29,72,0.55))';wrapper.appendChild(arrow);}}else{axisContainer.style.display='none';simpleContainer.style.display='flex';}}
+function updateState(data){const msgs=data.messages||[];if(roundInfo){if(msgs.length){roundInfo.textContent=msgs[0];}else if(data.current_round!==undefined&&data.total_rounds!==undefined){roundInfo.textContent=`Round ${data.current_round}/${data.total_rounds}`;}}
+if(numberAxis)numberAxis.textContent=data.number??'?';if(numberSimple)numberSimple.textContent=data.number??'?';if(scoreBox&&data.score!==undefined){const total=data.total_rounds!==undefined?data.total_rounds:data.current_round;scoreBox.textContent=`Score: ${data.score} / ${total}`;}
+if(messagesBox){if(data.game_over){messagesBox.innerHTML='';messagesBox.style.display='none';}else{messagesBox.style.display='block';messagesBox.innerHTML='';msgs.slice(1).forEach((m)=>{const div=document.createElement('div');div.className='message';div.textContent=m;messagesBox.appendChild(div);});}}
+renderHistory(data.history||[],historyRecent);renderHistory(data.history||[],historyAll);const showAxisVal=data.show_axis!==undefined?data.show_axis:(gameContainer?.dataset.showAxis==='true');if(gameContainer){if(data.factor!==undefined)gameContainer.dataset.factor=data.factor;if(data.max_number!==undefined)gameContainer.dataset.max=data.max_number;gameContainer.dataset.showAxis=showAxisVal?'true':'false';if(data.game_active!==undefined)gameContainer.dataset.active=data.game_active?'true':'false';if(data.game_over!==undefined)gameContainer.dataset.over=data.game_over?'true':'false';}
+if(data.factor!==undefined)setFactorSelection(data.factor);renderAxis(Number(gameContainer?.dataset.max||100),Number(gameContainer?.dataset.factor||10),data.number,showAxisVal);if(data.config){if(document.getElementById('rounds')&&data.config.rounds!==undefined)document.getElementById('rounds').value=data.config.rounds;if(document.getElementById('max_number')&&data.config.max_number!==undefined)document.getElementById('max_number').value=data.config.max_number;if(typeof data.config.show_axis==='boolean'){const cb=document.getElementById('show_axis');if(cb)cb.checked=!!data.config.show_axis;}}
+applyOrientationLayout();if(configContainer&&playSection&&overSection&&gameContainer){const isActive=gameContainer.dataset.active==='true';const isOver=gameContainer.dataset.over==='true';if(isActive){configContainer.style.display='none';playSection.style.display='block';overSection.style.display='none';}else if(isOver){configContainer.style.display='none';playSection.style.display='none';overSection.style.display='block';}else{configContainer.style.display='block';playSection.style.display='none';overSection.style.display='none';}}
+syncFooterRestart();}
+async function handleAnswer(ans){try{const data=await submitAjax('answer',{answer:ans});updateState(data);if(data.game_over&&playSection&&overSection){playSection.style.display='none';overSection.style.display='block';if(restartBtn)restartBtn.style.display='block';if(gameContainer){gameContainer.dataset.active='false';gameContainer.dataset.over='true';}
+syncFooterRestart();}else{if(playSection)playSection.style.display='block';if(overSection)overSection.style.display='none';}}catch(err){console.error(err);alert('Could not submit. Please try again.');}}
+if(answerButtons.length){answerButtons.forEach(btn=>{btn.addEventListener('click',()=>{const ans=btn.getAttribute('data-answer');if(ans)handleAnswer(ans);});});}
+if(startBtn){startBtn.addEventListener('click',async(e)=>{e.preventDefault();startBtn.disabled=true;const rounds=document.getElementById('rounds')?.value;const maxNum=document.getElementById('max_number')?.value;const factorVal=factorInput?.value;const showAxisVal=document.getElementById('show_axis')?.checked;try{const data=await submitAjax('start_game',{rounds,max_number:maxNum,factor:factorVal,show_axis:showAxisVal});updateState(data);if(configContainer)configContainer.style.display='none';if(playSection)playSection.style.display='block';if(overSection)overSection.style.display='none';if(restartBtn)restartBtn.style.display='none';}catch(err){console.error(err);alert('Could not start game. Please try again.\n'+err.message);}finally{startBtn.disabled=false;}});}
+if(restartBtn){restartBtn.style.display=(gameContainer?.dataset.active==='true'||gameContainer?.dataset.over==='true')?'block':'none';restartBtn.addEventListener('click',async()=>{try{const data=await submitAjax('restart',{});updateState(data);if(playSection)playSection.style.display='block';if(overSection)overSection.style.display='none';if(configContainer)configContainer.style.display='none';if(restartBtn)restartBtn.style.display='none';}catch(err){console.error(err);alert('Could not restart. Please try again.');}});}
+async function resetToConfig(){try{const data=await submitAjax('reset_to_config',{});if(data.config){if(document.getElementById('rounds')&&data.config.rounds!==undefined)document.getElementById('rounds').value=data.config.rounds;if(document.getElementById('max_number')&&data.config.max_number!==undefined)document.getElementById('max_number').value=data.config.max_number;if(typeof data.config.show_axis==='boolean'){const cb=document.getElementById('show_axis');if(cb)cb.checked=!!data.config.show_axis;}
+if(data.config.factor!==undefined)setFactorSelection(data.config.factor);}
+if(gameContainer){gameContainer.dataset.active='false';gameContainer.dataset.over='false';}
+if(configContainer)configContainer.style.display='block';if(playSection)playSection.style.display='none';if(overSection)overSection.style.display='none';if(messagesBox)messagesBox.innerHTML='';if(roundInfo)roundInfo.textContent='';syncFooterRestart();}catch(err){console.error(err);alert('Could not restart. Please try again.');}}
+const fsBtn=document.getElementById('fullscreen-btn');const fsText=()=>{if(fsBtn){const isFs=document.fullscreenElement||document.webkitFullscreenElement||document.mozFullScreenElement||document.msFullscreenElement;fsBtn.textContent=isFs?'Exit full screen':'Full screen';}};if(fsBtn){fsBtn.addEventListener('click',GameCommon.toggleFullscreen);document.addEventListener('fullscreenchange',fsText);document.addEventListener('webkitfullscreenchange',fsText);fsText();}
+if(footerRestart){footerRestart.addEventListener('click',(e)=>{e.preventDefault();resetToConfig();});}
+const initMax=Number(gameContainer?.dataset.max||100);const initFactor=Number(gameContainer?.dataset.factor||10);const initShowAxis=(gameContainer&&gameContainer.dataset.showAxis==='true');setFactorSelection(initFactor);renderAxis(initMax,initFactor,pageData.currentNumber,initShowAxis);syncFooterRestart();applyOrientationLayout();window.addEventListener('resize',applyOrientationLayout);});
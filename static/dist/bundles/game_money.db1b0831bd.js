@@ -0,0 +1,53 @@
+/* © Cigav Productions LLC */
+const pageData=GameCommon.pageData();document.addEventListener('DOMContentLoaded',function(){const app=document.getElementById('money-app');const configPanel=document.getElementById('config-panel');const playPanel=document.getElementById('play-panel');const overPanel=document.getElementById('over-panel');const playShell=document.getElementById('play-shell');const playWrapper=document.getElementById('play-wrapper');const configForm=document.getElementById('config-form');const startBtn=document.getElementById('start-game-btn');const submitBtn=document.getElementById('submit-btn');const skipBtn=document.getElementById('skip-btn');const restartBtn=document.getElementById('restart-btn');const overResetBtn=document.getElementById('over-reset-btn');const footerRestart=document.getElementById('footer-restart');const fsBtn=document.getElementById('fullscreen-btn');const roundChip=document.getElementById('round-chip');const scoreChip=document.getElementById('score-chip');const itemPriceEl=document.getElementById('item-price');const taxInfo=document.getElementById('tax-info');const requireHint=document.getElementById('require-hint');const totalDueEl=document.getElementById('total-due');const selectedTotal=document.getElementById('selected-total');const deltaEl=document.getElementById('delta');const messagesBox=document.getElementById('messages-box');const historyRecent=document.getElementById('history-list');const historyAll=document.getElementById('history-all');const finalScore=document.getElementById('final-score');const itemImg=document.getElementById('item-image');const answerField=document.getElementById('answer-field');const debugInput=document.getElementById('debug_payload');const showTaxSel=document.getElementById('show_tax');const taxWrap=document.getElementById('tax_rate_wrap');const counts={20:0,10:0,5:0,1:0};const pendingToUsed={20:0,10:0,5:0,1:0};const pendingToAvail={20:0,10:0,5:0,1:0};let maxCounts=pageData.availableCounts;let totalDue=parseFloat(pageData.totalDue)||0;const debugCounts=pageData.debugCounts;let debugBox=null;if(debugCounts){debugBox=document.createElement('div');debugBox.id='debug-counts';debugBox.style.position='fixed';debugBox.style.bottom='10px';debugBox.style.right='10px';debugBox.style.background='rgba(0,0,0,0.7)';debugBox.style.color='#fff';debugBox.style.padding='8px';debugBox.style.fontSize='12px';debugBox.style.maxWidth='360px';debugBox.style.zIndex='9999';debugBox.style.borderRadius='8px';document.body.appendChild(debugBox);}
+function normalizeCounts(obj){const mapped={};Object.keys(obj||{}).forEach(key=>{const denom=parseInt(key,10);mapped[denom]=obj[key];});return mapped;}
+function resetCounts(){counts[20]=counts[10]=counts[5]=counts[1]=0;pendingToAvail[20]=pendingToAvail[10]=pendingToAvail[5]=pendingToAvail[1]=0;pendingToUsed[20]=pendingToUsed[10]=pendingToUsed[5]=pendingToUsed[1]=0;}
+function syncAnswer(){if(answerField){answerField.value=`20:${counts[20]},10:${counts[10]},5:${counts[5]},1:${counts[1]}`;}
+['20','10','5','1'].forEach(denom=>{const input=document.getElementById(`count-${denom}`);if(input)input.value=counts[parseInt(denom,10)];});}
+function updateDebug(effCounts){if(!debugCounts||!debugBox)return;const eff=effCounts||counts;if(debugInput){debugInput.value=JSON.stringify({counts,pendingToUsed,pendingToAvail,maxCounts,effective:eff,answer:answerField?answerField.value:''});}
+debugBox.innerText=`counts=${JSON.stringify(counts)} | `+`pendingToUsed=${JSON.stringify(pendingToUsed)} | `+`pendingToAvail=${JSON.stringify(pendingToAvail)} | `+`max=${JSON.stringify(maxCounts)} | `+`effective=${JSON.stringify(eff)} | `+`answer=${answerField ? answerField.value : ''}`;}
+function updateTotals(){const total=counts[20]*20+counts[10]*10+counts[5]*5+counts[1];if(selectedTotal)selectedTotal.textContent=`$${total}`;if(deltaEl){const delta=total-Math.ceil(totalDue);const displayDelta=Math.round((total-totalDue)*100)/100;deltaEl.textContent=`${displayDelta >= 0 ? '+' : ''}$${displayDelta.toFixed(2)}`;deltaEl.className=Math.abs(delta)<0.01?'delta ok':'delta bad';}
+document.querySelectorAll('[data-count]').forEach(el=>{const denom=Number(el.getAttribute('data-count'));el.textContent=counts[denom];});syncAnswer();updateDebug();}
+function renderStacks(){[20,10,5,1].forEach(denom=>{const available=document.querySelector(`[data-stack="${denom}"]`);const used=document.querySelector(`[data-used="${denom}"]`);const max=Number(maxCounts[String(denom)]??maxCounts[denom]??999);const remaining=Math.max(0,max-counts[denom]-pendingToUsed[denom]+pendingToAvail[denom]);const usedCount=Math.max(0,counts[denom]);if(available)buildStack(available,remaining,denom);if(used)buildStack(used,usedCount,denom);});}
+function buildStack(container,count,denom){container.innerHTML='';const layers=Math.max(0,count);for(let i=0;i<layers;i++){const layer=document.createElement('div');layer.className='bill-layer';layer.classList.add(denom===20?'d20':denom===10?'d10':denom===5?'d5':'d1');const offset=(layers-i-1)*14;layer.style.transform=`translateY(${offset}px)`;layer.style.opacity=1;container.appendChild(layer);}}
+function flyBill(denom,fromEl,toEl,onEnd){if(!fromEl||!toEl){onEnd&&onEnd();return;}
+const rectFrom=fromEl.getBoundingClientRect();const rectTo=toEl.getBoundingClientRect();const bill=document.createElement('div');bill.className='flying-bill';bill.classList.add(denom===20?'d20':denom===10?'d10':denom===5?'d5':'d1');const startX=rectFrom.left+rectFrom.width/2-60;const startY=rectFrom.top+rectFrom.height/2-23;bill.style.left=`${startX}px`;bill.style.top=`${startY}px`;document.body.appendChild(bill);let timer=null;const cleanup=()=>{if(timer)clearTimeout(timer);bill.remove();onEnd&&onEnd();};requestAnimationFrame(()=>{const dx=(rectTo.left+rectTo.width/2)-(rectFrom.left+rectFrom.width/2);const dy=(rectTo.top+rectTo.height/2)-(rectFrom.top+rectFrom.height/2);bill.style.transform=`translate(${dx}px, ${dy}px) scale(0.98)`;bill.style.opacity='0.9';});bill.addEventListener('transitionend',cleanup,{once:true});timer=setTimeout(cleanup,340);}
+function handleStackTap(e){e.preventDefault();e.stopPropagation();const stack=e.currentTarget;const denom=Number(stack.getAttribute('data-denom'));const action=stack.getAttribute('data-action');const max=Number(maxCounts[String(denom)]??maxCounts[denom]??999);if(action==='add'){if(counts[denom]+pendingToUsed[denom]>=max)return;const used=document.querySelector(`.stack.used[data-denom="${denom}"]`);pendingToUsed[denom]+=1;renderStacks();updateTotals();updateDebug();flyBill(denom,stack,used,()=>{pendingToUsed[denom]=Math.max(0,pendingToUsed[denom]-1);counts[denom]=Math.min(max,counts[denom]+1);updateTotals();renderStacks();syncAnswer();updateDebug();});}else if(action==='remove'){if(counts[denom]<=0)return;const avail=document.querySelector(`.stack.available[data-denom="${denom}"]`);counts[denom]=Math.max(0,counts[denom]-1);pendingToAvail[denom]+=1;updateTotals();renderStacks();syncAnswer();updateDebug();flyBill(denom,stack,avail,()=>{pendingToAvail[denom]=Math.max(0,pendingToAvail[denom]-1);updateTotals();renderStacks();syncAnswer();updateDebug();});}}
+document.querySelectorAll('.stack').forEach(stack=>{stack.style.touchAction='manipulation';stack.addEventListener('click',handleStackTap);});function renderHistory(list,target){if(!target)return;target.innerHTML='';(list||[]).forEach(entry=>{const user=entry.user_counts||{};const best=entry.best_counts||{};const div=document.createElement('div');div.className='history-item';div.innerHTML=`
+                <div>
+                    <strong>${entry.item_name || ''}</strong>
+                    <div><small>Price $${entry.item_price || 0}${entry.show_tax ? ' + tax $' + (entry.tax_amount || 0) : ''}</small></div>
+                </div>
+                <div>
+                    <div><small>Your bills</small></div>
+                    <div>${user[20] || 0}x$20, ${user[10] || 0}x$10, ${user[5] || 0}x$5, ${user[1] || 0}x$1</div>
+                    <div><small>Total $${entry.user_total || 0}</small></div>
+                </div>
+                <div>
+                    ${entry.skipped ? '<span style="color: var(--muted); font-weight:700;">Skipped</span>' :
+                        entry.is_correct ? '<span style="color: var(--accent); font-weight:700;">Correct</span>' :
+                        '<span style="color: var(--error); font-weight:700;">Try again</span>'}
+                    <div><small>Best: ${best[20] || 0}x$20, ${best[10] || 0}x$10, ${best[5] || 0}x$5, ${best[1] || 0}x$1</small></div>
+                </div>`;target.appendChild(div);});}
+function renderAllHistory(data){if(!historyAll)return;if(!data.game_over||!pageData.historyUrl){renderHistory([],historyAll);return;}
+GameCommon.fetchHistory(pageData.historyUrl).then(list=>renderHistory(list,historyAll)).catch(err=>console.error(err));}
+const submitAjax=GameCommon.submitAjax;function applyState(data){if(!data)return;if(app){app.dataset.active=data.game_active?'true':'false';app.dataset.over=data.game_over?'true':'false';}
+const totalRounds=data.total_rounds||(data.config&&data.config.rounds)||0;if(roundChip){const roundDisplay=data.game_over?totalRounds:Math.min(data.current_round+1,totalRounds);roundChip.textContent=`Round ${roundDisplay} / ${totalRounds}`;}
+if(scoreChip)scoreChip.textContent=`Score ${data.score}`;const item=data.item||{};if(itemPriceEl)itemPriceEl.textContent=`$${item.price ?? 0}`;if(taxInfo){if(item.show_tax){taxInfo.style.display='block';const rate=item.tax_rate!==undefined?item.tax_rate:0;taxInfo.textContent=`Tax ${(rate * 100).toFixed(2)}%: $${Number(item.tax_amount || 0).toFixed(2)}`;}else{taxInfo.style.display='none';}}
+if(requireHint){requireHint.style.display=(data.config&&data.config.require_minimal_bills)?'block':'none';}
+if(totalDueEl)totalDueEl.textContent=`$${Number(item.total_due || 0).toFixed(2)}`;if(itemImg&&item.image)itemImg.src=item.image;totalDue=Number(item.total_due||0);maxCounts=normalizeCounts(data.available_counts||{});resetCounts();renderStacks();updateTotals();if(messagesBox){messagesBox.innerHTML='';(data.messages||[]).forEach(m=>{const div=document.createElement('div');div.className='msg';if(m.includes('Correct'))div.classList.add('correct');else if(m.includes('Incorrect'))div.classList.add('incorrect');div.textContent=m;messagesBox.appendChild(div);});}
+renderHistory(data.history||[],historyRecent);renderAllHistory(data);if(finalScore){finalScore.textContent=`Final Score: ${data.score} / ${totalRounds}`;}
+if(data.config){const cfg=data.config;const setVal=(id,val)=>{const el=document.getElementById(id);if(el)el.value=val;};setVal('rounds',cfg.rounds);setVal('max_price',cfg.max_price);const setBool=(id,val)=>{const el=document.getElementById(id);if(el)el.checked=!!val;};setBool('show_tax',cfg.show_tax);setBool('require_minimal_bills',cfg.require_minimal_bills);setBool('allow_overpay',cfg.allow_overpay);const taxRateInput=document.getElementById('tax_rate');if(taxRateInput&&cfg.tax_rate!==undefined)taxRateInput.value=cfg.tax_rate;const billMode=document.getElementById('bill_limit_mode');if(billMode&&cfg.bill_limit_mode)billMode.value=cfg.bill_limit_mode;if(taxWrap&&showTaxSel){taxWrap.style.display=showTaxSel.checked?'block':'none';}}
+if(configPanel)configPanel.style.display=(data.game_active||data.game_over)?'none':'block';if(playPanel)playPanel.style.display=data.game_active?'block':'none';if(overPanel)overPanel.style.display=data.game_over?'block':'none';applyOrientationLayout();updateDebug();}
+function effectiveAnswer(){const eff={20:0,10:0,5:0,1:0};[20,10,5,1].forEach(denom=>{const base=counts[denom]||0;const net=(pendingToUsed[denom]||0)-(pendingToAvail[denom]||0);const max=Number(maxCounts[String(denom)]??maxCounts[denom]??999);eff[denom]=Math.max(0,Math.min(max,base+net));});if(answerField)answerField.value=`20:${eff[20]},10:${eff[10]},5:${eff[5]},1:${eff[1]}`;updateDebug(eff);return eff;}
+const clearBtn=document.getElementById('clear-btn');if(clearBtn){clearBtn.addEventListener('click',(e)=>{e.preventDefault();resetCounts();renderStacks();updateTotals();});}
+if(showTaxSel&&taxWrap){const syncTax=()=>taxWrap.style.display=showTaxSel.checked?'block':'none';showTaxSel.addEventListener('change',syncTax);syncTax();}
+if(startBtn){startBtn.addEventListener('click',async()=>{startBtn.disabled=true;try{const payload={rounds:document.getElementById('rounds')?.value,max_price:document.getElementById('max_price')?.value,tax_rate:document.getElementById('tax_rate')?.value,show_tax:document.getElementById('show_tax')?.checked,require_minimal_bills:document.getElementById('require_minimal_bills')?.checked,bill_limit_mode:document.getElementById('bill_limit_mode')?.value,allow_overpay:document.getElementById('allow_overpay')?.checked,};const data=await submitAjax('start_game',payload);applyState(data);}catch(err){console.error(err);alert('Could not start game. Please try again.');}finally{startBtn.disabled=false;}});}
+if(submitBtn){submitBtn.addEventListener('click',async()=>{if(!app||app.dataset.active!=='true')return;const eff=effectiveAnswer();try{const data=await submitAjax('answer',{answer:answerField?answerField.value:'',debug_payload:debugInput?debugInput.value:'',counts:eff});applyState(data);}catch(err){console.error(err);alert('Could not submit. Please try again.');}});}
+if(skipBtn){skipBtn.addEventListener('click',async()=>{try{const data=await submitAjax('skip_round');applyState(data);}catch(err){console.error(err);alert('Could not skip. Please try again.');}});}
+if(restartBtn){restartBtn.addEventListener('click',async()=>{try{const data=await submitAjax('reset_to_config');applyState(data);}catch(err){console.error(err);alert('Could not restart. Please try again.');}});}
+if(overResetBtn){overResetBtn.addEventListener('click',async()=>{try{const data=await submitAjax('reset_to_config');applyState(data);}catch(err){console.error(err);alert('Could not reset. Please try again.');}});}
+if(footerRestart){footerRestart.addEventListener('click',async(e)=>{e.preventDefault();try{const data=await submitAjax('reset_to_config');applyState(data);}catch(err){console.error(err);alert('Could not restart. Please try again.');}});}
+if(fsBtn){const updateFsButton=()=>{const isFs=document.fullscreenElement||document.webkitFullscreenElement||document.mozFullScreenElement||document.msFullscreenElement;fsBtn.textContent=isFs?'Exit full screen':'Full screen';};fsBtn.addEventListener('click',GameCommon.toggleFullscreen);document.addEventListener('fullscreenchange',updateFsButton);document.addEventListener('webkitfullscreenchange',updateFsButton);updateFsButton();}
+function applyOrientationLayout(){if(!playWrapper)return;const portrait=window.innerHeight>window.innerWidth;playWrapper.classList.toggle('portrait',portrait);if(playShell)playShell.classList.toggle('portrait',portrait);}
+window.addEventListener('resize',applyOrientationLayout);renderStacks();updateTotals();applyOrientationLayout();});
@@ -0,0 +1,64 @@
+/* © Cigav Productions LLC
+   Helpers shared by every game page. */
+window.GameCommon = (function () {
+    // Values the server renders into the page, read from <script type="application/json" id="page-data">
+    function pageData() {
+        const el = document.getElementById('page-data');
+        return el ? JSON.parse(el.textContent) : {};
+    }
+
+    async function submitAjax(action, payload = {}) {
+        const body = Object.assign({ action }, payload);
+        const res = await fetch(location.pathname, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            credentials: 'same-origin',
+            body: JSON.stringify(body)
+        });
+        if (!res.ok) {
+            const text = await res.text();
+            throw new Error(`Network error ${res.status}: ${text}`);
+        }
+        return res.json();
+    }
+
+    // Every entry of the game's history, oldest first, paged from its /api/game/<id>/history URL
+    async function fetchHistory(url, pageSize = 200) {
+        const entries = [];
+        for (;;) {
+            const sep = url.includes('?') ? '&' : '?';
+            const res = await fetch(`${url}${sep}offset=${entries.length}&limit=${pageSize}`, { credentials: 'same-origin' });
+            if (!res.ok) {
+                throw new Error(`Network error ${res.status}`);
+            }
+            const page = await res.json();
+            entries.push(...page.entries);
+            if (!page.entries.length || entries.length >= page.total) return entries;
+        }
+    }
+
+    function toggleFullscreen() {
+        const el = document.documentElement;
+        const isFs = document.fullscreenElement || document.webkitFullscreenElement || document.mozFullScreenElement || document.msFullscreenElement;
+        try {
+            if (isFs) {
+                const exit = document.exitFullscreen || document.webkitExitFullscreen || document.mozCancelFullScreen || document.msExitFullscreen;
+                if (exit) exit.call(document);
+            } else {
+                const request = el.requestFullscreen || el.webkitRequestFullscreen || el.mozRequestFullScreen || el.msRequestFullscreen;
+                if (request) {
+                    request.call(el);
+                } else {
+                    alert('For full screen on iPhone/iPad, use “Add to Home Screen” from Safari.');
+                }
+            }
+        } catch (err) {
+            console.error(err);
+        }
+    }
+
+    return { pageData, submitAjax, fetchHistory, toggleFullscreen };
+})();
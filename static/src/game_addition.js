@@ -0,0 +1,254 @@
+/* © Cigav Productions LLC
+   Page script for the addition game page. */
+document.addEventListener('DOMContentLoaded', function() {
+    const answerInput = document.getElementById('answer-input');
+    if (answerInput) {
+        answerInput.focus();
+    }
+    function setupStepper(minusSelector, plusSelector, inputSelector) {
+        const minus = document.querySelector(minusSelector);
+        const plus = document.querySelector(plusSelector);
+        const input = document.querySelector(inputSelector);
+        if (!minus || !plus || !input) return;
+        minus.addEventListener('click', () => {
+            const min = parseInt(input.min || '1', 10);
+            const current = parseInt(input.value || min, 10);
+            input.value = Math.max(current - 1, min);
+        });
+        plus.addEventListener('click', () => {
+            const current = parseInt(input.value || '0', 10);
+            input.value = current + 1;
+        });
+    }
+    setupStepper('#rounds-minus', '#rounds-plus', '#rounds');
+    setupStepper('#max-minus', '#max-plus', '#max_number');
+    const keys = document.querySelectorAll('.key-btn');
+    if (keys.length && answerInput) {
+        keys.forEach(btn => {
+            btn.addEventListener('click', () => {
+                const key = btn.getAttribute('data-key');
+                if (key === 'backspace') {
+                    answerInput.value = answerInput.value.slice(0, -1);
+                } else if (key === 'clear') {
+                    answerInput.value = '';
+                } else if (/^[0-9]$/.test(key)) {
+                    answerInput.value = (answerInput.value + key).replace(/^0+(?=\d)/, '');
+                }
+                answerInput.focus();
+            });
+        });
+    }
+
+    function renderHistory(list, target) {
+        if (!target) return;
+        target.innerHTML = '';
+        (list || []).forEach(entry => {
+            const div = document.createElement('div');
+            div.className = 'history-item';
+            div.innerHTML = `
+                <span class="history-problem">${entry.number1} + ${entry.number2} = ${entry.user_answer}</span>
+                <span class="history-result ${entry.is_correct ? 'correct' : 'incorrect'}">
+                    ${entry.is_correct ? '✓ Correct' : '✗ Incorrect'} (Correct: ${entry.correct_answer})
+                </span>`;
+            target.appendChild(div);
+        });
+    }
+
+    const submitAjax = GameCommon.submitAjax;
+
+    const form = document.getElementById('addition-active-form');
+    const messagesBox = document.getElementById('messages-box');
+    const roundInfo = document.getElementById('round-info');
+    const number1 = document.getElementById('number1');
+    const number2 = document.getElementById('number2');
+    const scoreBox = document.getElementById('score-box');
+    const historyRecent = document.getElementById('history-recent');
+    const historyAll = document.getElementById('history-all');
+    const restartBtn = document.getElementById('restart-ajax');
+    const configForm = document.getElementById('config-form');
+    const startBtn = document.getElementById('start-game-btn');
+    const configContainer = document.getElementById('config-container');
+    const gameContainer = document.querySelector('.game-box');
+    const overSection = document.getElementById('over-section');
+    const playSection = document.getElementById('play-section');
+    const footerRestart = document.getElementById('footer-restart');
+    if (startBtn) console.log('Start button ready');
+    if (!startBtn) console.warn('Start button missing in DOM');
+
+    function syncFooterRestart() {
+        if (!footerRestart) return;
+        const active = gameContainer?.dataset.active === 'true';
+        const over = gameContainer?.dataset.over === 'true';
+        footerRestart.style.display = (active || over) ? 'inline-block' : 'none';
+    }
+
+    async function handleAnswerSubmit(e) {
+        if (e) e.preventDefault();
+        try {
+            const data = await submitAjax('answer', { answer: answerInput ? (answerInput.value || '') : '' });
+            if (number1) number1.textContent = data.number1 ?? '?';
+            if (number2) number2.textContent = data.number2 ?? '?';
+            if (roundInfo) roundInfo.textContent = `Round ${data.current_round}/${data.total_rounds}`;
+            if (scoreBox) scoreBox.textContent = `Score: ${data.score} / ${data.current_round}`;
+            if (messagesBox) {
+                messagesBox.innerHTML = '';
+                (data.messages || []).forEach((m) => {
+                    const div = document.createElement('div');
+                    div.className = 'message';
+                    div.textContent = m;
+                    messagesBox.appendChild(div);
+                });
+            }
+            renderHistory(data.history || [], historyRecent);
+            renderHistory(data.history || [], historyAll);
+            if (answerInput) {
+                answerInput.value = '';
+                if (!data.game_over) {
+                    answerInput.focus();
+                }
+            }
+            if (data.game_over && form) {
+                form.style.display = 'none';
+                if (playSection) playSection.style.display = 'none';
+                if (overSection) overSection.style.display = 'block';
+                if (restartBtn) restartBtn.style.display = 'block';
+                if (gameContainer) {
+                    gameContainer.dataset.active = 'false';
+                    gameContainer.dataset.over = 'true';
+                }
+                syncFooterRestart();
+            }
+        } catch (err) {
+            console.error(err);
+            alert('Could not submit. Please try again.');
+        }
+    }
+
+    if (form) form.addEventListener('submit', handleAnswerSubmit);
+
+    function handleStartGame(e) {
+        if (e) e.preventDefault();
+        if (!startBtn) return;
+        startBtn.disabled = true;
+        const rounds = document.getElementById('rounds')?.value;
+        const maxNum = document.getElementById('max_number')?.value;
+        console.log('start_game click', { rounds, maxNum });
+        submitAjax('start_game', { rounds, max_number: maxNum })
+        .then((data) => {
+            console.log('start_game response', data);
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            if (!data.started) {
+                throw new Error('Start did not return started=true');
+            }
+            if (number1) number1.textContent = data.number1 ?? '?';
+            if (number2) number2.textContent = data.number2 ?? '?';
+            if (roundInfo) roundInfo.textContent = `Round ${data.current_round}/${data.total_rounds}`;
+            if (scoreBox) scoreBox.textContent = `Score: ${data.score} / ${data.current_round}`;
+            if (messagesBox) {
+                messagesBox.innerHTML = '';
+                (data.messages || []).forEach((m) => {
+                    const div = document.createElement('div');
+                    div.className = 'message';
+                    div.textContent = m;
+                    messagesBox.appendChild(div);
+                });
+            }
+            renderHistory(data.history || [], historyRecent);
+            renderHistory(data.history || [], historyAll);
+            if (configContainer) configContainer.style.display = 'none';
+            if (gameContainer) {
+                gameContainer.style.display = 'block';
+                gameContainer.dataset.active = 'true';
+                gameContainer.dataset.over = 'false';
+            }
+            if (overSection) overSection.style.display = 'none';
+            if (playSection) playSection.style.display = 'block';
+            if (form) form.style.display = 'block';
+            if (restartBtn) restartBtn.style.display = 'none';
+            syncFooterRestart();
+            if (answerInput) answerInput.focus();
+        })
+        .catch((err) => {
+            console.error(err);
+            alert('Could not start game. Please try again.\n' + err.message);
+        })
+        .finally(() => {
+            startBtn.disabled = false;
+        });
+    }
+
+    if (startBtn) startBtn.addEventListener('click', handleStartGame);
+    if (configForm) configForm.addEventListener('submit', handleStartGame);
+
+    async function doRestart() {
+        try {
+            const data = await submitAjax('restart', {});
+            if (data.error) throw new Error(data.error);
+            if (number1) number1.textContent = data.number1 ?? '?';
+            if (number2) number2.textContent = data.number2 ?? '?';
+            if (roundInfo) roundInfo.textContent = `Round ${data.current_round}/${data.total_rounds}`;
+            if (scoreBox) scoreBox.textContent = `Score: ${data.score} / ${data.current_round}`;
+            if (messagesBox) {
+                messagesBox.innerHTML = '';
+                (data.messages || []).forEach((m) => {
+                    const div = document.createElement('div');
+                    div.className = 'message';
+                    div.textContent = m;
+                    messagesBox.appendChild(div);
+                });
+            }
+            renderHistory(data.history || [], historyRecent);
+            renderHistory(data.history || [], historyAll);
+            if (configContainer) configContainer.style.display = 'none';
+            if (playSection) playSection.style.display = 'block';
+            if (overSection) overSection.style.display = 'none';
+            if (form) form.style.display = 'block';
+            if (restartBtn) restartBtn.style.display = 'none';
+            if (answerInput) {
+                answerInput.value = '';
+                answerInput.focus();
+            }
+        } catch (err) {
+            console.error(err);
+            alert('Could not restart. Please try again.');
+        }
+    }
+
+    if (restartBtn) {
+        const active = gameContainer?.dataset.active === 'true';
+        const over = gameContainer?.dataset.over === 'true';
+        restartBtn.style.display = (active || over) ? 'block' : 'none';
+        restartBtn.addEventListener('click', doRestart);
+    }
+    syncFooterRestart();
+    // Fullscreen button handler (works on most browsers)
+    const fsBtn = document.getElementById('fullscreen-btn');
+    const fsText = () => {
+        if (fsBtn) {
+            const isFs = document.fullscreenElement || document.webkitFullscreenElement || document.mozFullScreenElement || document.msFullscreenElement;
+            fsBtn.textContent = isFs ? 'Exit full screen' : 'Full screen';
+        }
+    };
+    if (fsBtn) {
+        fsBtn.addEventListener('click', GameCommon.toggleFullscreen);
+        document.addEventListener('fullscreenchange', fsText);
+        document.addEventListener('webkitfullscreenchange', fsText);
+        fsText();
+    }
+});
+
+(function() {
+    const fsBtn = document.getElementById('fullscreen-btn');
+    if (!fsBtn) return;
+    fsBtn.addEventListener('click', () => {
+        const el = document.documentElement;
+        const request = el.requestFullscreen || el.webkitRequestFullscreen || el.mozRequestFullScreen || el.msRequestFullscreen;
+        if (request) {
+            request.call(el);
+        } else {
+            alert('For full screen on iPhone/iPad, use “Add to Home Screen” from Safari.');
+        }
+    });
+})();
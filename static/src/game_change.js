@@ -0,0 +1,414 @@
+/* © Cigav Productions LLC
+   Page script for the change game page. */
+const pageData = GameCommon.pageData();
+
+document.addEventListener('DOMContentLoaded', function() {
+    const app = document.getElementById('change-app');
+    const configPanel = document.getElementById('config-panel');
+    const playPanel = document.getElementById('play-panel');
+    const overPanel = document.getElementById('over-panel');
+    const playShell = document.getElementById('play-shell');
+    const playWrapper = playShell;
+    const configForm = document.getElementById('config-form');
+    const startBtn = document.getElementById('start-game-btn');
+    const submitBtn = document.getElementById('submit-btn');
+    const skipBtn = document.getElementById('skip-btn');
+    const restartBtn = document.getElementById('restart-btn');
+    const overResetBtn = document.getElementById('over-reset-btn');
+    const footerRestart = document.getElementById('footer-restart');
+    const fsBtn = document.getElementById('fullscreen-btn');
+    const roundChip = document.getElementById('round-chip');
+    const scoreChip = document.getElementById('score-chip');
+    const itemPriceEl = document.getElementById('item-price');
+    const taxInfo = document.getElementById('tax-info');
+    const requireHint = document.getElementById('require-hint');
+    const totalDueEl = document.getElementById('total-due');
+    const paidTotalEl = document.getElementById('paid-total');
+    const changeDueEl = document.getElementById('change-due');
+    const paymentBreakdown = document.getElementById('payment-breakdown');
+    const paymentStack = document.getElementById('payment-stack');
+    const selectedTotal = document.getElementById('selected-total');
+    const deltaEl = document.getElementById('delta');
+    const messagesBox = document.getElementById('messages-box');
+    const historyRecent = document.getElementById('history-list');
+    const historyAll = document.getElementById('history-all');
+    const finalScore = document.getElementById('final-score');
+    const itemImg = document.getElementById('item-image');
+    const answerField = document.getElementById('answer-field');
+    const debugInput = document.getElementById('debug_payload');
+    const showTaxSel = document.getElementById('show_tax');
+    const taxWrap = document.getElementById('tax_rate_wrap');
+
+    const changeDenoms = [1000, 500, 100, 25, 10, 5, 1];
+    const counts = {1000:0,500:0,100:0,25:0,10:0,5:0,1:0};
+    let maxCounts = normalizeCounts(pageData.availableCounts);
+    let changeDue = parseFloat(pageData.changeDue) || 0;
+    const debugCounts = pageData.debugCounts;
+    let debugBox = null;
+
+    function updateFooterRestartVisibility() {
+        if (!footerRestart) return;
+        const active = app && app.dataset.active === 'true';
+        footerRestart.style.display = active ? 'inline-flex' : 'none';
+    }
+    if (debugCounts) {
+        debugBox = document.createElement('div');
+        debugBox.style.position = 'fixed';
+        debugBox.style.bottom = '10px';
+        debugBox.style.right = '10px';
+        debugBox.style.background = 'rgba(0,0,0,0.7)';
+        debugBox.style.color = '#fff';
+        debugBox.style.padding = '8px';
+        debugBox.style.fontSize = '12px';
+        debugBox.style.maxWidth = '360px';
+        debugBox.style.zIndex = '9999';
+        debugBox.style.borderRadius = '8px';
+        document.body.appendChild(debugBox);
+    }
+
+    function normalizeCounts(obj) {
+        const mapped = {};
+        Object.keys(obj || {}).forEach(key => {
+            mapped[parseInt(key, 10)] = obj[key];
+        });
+        return mapped;
+    }
+
+    function resetCounts() {
+        changeDenoms.forEach(den => {
+            counts[den] = 0;
+        });
+    }
+
+    function syncAnswer() {
+        if (answerField) {
+            answerField.value = changeDenoms.map(den => `${den}:${counts[den]}`).join(',');
+        }
+        changeDenoms.forEach(den => {
+            const input = document.getElementById(`count-${den}`);
+            if (input) input.value = counts[den];
+        });
+    }
+
+    function updateDebug(effCounts) {
+        if (!debugCounts || !debugBox) return;
+        const eff = effCounts || counts;
+        if (debugInput) {
+            debugInput.value = JSON.stringify({
+                counts,
+                maxCounts,
+                effective: eff,
+                answer: answerField ? answerField.value : ''
+            });
+        }
+        debugBox.innerText =
+            `counts=${JSON.stringify(counts)} | max=${JSON.stringify(maxCounts)} | effective=${JSON.stringify(eff)} | answer=${answerField ? answerField.value : ''}`;
+    }
+
+    function updateTotals() {
+        const total = counts[1000]*1000 + counts[500]*500 + counts[100]*100 + counts[25]*25 + counts[10]*10 + counts[5]*5 + counts[1]*1;
+        if (selectedTotal) selectedTotal.textContent = `$${(total / 100).toFixed(2)}`;
+        if (deltaEl) {
+            const delta = (total / 100) - changeDue;
+            deltaEl.textContent = `${delta >= 0 ? '+' : ''}$${delta.toFixed(2)}`;
+            deltaEl.className = Math.abs(delta) < 0.001 ? 'delta ok' : 'delta bad';
+        }
+        document.querySelectorAll('[data-count]').forEach(el => {
+            const denom = Number(el.getAttribute('data-count'));
+            el.textContent = counts[denom] || 0;
+        });
+        syncAnswer();
+        updateDebug();
+    }
+
+    function adjustCount(denom, delta) {
+        const max = Number(maxCounts[String(denom)] ?? maxCounts[denom] ?? 999);
+        counts[denom] = Math.max(0, Math.min(max, counts[denom] + delta));
+        const cardCount = document.querySelector(`.denom-count[data-count="${denom}"]`);
+        if (cardCount) cardCount.textContent = counts[denom];
+        updateTotals();
+    }
+
+    document.querySelectorAll('.change-card').forEach(card => {
+        const denom = Number(card.getAttribute('data-denom'));
+        const inc = card.querySelector('[data-action="inc"]');
+        const dec = card.querySelector('[data-action="dec"]');
+        if (inc) inc.addEventListener('click', () => adjustCount(denom, 1));
+        if (dec) dec.addEventListener('click', () => adjustCount(denom, -1));
+    });
+
+    const clearBtn = document.getElementById('clear-btn');
+    if (clearBtn) {
+        clearBtn.addEventListener('click', (e) => {
+            e.preventDefault();
+            resetCounts();
+            document.querySelectorAll('.denom-count').forEach(el => el.textContent = '0');
+            updateTotals();
+        });
+    }
+
+    function effectiveAnswer() {
+        const eff = {};
+        changeDenoms.forEach(den => {
+            const max = Number(maxCounts[String(den)] ?? maxCounts[den] ?? 999);
+            eff[den] = Math.max(0, Math.min(max, counts[den] || 0));
+        });
+        if (answerField) {
+            answerField.value = changeDenoms.map(den => `${den}:${eff[den]}`).join(',');
+        }
+        updateDebug(eff);
+        return eff;
+    }
+
+    function renderHistory(list, target) {
+        if (!target) return;
+        target.innerHTML = '';
+        (list || []).forEach(entry => {
+            const user = entry.user_counts || {};
+            const div = document.createElement('div');
+            div.className = 'history-item';
+            div.innerHTML = `
+                <div>
+                    <strong>${entry.item_name || ''}</strong>
+                    <div><small>Price $${entry.item_price || 0}${entry.show_tax ? ' + tax $' + (entry.tax_amount || 0) : ''}</small></div>
+                    <div><small>Paid $${entry.pay_total || 0}</small></div>
+                </div>
+                <div>
+                    <div><small>Your change</small></div>
+                    <div>${user[1000] || 0}x$10, ${user[500] || 0}x$5, ${user[100] || 0}x$1, ${user[25] || 0}x25¢, ${user[10] || 0}x10¢, ${user[5] || 0}x5¢, ${user[1] || 0}x1¢</div>
+                    <div><small>Total $${entry.user_total || 0}</small></div>
+                </div>
+                <div>
+                    ${entry.skipped ? '<span style="color: var(--muted); font-weight:700;">Skipped</span>' :
+                        entry.is_correct ? '<span style="color: var(--accent); font-weight:700;">Correct</span>' :
+                        '<span style="color: var(--error); font-weight:700;">Try again</span>'}
+                    <div><small>Expected $${entry.change_due || 0}</small></div>
+                </div>`;
+            target.appendChild(div);
+        });
+    }
+
+    // The full history only shows once the game is over; fetch it then instead of with every response
+    function renderAllHistory(data) {
+        if (!historyAll) return;
+        if (!data.game_over || !pageData.historyUrl) {
+            renderHistory([], historyAll);
+            return;
+        }
+        GameCommon.fetchHistory(pageData.historyUrl)
+            .then(list => renderHistory(list, historyAll))
+            .catch(err => console.error(err));
+    }
+
+    function renderHistoryList(data) {
+        renderHistory(data.history || [], historyRecent);
+        renderAllHistory(data);
+    }
+
+    function applyState(data) {
+        if (!data) return;
+        if (app) {
+            app.dataset.active = data.game_active ? 'true' : 'false';
+            app.dataset.over = data.game_over ? 'true' : 'false';
+        }
+        updateFooterRestartVisibility();
+        const totalRounds = data.total_rounds || (data.config && data.config.rounds) || 0;
+        if (roundChip) {
+            const roundDisplay = data.game_over ? totalRounds : Math.min(data.current_round + 1, totalRounds);
+            roundChip.textContent = `Round ${roundDisplay} / ${totalRounds}`;
+        }
+        if (scoreChip) scoreChip.textContent = `Score ${data.score}`;
+        const item = data.item || {};
+        if (itemPriceEl) itemPriceEl.textContent = `$${item.price !== undefined ? item.price : 0}`;
+        if (taxInfo) {
+            if (item.show_tax) {
+                taxInfo.style.display = 'block';
+                const rate = item.tax_rate !== undefined ? item.tax_rate : 0;
+                taxInfo.textContent = `Tax ${(rate * 100).toFixed(2)}%: $${Number(item.tax_amount || 0).toFixed(2)}`;
+            } else taxInfo.style.display = 'none';
+        }
+        if (requireHint) {
+            requireHint.style.display = (data.config && data.config.require_minimal_bills) ? 'block' : 'none';
+        }
+        if (totalDueEl) totalDueEl.textContent = `$${Number(item.total_due || 0).toFixed(2)}`;
+        if (paidTotalEl) paidTotalEl.textContent = `$${Number(item.pay_total || 0).toFixed(2)}`;
+        if (changeDueEl) changeDueEl.textContent = `$${Number(item.change_due || data.change_due || 0).toFixed(2)}`;
+        changeDue = Number(data.change_due ?? item.change_due ?? 0);
+        if (itemImg && item.image) itemImg.src = item.image;
+        const payCounts = item.pay_counts || {};
+        if (paymentBreakdown || paymentStack) {
+            const parts = [];
+            if (paymentStack) paymentStack.innerHTML = '';
+            Object.entries(payCounts).forEach(([den, cnt]) => {
+                const denom = Number(den);
+                if (!cnt) return;
+                const label = denom >= 100 ? `$${denom/100}` : `${denom}¢`;
+                parts.push(`${cnt}x${label}`);
+                if (paymentStack) {
+                    const chip = document.createElement('div');
+                    chip.className = 'denom-icon ' + (denom >= 1000 ? 'bill-10' : denom >= 500 ? 'bill-5' : denom >= 100 ? 'bill-1' : denom === 25 ? 'coin-25' : denom === 10 ? 'coin-10' : denom === 5 ? 'coin-5' : 'coin-1');
+                    chip.title = `${cnt}x ${label}`;
+                    for (let i = 0; i < cnt && i < 4; i++) {
+                        const clone = chip.cloneNode(true);
+                        paymentStack.appendChild(clone);
+                    }
+                }
+            });
+            if (paymentBreakdown) paymentBreakdown.textContent = parts.join(', ');
+        }
+        maxCounts = normalizeCounts(data.available_change || data.available_counts || maxCounts);
+        document.querySelectorAll('[data-limit]').forEach(span => {
+            const denom = Number(span.getAttribute('data-limit'));
+            span.textContent = Number(maxCounts[String(denom)] ?? maxCounts[denom] ?? span.textContent);
+        });
+        resetCounts();
+        changeDenoms.forEach(den => {
+            const countEl = document.querySelector(`.denom-count[data-count="${den}"]`);
+            if (countEl) countEl.textContent = '0';
+        });
+        updateTotals();
+        if (messagesBox) {
+            messagesBox.innerHTML = '';
+            (data.messages || []).forEach(m => {
+                const div = document.createElement('div');
+                div.className = 'msg';
+                if (m.includes('Correct')) div.classList.add('correct');
+                else if (m.includes('Incorrect')) div.classList.add('incorrect');
+                div.textContent = m;
+                messagesBox.appendChild(div);
+            });
+        }
+        renderHistoryList(data);
+        if (finalScore) {
+            finalScore.textContent = `Final Score: ${data.score} / ${totalRounds}`;
+        }
+        if (data.config) {
+            document.getElementById('rounds').value = data.config.rounds;
+            document.getElementById('max_price').value = data.config.max_price;
+            document.getElementById('show_tax').checked = !!data.config.show_tax;
+            document.getElementById('require_minimal_bills').checked = !!data.config.require_minimal_bills;
+            document.getElementById('tax_rate').value = data.config.tax_rate;
+            if (taxWrap) taxWrap.style.display = document.getElementById('show_tax').checked ? 'block' : 'none';
+        }
+        if (configPanel) configPanel.style.display = (data.game_active || data.game_over) ? 'none' : 'block';
+        if (playPanel) playPanel.style.display = data.game_active ? 'block' : 'none';
+        if (overPanel) overPanel.style.display = data.game_over ? 'block' : 'none';
+        applyOrientationLayout();
+        updateDebug();
+    }
+
+    const submitAjax = GameCommon.submitAjax;
+
+    if (startBtn) {
+        startBtn.addEventListener('click', async () => {
+            startBtn.disabled = true;
+            try {
+                const payload = {
+                    rounds: document.getElementById('rounds')?.value,
+                    max_price: document.getElementById('max_price')?.value,
+                    tax_rate: document.getElementById('tax_rate')?.value,
+                    show_tax: document.getElementById('show_tax')?.checked,
+                    require_minimal_bills: document.getElementById('require_minimal_bills')?.checked,
+                };
+                const data = await submitAjax('start_game', payload);
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not start game. Please try again.');
+            } finally {
+                startBtn.disabled = false;
+            }
+        });
+    }
+
+    if (submitBtn) {
+        submitBtn.addEventListener('click', async () => {
+            if (!app || app.dataset.active !== 'true') return;
+            effectiveAnswer();
+            try {
+                const data = await submitAjax('answer', {
+                    answer: answerField ? answerField.value : '',
+                    debug_payload: debugInput ? debugInput.value : ''
+                });
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not submit. Please try again.');
+            }
+        });
+    }
+
+    if (skipBtn) {
+        skipBtn.addEventListener('click', async () => {
+            try {
+                const data = await submitAjax('skip_round');
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not skip. Please try again.');
+            }
+        });
+    }
+
+    if (restartBtn) {
+        restartBtn.addEventListener('click', async () => {
+            try {
+                const data = await submitAjax('reset_to_config');
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not restart. Please try again.');
+            }
+        });
+    }
+
+    if (overResetBtn) {
+        overResetBtn.addEventListener('click', async () => {
+            try {
+                const data = await submitAjax('reset_to_config');
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not reset. Please try again.');
+            }
+        });
+    }
+
+    if (footerRestart) {
+        footerRestart.addEventListener('click', async (e) => {
+            e.preventDefault();
+            try {
+                const data = await submitAjax('reset_to_config');
+                applyState(data);
+            } catch (err) {
+                console.error(err);
+                alert('Could not restart. Please try again.');
+            }
+        });
+        updateFooterRestartVisibility();
+    }
+
+    if (fsBtn) {
+        const updateFsButton = () => {
+            const isFs = document.fullscreenElement || document.webkitFullscreenElement || document.mozFullScreenElement || document.msFullscreenElement;
+            fsBtn.textContent = isFs ? 'Exit full screen' : 'Full screen';
+        };
+        fsBtn.addEventListener('click', GameCommon.toggleFullscreen);
+        document.addEventListener('fullscreenchange', updateFsButton);
+        document.addEventListener('webkitfullscreenchange', updateFsButton);
+        updateFsButton();
+    }
+
+    function applyOrientationLayout() {
+        if (!playWrapper) return;
+        const portrait = window.innerHeight > window.innerWidth;
+        playWrapper.classList.toggle('portrait', portrait);
+        if (playShell) playShell.classList.toggle('portrait', portrait);
+    }
+
+    window.addEventListener('resize', applyOrientationLayout);
+
+    resetCounts();
+    updateTotals();
+    applyOrientationLayout();
+});
@@ -0,0 +1,105 @@
+"""© Cigav Productions LLC
+Batch grading (check_answers) agrees with grading each answer through submit_answer."""
+import math
+
+import pytest
+
+from math_games import GameRegistry
+from math_games.base_game import BaseGameEngine
+from math_games import batch
+
+ROUNDS = 40
+HUGE = str(2 ** 70)
+
+# (game_id, config) pairs covering every grading rule
+CONFIGS = [
+    ('rounding', {}),
+    ('rounding', {'factor': 10}),
+    ('addition', {}),
+    ('money', {}),
+    ('money', {'require_minimal_bills': True}),
+    ('money', {'allow_overpay': True}),
+    ('money', {'require_minimal_bills': True, 'allow_overpay': True}),
+    ('money', {'bill_limit_mode': 'intermediate'}),
+    ('money', {'bill_limit_mode': 'hard', 'allow_overpay': True}),
+    ('change', {}),
+    ('change', {'require_minimal_bills': True}),
+]
+
+
+def counts_answer(counts):
+    return ','.join(f'{den}:{count}' for den, count in counts.items())
+
+
+def answers_for(game_id, data):
+    """Right, wrong and malformed answers for one round."""
+    if game_id == 'rounding':
+        return ['up', 'down', 'UP', 'sideways', '']
+    if game_id == 'addition':
+        total = data['number1'] + data['number2']
+        return [str(total), str(total + 1), f' {total} ', 'abc', '', HUGE]
+    if game_id == 'money':
+        pay_target = math.ceil(data['total_due'])
+        return [
+            counts_answer(data['best_combo']),
+            f'1:{pay_target}',
+            f'20:{pay_target // 20 + 1}',
+            '5:1',
+            '20:-1,1:2,1:3',
+            '20:x,7:3,junk',
+            f'1:{HUGE}',
+            '',
+        ]
+    change_due = data['change_due_cents']
+    return [
+        counts_answer(data['best_change_counts']),
+        f'1:{change_due}',
+        f'1:{change_due + 1}',
+        '25:-2',
+        f'100:{HUGE}',
+        'nonsense',
+        '',
+    ]
+
+
+def submit_one(game_class, config, data, answer):
+    """Grade one answer the way a player's engine does."""
+    engine = game_class(**config)
+    engine.load_round(data)
+    is_correct, _ = engine.submit_answer(answer)
+    return is_correct
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def array_backend(request, monkeypatch):
+    """Run the test once with NumPy (when installed) and once on the plain Python path."""
+    if request.param == 'numpy':
+        monkeypatch.setattr(batch, 'np', pytest.importorskip('numpy'))
+    else:
+        monkeypatch.setattr(batch, 'np', None)
+    return request.param
+
+
+@pytest.mark.parametrize('game_id,config', CONFIGS)
+def test_check_answers_matches_submit_answer(array_backend, game_id, config):
+    game_class = GameRegistry.get_game(game_id)
+    engine = game_class(seed=11, **config)
+    rounds, answers = [], []
+    for data in engine.generate_rounds(ROUNDS):
+        for answer in answers_for(game_id, data):
+            rounds.append(data)
+            answers.append(answer)
+    expected = [submit_one(game_class, config, data, answer) for data, answer in zip(rounds, answers)]
+    assert engine.check_answers(rounds, answers) == expected
+    # Both outcomes are exercised, so a grader stuck on one answer cannot pass
+    assert True in expected and False in expected
+
+
+@pytest.mark.parametrize('game_id,config', CONFIGS)
+def test_default_check_answers_matches_submit_answer(game_id, config):
+    game_class = GameRegistry.get_game(game_id)
+    engine = game_class(seed=11, **config)
+    rounds = engine.generate_rounds(5)
+    pairs = [(data, answer) for data in rounds for answer in answers_for(game_id, data)]
+    expected = [submit_one(game_class, config, data, answer) for data, answer in pairs]
+    assert BaseGameEngine.check_answers(engine, *zip(*pairs)) == expected
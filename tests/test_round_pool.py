@@ -0,0 +1,31 @@
+"""© Cigav Productions LLC
+Round pools are only built for engines that opt in with SUPPORTS_ROUND_POOL."""
+import pytest
+
+from math_games import GameRegistry, RoundPoolRegistry
+from math_games.game_engine import RoundingGameEngine
+
+
+class UnpooledRoundingEngine(RoundingGameEngine):
+    SUPPORTS_ROUND_POOL = False
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    RoundPoolRegistry.clear()
+    yield
+    RoundPoolRegistry.clear()
+
+
+@pytest.mark.parametrize('game_id', sorted(GameRegistry.list_games()))
+def test_registered_games_get_pools(game_id):
+    game_class = GameRegistry.get_game(game_id)
+    pool = RoundPoolRegistry.get_pool(game_class, game_class.get_default_config())
+    assert pool is not None
+    assert RoundPoolRegistry.get_pool(game_class, game_class.get_default_config()) is pool
+    engine = game_class()
+    engine.load_round(pool.take())
+
+
+def test_engines_without_opt_in_get_no_pool():
+    assert RoundPoolRegistry.get_pool(UnpooledRoundingEngine, {}) is None
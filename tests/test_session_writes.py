@@ -0,0 +1,47 @@
+"""© Cigav Productions LLC
+Read-only requests leave the SQLite session store untouched."""
+import pytest
+
+from math_games import StateCodec
+from web_app import app
+from web_support.session_store import GameStateSessionSerializer, ServerSideSessionInterface, SQLiteSessionStore
+
+
+class CountingStore(SQLiteSessionStore):
+    """SQLite store counting the rows written through this thread's connection."""
+
+    @property
+    def writes(self):
+        return self._connect().total_changes
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = CountingStore(str(tmp_path / 'sessions.sqlite3'), serializer=GameStateSessionSerializer(StateCodec.encode, StateCodec.decode))
+    monkeypatch.setattr(app, 'session_interface', ServerSideSessionInterface(store))
+    return store
+
+
+def test_store_skips_unchanged_saves(store):
+    before = store.writes
+    store.save('sid', {'a': 1}, 3600)
+    store.save('sid', {'a': 1}, 3600)
+    assert store.writes == before + 1
+    store.save('sid', {'a': 2}, 1)
+    assert store.writes == before + 2
+    # Within half a lifetime of expiring, an unchanged session is written again to extend it
+    store.save('sid', {'a': 2}, 3600)
+    assert store.writes == before + 3
+
+
+@pytest.mark.parametrize('game_id', ['rounding', 'money', 'change'])
+def test_read_only_requests_do_not_write(store, game_id):
+    client = app.test_client()
+    client.post(f'/game/{game_id}', data={'action': 'start_game'})
+    client.get(f'/game/{game_id}')
+    before = store.writes
+    for url in (f'/game/{game_id}', f'/api/game/{game_id}/state', f'/api/game/{game_id}/history', f'/game/{game_id}'):
+        assert client.get(url).status_code == 200
+    assert store.writes == before
+    client.post(f'/api/game/{game_id}/action', json={'action': 'answer', 'answer': '0'})
+    assert store.writes == before + 1
@@ -0,0 +1,75 @@
+"""© Cigav Productions LLC
+Round trips of every registered game's state through StateCodec, on both blob formats."""
+import pytest
+
+from math_games import GameRegistry, StateCodec
+from math_games import state_codec
+
+GAME_IDS = sorted(GameRegistry.list_games())
+
+
+def engine_states(game_id, rounds=4):
+    """Serialized engine states over a few rounds of play, with an answer given every other round."""
+    engine = GameRegistry.get_game(game_id)(seed=7)
+    states = [engine.serialize_state()]
+    for i in range(rounds):
+        engine.start_round()
+        states.append(engine.serialize_state())
+        if i % 2:
+            engine.submit_answer('0')
+            states.append(engine.serialize_state())
+    return states
+
+
+def odd_states(game_id):
+    """States outside what the engine writes: missing fields and non-string keys outside STATE_COUNTS."""
+    state = engine_states(game_id, rounds=1)[-1]
+    partial = {k: v for i, (k, v) in enumerate(sorted(state.items())) if i % 2}
+    return [
+        {},
+        partial,
+        dict(state, extras={20: 1, 5: {1: 2}}, note='x'),
+        dict(state, config=dict(state.get('config', {}), weights={1: 0.5, 2: 0.5})),
+        {'score': 3, 'mixed': {1: 'a', 'b': 2, None: [1, 2]}, '__keyed__': 1},
+    ]
+
+
+@pytest.fixture(params=['json', 'msgpack'])
+def backend(request, monkeypatch):
+    """Run the test once per blob format; the msgpack run needs msgpack installed."""
+    if request.param == 'msgpack':
+        monkeypatch.setattr(state_codec, 'msgpack', pytest.importorskip('msgpack'))
+    else:
+        monkeypatch.setattr(state_codec, 'msgpack', None)
+    return request.param
+
+
+@pytest.mark.parametrize('game_id', GAME_IDS)
+def test_engine_states_round_trip(backend, game_id):
+    for state in engine_states(game_id):
+        blob = StateCodec.encode(game_id, state)
+        assert blob[:1] == (b'M' if backend == 'msgpack' else b'J')
+        assert StateCodec.decode(blob) == (game_id, state)
+
+
+@pytest.mark.parametrize('game_id', GAME_IDS)
+def test_non_string_keys_round_trip(backend, game_id):
+    for state in odd_states(game_id):
+        assert StateCodec.decode(StateCodec.encode(game_id, state)) == (game_id, state)
+
+
+def test_json_rejects_unsupported_keys(monkeypatch):
+    monkeypatch.setattr(state_codec, 'msgpack', None)
+    with pytest.raises(TypeError):
+        StateCodec.encode(GAME_IDS[0], {'extras': {(1, 2): 3}})
+
+
+@pytest.mark.parametrize('game_id', GAME_IDS)
+def test_backends_decode_alike(monkeypatch, game_id):
+    msgpack = pytest.importorskip('msgpack')
+    for state in engine_states(game_id) + odd_states(game_id):
+        monkeypatch.setattr(state_codec, 'msgpack', None)
+        json_blob = StateCodec.encode(game_id, state)
+        monkeypatch.setattr(state_codec, 'msgpack', msgpack)
+        msgpack_blob = StateCodec.encode(game_id, state)
+        assert StateCodec.decode(json_blob) == StateCodec.decode(msgpack_blob)
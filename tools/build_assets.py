@@ -0,0 +1,210 @@
+"""© Cigav Productions LLC
+Builds right-sized images and minified page bundles, content-hashed, into static/dist.
+
+Run ``python tools/build_assets.py`` after changing any image under the image directories
+below or any file in static/src, and commit static/dist. Install tools/requirements.txt first:
+its pinned Pillow and minifiers produced the committed outputs, so other versions (or the
+fallback stripper) change the content hashes.
+
+Each source image gets a variant per width in its original format and in WebP, named
+``<stem>-<width>.<hash>.<ext>``; each page stylesheet and script in static/src becomes a
+minified ``bundles/<stem>.<hash>.<ext>`` (rcssmin/rjsmin when installed, a conservative
+whitespace and comment stripper otherwise). Outputs get a ``.gz`` copy when gzip makes
+them noticeably smaller. static/dist/manifest.json maps each source path (e.g.
+``coins/penny.png``, ``src/game_money.js``) to its outputs; the app serves them under
+/assets/ with immutable caching and falls back to the sources for anything not built.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # only this build step needs Pillow, not the app
+    Image = None
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:  # optional; the built-in strippers below are used instead
+    rcssmin = rjsmin = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+BUNDLE_SOURCE_DIR = 'src'
+MANIFEST = 'manifest.json'
+BANNER = '/* © Cigav Productions LLC */\n'
+
+# Source directory under static/ -> variant widths in pixels (about 1x and 2x of the largest CSS size)
+SOURCES: Dict[str, Tuple[int, ...]] = {
+    'coins': (64, 128),
+    'bills': (160, 320, 640),
+    'screens': (480, 960),
+}
+EXTENSIONS = {'.png': 'png', '.jpg': 'jpeg', '.jpeg': 'jpeg'}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+# Keep a .gz copy only when it saves at least this fraction of the file
+GZIP_MIN_SAVING = 0.1
+
+
+def encode(image, fmt: str) -> bytes:
+    """Image bytes in ``fmt`` ('png', 'jpeg' or 'webp')."""
+    buffer = io.BytesIO()
+    if fmt == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    elif fmt == 'jpeg':
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    return buffer.getvalue()
+
+
+def write_variant(directory: str, stem: str, width: int, ext: str, data: bytes) -> str:
+    """Write one content-hashed image variant; return its path under dist/."""
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return write_output(f'{directory}/{stem}-{width}.{digest}.{ext}', data)
+
+
+def write_output(rel_path: str, data: bytes) -> str:
+    """Write a build output (and its .gz when worthwhile) under dist/ and return ``rel_path``."""
+    path = os.path.join(DIST_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) <= len(data) * (1 - GZIP_MIN_SAVING):
+        with open(path + '.gz', 'wb') as f:
+            f.write(compressed)
+    return rel_path
+
+
+def build_image(directory: str, filename: str, widths: Tuple[int, ...]) -> Dict[str, object]:
+    """Build every variant of one source image and return its manifest entry."""
+    stem, ext = os.path.splitext(filename)
+    fmt = EXTENSIONS[ext.lower()]
+    with Image.open(os.path.join(STATIC_DIR, directory, filename)) as source:
+        source.load()
+        if fmt == 'png' and source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA')
+        # Never upscale; an image narrower than every width gets one variant at its own size
+        targets = sorted({min(width, source.width) for width in widths})
+        variants: Dict[str, List[Tuple[str, int]]] = {fmt: [], 'webp': []}
+        for width in targets:
+            height = max(1, round(source.height * width / source.width))
+            image = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            variants[fmt].append((write_variant(directory, stem, width, ext.lstrip('.').lower(), encode(image, fmt)), width))
+            variants['webp'].append((write_variant(directory, stem, width, 'webp', encode(image, 'webp')), width))
+        return {'width': source.width, 'height': source.height, 'format': fmt, 'variants': variants}
+
+
+_CSS_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+
+
+def minify_css(text: str) -> str:
+    """Drop comments and redundant whitespace, leaving quoted strings alone."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    parts = _CSS_STRING.split(text)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[i])
+        part = re.sub(r'\s*([{};,])\s*', r'\1', part)
+        parts[i] = re.sub(r':\s+', ':', part).replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_js(text: str) -> str:
+    """Minify with rjsmin, or strip indentation, blank lines and whole-line comments (line breaks kept for ASI)."""
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    text = re.sub(r'\A\s*/\*.*?\*/', '', text, flags=re.S)
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def build_bundle(filename: str) -> Dict[str, object]:
+    """Minify one page stylesheet or script and return its manifest entry."""
+    stem, ext = os.path.splitext(filename)
+    with open(os.path.join(STATIC_DIR, BUNDLE_SOURCE_DIR, filename), encoding='utf-8') as f:
+        source = f.read()
+    minified = minify_css(source) if ext == '.css' else minify_js(source)
+    data = (BANNER + minified + '\n').encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return {'format': ext.lstrip('.'), 'path': write_output(f'bundles/{stem}.{digest}{ext}', data)}
+
+
+def remove_stale(keep: set) -> int:
+    """Delete build outputs no longer referenced by the manifest."""
+    removed = 0
+    for dirpath, _, filenames in os.walk(DIST_DIR):
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, filename), DIST_DIR).replace(os.sep, '/')
+            if rel_path == MANIFEST or rel_path in keep or (rel_path.endswith('.gz') and rel_path[:-3] in keep):
+                continue
+            os.remove(os.path.join(dirpath, filename))
+            removed += 1
+    return removed
+
+
+def build() -> Dict[str, Dict[str, object]]:
+    """Build all sources, write the manifest and prune stale outputs."""
+    manifest: Dict[str, Dict[str, object]] = {}
+    for directory, widths in SOURCES.items():
+        source_dir = os.path.join(STATIC_DIR, directory)
+        if not os.path.isdir(source_dir):
+            continue
+        for filename in sorted(os.listdir(source_dir)):
+            if os.path.splitext(filename)[1].lower() in EXTENSIONS:
+                manifest[f'{directory}/{filename}'] = build_image(directory, filename, widths)
+    bundle_dir = os.path.join(STATIC_DIR, BUNDLE_SOURCE_DIR)
+    if os.path.isdir(bundle_dir):
+        for filename in sorted(os.listdir(bundle_dir)):
+            if os.path.splitext(filename)[1] in ('.css', '.js'):
+                manifest[f'{BUNDLE_SOURCE_DIR}/{filename}'] = build_bundle(filename)
+    os.makedirs(DIST_DIR, exist_ok=True)
+    with open(os.path.join(DIST_DIR, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    keep = {entry['path'] for entry in manifest.values() if 'path' in entry}
+    keep.update(path for entry in manifest.values() for variants in entry.get('variants', {}).values()
+                for path, _ in variants)
+    remove_stale(keep)
+    return manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args(argv)
+    if Image is None:
+        print('Pillow is required to build assets (pip install -r tools/requirements.txt)', file=sys.stderr)
+        return 1
+    if rjsmin is None:
+        print('rjsmin/rcssmin are not installed (pip install -r tools/requirements.txt); bundles will not '
+              'match the committed hashes', file=sys.stderr)
+    manifest = build()
+    for source, entry in sorted(manifest.items()):
+        original = os.path.getsize(os.path.join(STATIC_DIR, source))
+        if 'path' in entry:
+            path = os.path.join(DIST_DIR, entry['path'])
+            gz = f", {os.path.getsize(path + '.gz') / 1024:.1f} KB gzipped" if os.path.exists(path + '.gz') else ''
+            print(f'{source:24} {original / 1024:8.1f} KB -> {os.path.getsize(path) / 1024:.1f} KB{gz}')
+            continue
+        sizes = ', '.join(
+            f"{width}w {os.path.getsize(os.path.join(DIST_DIR, path)) / 1024:.1f}/"
+            f"{os.path.getsize(os.path.join(DIST_DIR, webp)) / 1024:.1f} KB"
+            for (path, width), (webp, _) in zip(entry['variants'][entry['format']], entry['variants']['webp'])
+        )
+        print(f'{source:24} {original / 1024:8.1f} KB -> {sizes} ({entry["format"]}/webp)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,101 @@
 """© Cigav Productions LLC"""
 """© Cigav Productions LLC"""
-from flask import Flask, render_template, request, session, redirect, url_for, jsonify
-from math_games import GameRegistry
+import os
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, abort, g
+from math_games import GameRegistry, RoundPoolRegistry, StateCodec
+from math_games.item_catalog import ItemCatalog
 from math_games.web_ui import WebUI
-from game_handlers import HandlerRegistry
+from game_handlers import BaseGameHandler, GameView, HandlerRegistry
+from game_handlers.history import append_history, history_page, reset_history
+from web_support import (
+    AssetManifest,
+    EngineCache,
+    GameStateSessionSerializer,
+    ServerSideSessionInterface,
+    create_history_archive,
+    create_session_store,
+    engine_state_matches,
+    init_compression,
+    init_template_caching,
+    init_metrics,
+    item_image_url,
+    phase,
+    send_built_asset,
+    static_bundle_url,
+    static_image_set,
+    static_image_srcset,
+    static_image_url,
+    timed,
+)
 from jinja2.exceptions import TemplateNotFound
 
 app = Flask(__name__)
-app.secret_key = 'your-secret-key-here'  # Required for session management
-
-
+# Required for session management; every worker process must share the same key
+app.secret_key = os.environ.get('MATH_GAME_SECRET_KEY', 'your-secret-key-here')
+# Game state and history live server-side; the cookie only carries a signed session ID.
+# Use SESSION_BACKEND=sqlite to share sessions between processes.
+app.config['SESSION_BACKEND'] = os.environ.get('MATH_GAME_SESSION_BACKEND', 'memory')
+app.config['SESSION_SQLITE_PATH'] = os.environ.get(
+    'MATH_GAME_SESSION_PATH', os.path.join(app.instance_path, 'sessions.sqlite3')
+)
+# Persisted sessions store each game's state with the compact StateCodec
+app.session_interface = ServerSideSessionInterface(
+    create_session_store(app.config, GameStateSessionSerializer(StateCodec.encode, StateCodec.decode))
+)
+# Sessions keep the last HISTORY_LIMIT history entries; older ones go to this archive (HISTORY_BACKEND, default: same as sessions).
+app.config['HISTORY_BACKEND'] = os.environ.get('MATH_GAME_HISTORY_BACKEND')
+app.config['HISTORY_SQLITE_PATH'] = os.environ.get(
+    'MATH_GAME_HISTORY_PATH', os.path.join(app.instance_path, 'history.sqlite3')
+)
+app.extensions['history_archive'] = create_history_archive(app.config)
+# New rounds come from per-config pools of pre-generated rounds; set MATH_GAME_ROUND_POOLS=0 to generate inline.
+app.config['ROUND_POOLS'] = os.environ.get('MATH_GAME_ROUND_POOLS', '1') != '0'
+# Live engines are kept between requests per (session, game) and rebuilt from session state only on a miss;
+# MATH_GAME_ENGINE_CACHE_SIZE=0 disables the cache.
+app.config['ENGINE_CACHE_SIZE'] = int(os.environ.get('MATH_GAME_ENGINE_CACHE_SIZE', '10000'))
+app.config['ENGINE_CACHE_TTL'] = float(os.environ.get('MATH_GAME_ENGINE_CACHE_TTL', '1800'))
+if app.config['ENGINE_CACHE_SIZE'] > 0:
+    app.extensions['engine_cache'] = EngineCache(app.config['ENGINE_CACHE_SIZE'], app.config['ENGINE_CACHE_TTL'])
+# Per-phase request timings (Server-Timing headers and /metrics); enable with MATH_GAME_METRICS=1.
+app.config['METRICS'] = os.environ.get('MATH_GAME_METRICS', '0') == '1'
+
+
+# Right-sized images and minified page bundles built by tools/build_assets.py; anything unbuilt is served from its source.
+app.extensions['asset_manifest'] = AssetManifest.load(os.path.join(app.static_folder, 'dist'))
+
+
+app.jinja_env.globals['item_image_url'] = item_image_url
+app.jinja_env.globals['static_bundle_url'] = static_bundle_url
+app.jinja_env.globals['static_image_url'] = static_image_url
+app.jinja_env.globals['static_image_srcset'] = static_image_srcset
+app.jinja_env.globals['static_image_set'] = static_image_set
+# Compiled templates are kept on disk so new workers skip compiling them (empty MATH_GAME_TEMPLATE_CACHE_DIR disables);
+# {% cache %} blocks that depend only on the game and its config render once per key (MATH_GAME_FRAGMENT_CACHE_SIZE=0 disables).
+app.config['TEMPLATE_CACHE_DIR'] = os.environ.get(
+    'MATH_GAME_TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'template_cache')
+)
+app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('MATH_GAME_FRAGMENT_CACHE_SIZE', '512'))
+init_template_caching(app, app.config['TEMPLATE_CACHE_DIR'], app.config['FRAGMENT_CACHE_SIZE'])
+
+
+def metrics_game_label() -> str:
+    """Game ID of the current request for metric labels, limited to registered games."""
+    game_id = (request.view_args or {}).get('game_id', '')
+    return game_id if GameRegistry.get_game(game_id) is not None else ''
+
+
+if app.config['METRICS']:
+    init_metrics(app, metrics_game_label)
+
+# Compress text responses (brotli when installed, else gzip) from COMPRESSION_MIN_SIZE bytes;
+# MATH_GAME_COMPRESSION=0 leaves compression to a front proxy.
+app.config['COMPRESSION'] = os.environ.get('MATH_GAME_COMPRESSION', '1') != '0'
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('MATH_GAME_COMPRESSION_MIN_SIZE', '500'))
+if app.config['COMPRESSION']:
+    init_compression(app, app.config['COMPRESSION_MIN_SIZE'])
+
+
+@timed('game_state')
 def get_or_create_game_state(game_id: str):
     """Get or create serializable game state data for a specific game."""
     if 'games' not in session:
@@ -23,9 +109,8 @@ def get_or_create_game_state(game_id: str):
         
         default_config = game_class.get_default_config() if hasattr(game_class, 'get_default_config') else {}
         
-        # Get handler to create proper initial state
-        engine = game_class(**default_config) if default_config else game_class()
-        handler = HandlerRegistry.get_handler(game_id, engine)
+        # Get handler to create proper initial state (no engine needed for that)
+        handler = HandlerRegistry.get_handler(game_id, None, create_game_engine)
         
         if handler:
             initial_state = handler.get_initial_state(default_config)
@@ -44,7 +129,31 @@ def get_or_create_game_state(game_id: str):
     return session['games'][game_id]
 
 
+def _engine_cache_key(game_id: str):
+    """Engine cache key for the current session, or None when engines cannot be cached."""
+    sid = getattr(session, 'sid', None)
+    if not sid or 'engine_cache' not in app.extensions:
+        return None
+    return sid, game_id
+
+
 def create_game_engine(game_id: str, game_state: dict):
+    """Get the game engine for a game state: the cached live engine when it is current, otherwise a rebuilt one."""
+    key = _engine_cache_key(game_id)
+    engine = None
+    if key is not None:
+        engine = app.extensions['engine_cache'].checkout(key, game_state.get('engine_rev'))
+    if engine is None:
+        engine = build_game_engine(game_id, game_state)
+    if engine is not None and key is not None:
+        # The last engine created for a game this request is cached when the request ends,
+        # with the revision of the state it was checked out (or rebuilt) at
+        g.setdefault('live_engines', {})[game_id] = (engine, game_state, game_state.get('engine_rev'))
+    return engine
+
+
+@timed('engine_rebuild')
+def build_game_engine(game_id: str, game_state: dict):
     """Create a game engine instance from game state."""
     game_class = GameRegistry.get_game(game_id)
     if game_class is None:
@@ -59,9 +168,40 @@ def create_game_engine(game_id: str, game_state: dict):
     if hasattr(engine, 'deserialize_state'):
         engine.deserialize_state(game_state)
     
+    if app.config['ROUND_POOLS']:
+        pool = RoundPoolRegistry.get_pool(game_class, config)
+        if pool is not None:
+            engine.round_source = pool.take
+    
     return engine
 
 
+@app.after_request
+def cache_live_engines(response):
+    """Keep this request's engines for the next one when the session still holds the state they came from."""
+    live = g.pop('live_engines', None)
+    if not live or response.status_code >= 500:
+        return response
+    cache = app.extensions['engine_cache']
+    games = session.get('games', {})
+    read_only = request.method in ('GET', 'HEAD')
+    for game_id, (engine, game_state, base_revision) in live.items():
+        key = _engine_cache_key(game_id)
+        if games.get(game_id) is not game_state:
+            continue
+        if read_only and base_revision is not None and game_state.get('engine_rev') == base_revision:
+            # Nothing changed the state, so the session keeps its revision and needs no write
+            cache.checkin(key, base_revision, engine)
+            continue
+        if not engine_state_matches(engine, game_state):
+            continue
+        revision = cache.new_revision()
+        game_state['engine_rev'] = revision
+        session.modified = True
+        cache.checkin(key, revision, engine)
+    return response
+
+
 def extract_config_from_form(game_class, request_form):
     """Extract configuration values from form data."""
     config = {}
@@ -91,25 +231,109 @@ def extract_config_from_form(game_class, request_form):
     return config
 
 
+def dispatch_json_action(game_id: str, handler, game_state: dict, ui):
+    """Route an AJAX action to the handler method registered for (game_id, action)."""
+    data = request.get_json(silent=True) or {}
+    action_method = HandlerRegistry.get_action(game_id, data.get('action'))
+    if handler is None or action_method is None:
+        return jsonify({"error": "Unsupported action"}), 400
+    try:
+        with phase('handler'):
+            result = action_method(handler, data, game_state, ui)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if result is None:
+        return jsonify({"error": "Unsupported action"}), 400
+    return jsonify(result)
+
+
+def load_game(game_id: str):
+    """Return (game_class, game_state, engine, handler) for a game, or None if it is unknown."""
+    game_class = GameRegistry.get_game(game_id)
+    if game_class is None:
+        return None
+    game_state = get_or_create_game_state(game_id)
+    if game_state is None:
+        return None
+    engine = create_game_engine(game_id, game_state)
+    if engine is None:
+        return None
+    handler = HandlerRegistry.get_handler(game_id, engine, create_game_engine)
+    return game_class, game_state, engine, handler
+
+
 @app.route('/')
 def index():
     """Game selection page."""
     games = GameRegistry.list_game_info()
-    return render_template('index.html', games=games)
+    with phase('render'):
+        return render_template('index.html', games=games)
+
+
+@app.route('/items/<int:item_id>.svg')
+def item_image(item_id):
+    """Serve a pre-rendered item card image with long-lived caching."""
+    image = ItemCatalog.image_svg(item_id)
+    if image is None:
+        abort(404)
+    body, etag = image
+    response = app.response_class(body, mimetype='image/svg+xml')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+@app.route('/assets/<path:filename>')
+def built_asset(filename):
+    """Serve a built image variant; its content hash is in the name, so it is cached for good."""
+    return send_built_asset(filename)
+
+
+@app.route('/api/game/<game_id>/state')
+def api_game_state(game_id):
+    """Current game state as slim JSON, for clients that poll or resume without a page render."""
+    if GameRegistry.get_game(game_id) is None:
+        return jsonify({"error": "Unknown game"}), 404
+    get_or_create_game_state(game_id)
+    handler = HandlerRegistry.get_handler(game_id, None, create_game_engine)
+    if handler is None:
+        return jsonify({"error": "Unknown game"}), 404
+    handler.slim_responses = True
+    return jsonify(handler.json_response([]))
+
+
+@app.route('/api/game/<game_id>/action', methods=['POST'])
+def api_game_action(game_id):
+    """Run a game action (same payloads as AJAX posts to /game/<game_id>) and return slim JSON."""
+    loaded = load_game(game_id)
+    if loaded is None:
+        return jsonify({"error": "Unknown game"}), 404
+    _, game_state, _, handler = loaded
+    if handler is not None:
+        handler.slim_responses = True
+    return dispatch_json_action(game_id, handler, game_state, WebUI())
+
+
+@app.route('/api/game/<game_id>/history')
+def api_game_history(game_id):
+    """Page through the game's full history (archived and live entries), oldest first."""
+    if GameRegistry.get_game(game_id) is None:
+        return jsonify({"error": "Unknown game"}), 404
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(200, max(1, request.args.get('limit', 50, type=int)))
+    return jsonify(history_page(game_id, offset, limit))
 
 
 @app.route('/game/<game_id>', methods=['GET', 'POST'])
 def game(game_id):
     """Main game route for a specific game."""
-    # Check if game exists
-    game_class = GameRegistry.get_game(game_id)
-    if game_class is None:
-        return redirect(url_for('index'))
-    default_config = game_class.get_default_config() if hasattr(game_class, 'get_default_config') else {}
-    
-    game_state = get_or_create_game_state(game_id)
-    if game_state is None:
+    # Check if game exists and restore its state, engine and handler
+    loaded = load_game(game_id)
+    if loaded is None:
         return redirect(url_for('index'))
+    game_class, game_state, engine, handler = loaded
 
     ui = WebUI()
     
@@ -117,14 +341,6 @@ def game(game_id):
     if 'debug' in request.args:
         val = request.args.get('debug', '0').lower()
         session['show_debug'] = val in ('1', 'true', 'yes', 'on')
-    
-    # Create game engine with current state
-    engine = create_game_engine(game_id, game_state)
-    if engine is None:
-        return redirect(url_for('index'))
-    
-    # Get handler for this game
-    handler = HandlerRegistry.get_handler(game_id, engine)
 
     # If coming fresh from index (fresh=1), reset to initial config screen
     if request.args.get('fresh') == '1':
@@ -142,16 +358,20 @@ def game(game_id):
         initial_state['active'] = False
         initial_state['over'] = False
         session['games'][game_id] = initial_state
-        session['history'] = []
+        reset_history(game_id)
         game_state = initial_state
         engine = create_game_engine(game_id, game_state)
-        handler = HandlerRegistry.get_handler(game_id, engine)
+        handler = HandlerRegistry.get_handler(game_id, engine, create_game_engine)
 
     if request.method == 'POST':
+        # AJAX clients (no page reload) are routed through the handler action table
+        if request.is_json:
+            return dispatch_json_action(game_id, handler, game_state, ui)
+
         if 'action' in request.form:
             if request.form['action'] == 'restart':
                 # Reset state so the config screen shows instead of looping on game over
-                session['history'] = []
+                reset_history(game_id)
                 config = game_state.get('config', game_class.get_default_config())
                 if handler:
                     fresh_state = handler.get_initial_state(config)
@@ -191,14 +411,16 @@ def game(game_id):
                 initial_state['over'] = False
                 
                 session['games'][game_id] = initial_state
-                session['history'] = []
+                reset_history(game_id)
                 
                 # Generate the first number
-                engine = game_class(**config)
+                engine = create_game_engine(game_id, initial_state)
+                if handler:
+                    handler.engine = engine
                 if hasattr(engine, 'start_round'):
                     state = engine.start_round()
                     if state and handler:
-                        handler.save_state_to_session(initial_state, state)
+                        handler.save_round_state(initial_state, state)
                         # Also save to engine attributes if needed
                         if hasattr(state, 'current_number'):
                             session['current_number'] = state.current_number
@@ -211,676 +433,7 @@ def game(game_id):
                 
                 return redirect(url_for('game', game_id=game_id))
         
-        # AJAX JSON handling for rounding game (no page reload)
-        if request.is_json and game_id == 'rounding':
-            data = request.get_json(silent=True) or {}
-            action = data.get('action')
-            def build_response(messages_list, extra=None):
-                gs = session['games'][game_id]
-                hist = session.get('history', [])
-                resp = {
-                    "game_active": gs.get('active', False),
-                    "game_over": gs.get('over', False),
-                    "score": gs.get('score', 0),
-                    "current_round": gs.get('current_round', 0),
-                    "total_rounds": gs.get('config', {}).get('rounds', gs.get('current_round', 0)),
-                    "number": gs.get('current_number'),
-                    "factor": gs.get('config', {}).get('factor', default_config.get('factor', 10)),
-                    "max_number": gs.get('config', {}).get('max_number', default_config.get('max_number', 100)),
-                    "show_axis": gs.get('config', {}).get('show_axis', default_config.get('show_axis', True)),
-                    "messages": messages_list,
-                    "history": list(reversed(hist)) if hist else []
-                }
-                if extra:
-                    resp.update(extra)
-                return jsonify(resp)
-
-            if action == 'start_game':
-                def _to_int(val, default):
-                    try:
-                        return int(val)
-                    except (TypeError, ValueError):
-                        return default
-                cfg = {
-                    "rounds": _to_int(data.get("rounds"), default_config.get("rounds", 10)),
-                    "max_number": _to_int(data.get("max_number"), default_config.get("max_number", 100)),
-                    "factor": _to_int(data.get("factor"), default_config.get("factor", 10)),
-                    "show_axis": bool(data.get("show_axis", default_config.get("show_axis", True))),
-                }
-                session['history'] = []
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                        'current_number': None,
-                    }
-                initial_state['config'] = cfg
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    ui.display_round(state)
-                    if state and hasattr(state, "current_number"):
-                        initial_state["current_number"] = getattr(state, "current_number", None)
-                        session['current_number'] = initial_state["current_number"]
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_response(msgs, {"started": True, "config": cfg})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'restart':
-                cfg = game_state.get('config', {})
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                        'current_number': None,
-                    }
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    ui.display_round(state)
-                    if state and hasattr(state, "current_number"):
-                        initial_state["current_number"] = getattr(state, "current_number", None)
-                        session['current_number'] = initial_state["current_number"]
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_response(msgs, {"started": True, "config": cfg})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-            
-            if action == 'reset_to_config':
-                cfg = game_state.get('config', default_config)
-                if handler:
-                    fresh_state = handler.get_initial_state(cfg)
-                else:
-                    fresh_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                        'current_number': None,
-                    }
-                fresh_state['active'] = False
-                fresh_state['over'] = False
-                session['history'] = []
-                session['current_number'] = None
-                session['games'][game_id] = fresh_state
-                session.modified = True
-                return build_response([], {"config": cfg, "game_active": False, "game_over": False})
-
-            elif action == 'answer' and game_state['active']:
-                answer = str(data.get('answer', '')).strip()
-                session['last_answer'] = answer
-                if handler:
-                    handler.save_pre_answer_state(game_state)
-                is_correct, state = engine.submit_answer(answer)
-                ui.display_result(is_correct)
-                if 'history' not in session:
-                    session['history'] = []
-                if handler:
-                    history_entry = handler.create_history_entry(answer, state, is_correct)
-                else:
-                    history_entry = {'answer': answer, 'is_correct': is_correct}
-                session['history'].append(history_entry)
-                game_state['score'] = engine.score
-                game_state['current_round'] = engine.current_round
-                new_state = engine.start_round()
-                if new_state is None:
-                    ui.display_game_over(state)
-                    game_state['active'] = False
-                    game_state['over'] = True
-                    session['current_number'] = None
-                else:
-                    if handler:
-                        handler.save_state_to_session(game_state, new_state)
-                        handler.setup_post_answer_ui(ui, new_state)
-                    game_state['active'] = True
-                    game_state['over'] = False
-                session['games'][game_id] = game_state
-                msgs = ui.get_messages(); ui.clear_messages()
-                return build_response(msgs)
-
-        # AJAX JSON handling for money game
-        if request.is_json and game_id == 'money':
-            data = request.get_json(silent=True) or {}
-            action = data.get('action')
-
-            def build_money_response(messages_list, extra=None):
-                gs = session['games'][game_id]
-                hist = session.get('history', [])
-                cfg = gs.get('config', {})
-                resp = {
-                    "game_active": gs.get('active', False),
-                    "game_over": gs.get('over', False),
-                    "score": gs.get('score', 0),
-                    "current_round": gs.get('current_round', 0),
-                    "total_rounds": cfg.get('rounds', gs.get('current_round', 0)),
-                    "item": {
-                        "name": gs.get('item_name', ''),
-                        "price": gs.get('item_price', 0),
-                        "tax_amount": gs.get('tax_amount', 0),
-                        "total_due": gs.get('total_due', 0),
-                        "tax_rate": gs.get('tax_rate', cfg.get('tax_rate', default_config.get('tax_rate', 0.0))),
-                        "show_tax": gs.get('show_tax', cfg.get('show_tax', default_config.get('show_tax', True))),
-                        "image": gs.get('item_image', ''),
-                    },
-                    "awaiting_retry": gs.get('awaiting_retry', False),
-                    "available_counts": gs.get('available_counts', {20: 999, 10: 999, 5: 999, 1: 999}),
-                    "messages": messages_list,
-                    "history": list(reversed(hist[-6:])) if hist else [],
-                    "full_history": hist,
-                    "config": cfg,
-                }
-                if extra:
-                    resp.update(extra)
-                return jsonify(resp)
-
-            def _bool(val, default):
-                if isinstance(val, bool):
-                    return val
-                if isinstance(val, str):
-                    return val.lower() in ('1', 'true', 'yes', 'on')
-                return default
-
-            def _int(val, default):
-                try:
-                    return int(val)
-                except (TypeError, ValueError):
-                    return default
-
-            def _float(val, default):
-                try:
-                    return float(val)
-                except (TypeError, ValueError):
-                    return default
-
-            if action == 'start_game':
-                cfg = {
-                    "rounds": _int(data.get('rounds'), default_config.get('rounds', 8)),
-                    "max_price": _int(data.get('max_price'), default_config.get('max_price', 50)),
-                    "tax_rate": _float(data.get('tax_rate'), default_config.get('tax_rate', 0.08)),
-                    "show_tax": _bool(data.get('show_tax'), default_config.get('show_tax', True)),
-                    "require_minimal_bills": _bool(data.get('require_minimal_bills'), default_config.get('require_minimal_bills', False)),
-                    "bill_limit_mode": data.get('bill_limit_mode', default_config.get('bill_limit_mode', 'easy')),
-                    "allow_overpay": _bool(data.get('allow_overpay'), default_config.get('allow_overpay', False)),
-                }
-                session['history'] = []
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['config'] = cfg
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_money_response(msgs, {"started": True})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'restart':
-                cfg = game_state.get('config', default_config)
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_money_response(msgs, {"started": True})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'reset_to_config':
-                cfg = game_state.get('config', default_config)
-                if handler:
-                    fresh_state = handler.get_initial_state(cfg)
-                else:
-                    fresh_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                fresh_state['active'] = False
-                fresh_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = fresh_state
-                session.modified = True
-                ui.clear_messages()
-                return build_money_response([], {"game_active": False, "game_over": False})
-
-            if action == 'skip_round' and handler and game_state.get('active'):
-                handler.handle_skip_round(game_state)
-                session.modified = True
-                ui.clear_messages()
-                ui.display_result(False)
-                ui._messages = ["Item skipped. Moving to next round."]
-                return build_money_response(ui.get_messages())
-
-            if action == 'answer' and game_state.get('active'):
-                session['last_submit_payload'] = data
-                session['debug_payload'] = data.get('debug_payload')
-                answer = str(data.get('answer', '')).strip()
-                session['last_answer'] = answer
-                if handler:
-                    handler.save_pre_answer_state(game_state)
-                is_correct, state = engine.submit_answer(answer)
-                try:
-                    session['engine_last_result'] = engine.get_last_result()
-                except Exception:
-                    session['engine_last_result'] = {}
-                try:
-                    session['engine_submit_debug'] = getattr(engine, "_last_result", {})
-                except Exception:
-                    session['engine_submit_debug'] = {}
-                ui.display_result(is_correct)
-                if 'history' not in session:
-                    session['history'] = []
-                if handler:
-                    history_entry = handler.create_history_entry(answer, state, is_correct)
-                else:
-                    history_entry = {'answer': answer, 'is_correct': is_correct}
-                session['history'].append(history_entry)
-                game_state['score'] = engine.score
-                game_state['current_round'] = engine.current_round
-                new_state = engine.start_round()
-                if new_state is None:
-                    ui.display_game_over(state)
-                    game_state['active'] = False
-                    game_state['over'] = True
-                else:
-                    if handler:
-                        handler.save_state_to_session(game_state, new_state)
-                        handler.setup_post_answer_ui(ui, new_state)
-                    else:
-                        if hasattr(new_state, 'item_name'):
-                            game_state['item_name'] = new_state.item_name
-                session['games'][game_id] = game_state
-                msgs = ui.get_messages(); ui.clear_messages()
-                return build_money_response(msgs)
-
-            return jsonify({"error": "Unsupported action"}), 400
-
-        # AJAX JSON handling for change game
-        if request.is_json and game_id == 'change':
-            data = request.get_json(silent=True) or {}
-            action = data.get('action')
-
-            def _bool(val, default):
-                if isinstance(val, bool):
-                    return val
-                if isinstance(val, str):
-                    return val.lower() in ('1', 'true', 'yes', 'on')
-                return default
-
-            def _int(val, default):
-                try:
-                    return int(val)
-                except (TypeError, ValueError):
-                    return default
-
-            def _float(val, default):
-                try:
-                    return float(val)
-                except (TypeError, ValueError):
-                    return default
-
-            def build_change_response(messages_list, extra=None):
-                gs = session['games'][game_id]
-                hist = session.get('history', [])
-                cfg = gs.get('config', {})
-                resp = {
-                    "game_active": gs.get('active', False),
-                    "game_over": gs.get('over', False),
-                    "score": gs.get('score', 0),
-                    "current_round": gs.get('current_round', 0),
-                    "total_rounds": cfg.get('rounds', gs.get('current_round', 0)),
-                    "item": {
-                        "name": gs.get('item_name', ''),
-                        "price": gs.get('item_price', 0),
-                        "tax_amount": gs.get('tax_amount', 0),
-                        "total_due": gs.get('total_due', 0),
-                        "tax_rate": cfg.get('tax_rate', default_config.get('tax_rate', 0.0)),
-                        "show_tax": gs.get('show_tax', cfg.get('show_tax', default_config.get('show_tax', True))),
-                        "image": gs.get('item_image', ''),
-                        "pay_total": gs.get('pay_total', 0),
-                        "pay_counts": gs.get('pay_counts', {}),
-                        "change_due": gs.get('change_due', 0),
-                    },
-                    "available_change": gs.get('available_counts', {1000:5,500:5,100:20,25:20,10:20,5:20,1:40}),
-                    "messages": messages_list,
-                    "history": list(reversed(hist[-6:])) if hist else [],
-                    "full_history": hist,
-                    "config": cfg,
-                    "change_due": gs.get('change_due', 0),
-                    "awaiting_retry": gs.get('awaiting_retry', False),
-                }
-                if extra:
-                    resp.update(extra)
-                return jsonify(resp)
-
-            if action == 'start_game':
-                cfg = {
-                    "rounds": _int(data.get('rounds'), default_config.get('rounds', 8)),
-                    "max_price": _int(data.get('max_price'), default_config.get('max_price', 50)),
-                    "tax_rate": _float(data.get('tax_rate'), default_config.get('tax_rate', 0.08)),
-                    "show_tax": _bool(data.get('show_tax'), default_config.get('show_tax', True)),
-                    "require_minimal_bills": _bool(data.get('require_minimal_bills'), default_config.get('require_minimal_bills', False)),
-                }
-                session['history'] = []
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['config'] = cfg
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_change_response(msgs, {"started": True})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'restart':
-                cfg = game_state.get('config', default_config)
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    session['games'][game_id] = initial_state
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_change_response(msgs, {"started": True})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'reset_to_config':
-                cfg = game_state.get('config', default_config)
-                if handler:
-                    fresh_state = handler.get_initial_state(cfg)
-                else:
-                    fresh_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                fresh_state['active'] = False
-                fresh_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = fresh_state
-                session.modified = True
-                ui.clear_messages()
-                return build_change_response([], {"game_active": False, "game_over": False})
-
-            if action == 'skip_round' and handler and game_state.get('active'):
-                handler.handle_skip_round(game_state)
-                session.modified = True
-                gs = session['games'][game_id]
-                msgs = ["Item skipped. Moving to next round."]
-                return build_change_response(msgs)
-
-            if action == 'answer' and game_state.get('active'):
-                answer = str(data.get('answer', '')).strip()
-                session['last_answer'] = answer
-                session['last_submit_payload'] = data
-                session['debug_payload'] = data.get('debug_payload')
-                if handler:
-                    handler.save_pre_answer_state(game_state)
-                is_correct, state = engine.submit_answer(answer)
-                ui.display_result(is_correct)
-                if 'history' not in session:
-                    session['history'] = []
-                if handler:
-                    history_entry = handler.create_history_entry(answer, state, is_correct)
-                else:
-                    history_entry = {'answer': answer, 'is_correct': is_correct}
-                session['history'].append(history_entry)
-                game_state['score'] = engine.score
-                game_state['current_round'] = engine.current_round
-                if is_correct:
-                    new_state = engine.start_round()
-                    if new_state is None:
-                        ui.display_game_over(state)
-                        game_state['active'] = False
-                        game_state['over'] = True
-                    else:
-                        if handler:
-                            handler.save_state_to_session(game_state, new_state)
-                    session['games'][game_id] = game_state
-                else:
-                    # stay on same item, keep awaiting retry
-                    game_state['active'] = True
-                    game_state['over'] = False
-                    game_state['awaiting_retry'] = True
-                    session['games'][game_id] = game_state
-                msgs = ui.get_messages(); ui.clear_messages()
-                return build_change_response(msgs)
-
-            return jsonify({"error": "Unsupported action"}), 400
-
-        # AJAX JSON handling for addition game (no page reload)
-        if request.is_json and game_id == 'addition':
-            data = request.get_json(silent=True) or {}
-            action = data.get('action')
-            def build_response(messages_list, extra=None):
-                gs = session['games'][game_id]
-                hist = session.get('history', [])
-                resp = {
-                    "game_active": gs.get('active', False),
-                    "game_over": gs.get('over', False),
-                    "score": gs.get('score', 0),
-                    "current_round": gs.get('current_round', 0),
-                    "total_rounds": gs.get('config', {}).get('rounds', gs.get('current_round', 0)),
-                    "number1": gs.get('number1'),
-                    "number2": gs.get('number2'),
-                    "messages": messages_list,
-                    "history": list(reversed(hist[-5:])) if hist else []
-                }
-                if extra:
-                    resp.update(extra)
-                return jsonify(resp)
-
-            if action == 'start_game':
-                # Create new game with provided config
-                def _to_int(val, default):
-                    try:
-                        return int(val)
-                    except (TypeError, ValueError):
-                        return default
-                cfg = {
-                    "rounds": _to_int(data.get("rounds"), default_config.get("rounds", 10)),
-                    "max_number": _to_int(data.get("max_number"), default_config.get("max_number", 50)),
-                }
-                session['history'] = []
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['config'] = cfg
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    # Ensure numbers are persisted for addition
-                    if state and hasattr(state, "number1"):
-                        initial_state["number1"] = getattr(state, "number1", None)
-                    if state and hasattr(state, "number2"):
-                        initial_state["number2"] = getattr(state, "number2", None)
-                    session['games'][game_id] = initial_state
-                    # Only call display_round for games that implement the rounding UI expectations
-                    if game_id == 'rounding' and state is not None and hasattr(state, 'current_number'):
-                        ui.display_round(state)
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_response(msgs, {"started": True, "config": cfg})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            if action == 'restart':
-                # Reset state using existing config
-                cfg = game_state.get('config', {})
-                if handler:
-                    initial_state = handler.get_initial_state(cfg)
-                else:
-                    initial_state = {
-                        'score': 0,
-                        'current_round': 0,
-                        'active': False,
-                        'over': False,
-                        'config': cfg,
-                    }
-                initial_state['active'] = True
-                initial_state['over'] = False
-                session['history'] = []
-                session['games'][game_id] = initial_state
-                engine = create_game_engine(game_id, initial_state)
-                try:
-                    state = engine.start_round()
-                    if handler and state:
-                        handler.save_state_to_session(initial_state, state)
-                    # Persist numbers for addition
-                    if state and hasattr(state, "number1"):
-                        initial_state["number1"] = getattr(state, "number1", None)
-                    if state and hasattr(state, "number2"):
-                        initial_state["number2"] = getattr(state, "number2", None)
-                    session['games'][game_id] = initial_state
-                    # Only display_round for rounding game
-                    if game_id == 'rounding' and state is not None and hasattr(state, 'current_number'):
-                        ui.display_round(state)
-                    session.modified = True
-                    msgs = ui.get_messages(); ui.clear_messages()
-                    return build_response(msgs, {"started": True, "config": cfg})
-                except Exception as e:
-                    return jsonify({"error": str(e)}), 500
-
-            elif action == 'answer' and game_state['active']:
-                answer = str(data.get('answer', '')).strip()
-                session['last_answer'] = answer
-                if handler:
-                    handler.save_pre_answer_state(game_state)
-                is_correct, state = engine.submit_answer(answer)
-                ui.display_result(is_correct)
-                if 'history' not in session:
-                    session['history'] = []
-                if handler:
-                    history_entry = handler.create_history_entry(answer, state, is_correct)
-                else:
-                    history_entry = {
-                        'answer': answer,
-                        'is_correct': is_correct
-                    }
-                session['history'].append(history_entry)
-                game_state['score'] = engine.score
-                game_state['current_round'] = engine.current_round
-                new_state = engine.start_round()
-                if new_state is None:
-                    ui.display_game_over(state)
-                    game_state['active'] = False
-                    game_state['over'] = True
-                else:
-                    if handler:
-                        handler.save_state_to_session(game_state, new_state)
-                        handler.setup_post_answer_ui(ui, new_state)
-                session['games'][game_id] = game_state
-                msgs = ui.get_messages(); ui.clear_messages()
-                return build_response(msgs)
-
-        elif 'answer' in request.form and game_state['active']:
+        if 'answer' in request.form and game_state['active']:
             # Debug capture of raw submit payload
             try:
                 session['last_submit_payload'] = request.form.to_dict(flat=True)
@@ -895,7 +448,8 @@ def game(game_id):
                 handler.save_pre_answer_state(game_state)
             
             # Process the answer
-            is_correct, state = engine.submit_answer(answer)
+            with phase('engine'):
+                is_correct, state = engine.submit_answer(answer)
             # Fallback: if the engine says incorrect but counts/pay match the best combo exactly, treat as correct
             try:
                 lr = engine.get_last_result()
@@ -924,9 +478,6 @@ def game(game_id):
             ui.display_result(is_correct)
             
             # Add to history (game-specific)
-            if 'history' not in session:
-                session['history'] = []
-            
             if handler:
                 history_entry = handler.create_history_entry(answer, state, is_correct)
             else:
@@ -935,14 +486,16 @@ def game(game_id):
                     'answer': answer,
                     'is_correct': is_correct
                 }
-            session['history'].append(history_entry)
+            with phase('history'):
+                append_history(history_entry, handler.HISTORY_LIMIT if handler else BaseGameHandler.HISTORY_LIMIT)
             
             # Update session state
             game_state['score'] = engine.score
             game_state['current_round'] = engine.current_round
             
             # Start next round or end game
-            new_state = engine.start_round()
+            with phase('engine'):
+                new_state = engine.start_round()
             if new_state is None:
                 ui.display_game_over(state)
                 game_state['active'] = False
@@ -950,7 +503,7 @@ def game(game_id):
             else:
                 # Save game-specific state
                 if handler:
-                    handler.save_state_to_session(game_state, new_state)
+                    handler.save_round_state(game_state, new_state)
                     handler.setup_post_answer_ui(ui, new_state)
                 else:
                     # Fallback: try to save common state attributes
@@ -974,7 +527,6 @@ def game(game_id):
     # Get messages to display
     messages = ui.get_messages()
     ui.clear_messages()
-    show_debug = session.get('show_debug', False)
     
     # Fallback: if there are no messages but we have a current number in the session,
     # ensure the round info is displayed so the template has content to render.
@@ -991,39 +543,31 @@ def game(game_id):
     
     # Get game info for template
     game_info = GameRegistry.get_game_info(game_id)
+    # Templates render from the handler's precomputed view, never the session or engine
+    if handler:
+        view = handler.build_view(game_state, messages, debug_counts=bool(request.args.get('debug_counts')))
+    else:
+        config = game_state.get('config', {})
+        view = GameView(
+            game_id=game_id,
+            active=game_state['active'],
+            over=game_state['over'],
+            score=game_state.get('score', 0),
+            current_round=game_state.get('current_round', 0),
+            total_rounds=config.get('rounds', game_state.get('current_round', 0)),
+            settings={**game_class.get_default_config(), **config},
+            messages=messages,
+        )
     
     # Try to use game-specific template, fallback to generic game.html
     template_name = f'game_{game_id}.html'
     
-    try:
-        return render_template(
-            template_name,
-            messages=messages,
-            game_active=game_state['active'],
-            game_over=game_state['over'],
-            session=session,
-            show_debug=show_debug,
-            game_id=game_id,
-            game_info=game_info,
-            game_config=game_state.get('config', {}),
-            default_config=game_class.get_default_config(),
-            engine=engine
-        )
-    except TemplateNotFound:
-        # Fallback to generic template
-        return render_template(
-            'game.html',
-            messages=messages,
-            game_active=game_state['active'],
-            game_over=game_state['over'],
-            session=session,
-            show_debug=show_debug,
-            game_id=game_id,
-            game_info=game_info,
-            game_config=game_state.get('config', {}),
-            default_config=game_class.get_default_config(),
-            engine=engine
-        )
+    with phase('render'):
+        try:
+            return render_template(template_name, view=view, game_id=game_id, game_info=game_info)
+        except TemplateNotFound:
+            # Fallback to generic template
+            return render_template('game.html', view=view, game_id=game_id, game_info=game_info)
 
 
 if __name__ == '__main__':
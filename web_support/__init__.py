@@ -0,0 +1,65 @@
+"""© Cigav Productions LLC
+Web infrastructure shared by the Flask app (sessions, caching, serving)."""
+from .assets import (
+    AssetManifest,
+    item_image_url,
+    send_built_asset,
+    static_bundle_url,
+    static_image_set,
+    static_image_srcset,
+    static_image_url,
+)
+from .async_api import AsyncGameAPI, wsgi_environ
+from .compression import ShellCache, compress_response, init_compression
+from .engine_cache import EngineCache, engine_state_matches
+from .history_store import HistoryArchive, MemoryHistoryArchive, SQLiteHistoryArchive, create_history_archive
+from .metrics import MetricsRegistry, init_metrics, phase, timed
+from .session_store import (
+    AsyncSessionStore,
+    SessionStore,
+    SessionSerializer,
+    GameStateSessionSerializer,
+    MemorySessionStore,
+    SQLiteSessionStore,
+    ServerSideSession,
+    ServerSideSessionInterface,
+    create_session_store,
+)
+from .templating import FragmentCache, init_template_caching, precompile_templates
+
+__all__ = [
+    'AssetManifest',
+    'item_image_url',
+    'send_built_asset',
+    'static_bundle_url',
+    'static_image_set',
+    'static_image_srcset',
+    'static_image_url',
+    'AsyncGameAPI',
+    'wsgi_environ',
+    'ShellCache',
+    'compress_response',
+    'init_compression',
+    'EngineCache',
+    'engine_state_matches',
+    'HistoryArchive',
+    'MemoryHistoryArchive',
+    'SQLiteHistoryArchive',
+    'create_history_archive',
+    'MetricsRegistry',
+    'init_metrics',
+    'phase',
+    'timed',
+    'AsyncSessionStore',
+    'SessionStore',
+    'SessionSerializer',
+    'GameStateSessionSerializer',
+    'MemorySessionStore',
+    'SQLiteSessionStore',
+    'ServerSideSession',
+    'ServerSideSessionInterface',
+    'create_session_store',
+    'FragmentCache',
+    'init_template_caching',
+    'precompile_templates',
+]
@@ -0,0 +1,120 @@
+"""© Cigav Productions LLC
+URL helpers for cached assets served by the web app."""
+import json
+import mimetypes
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, request, send_from_directory, url_for
+from markupsafe import Markup
+from werkzeug.security import safe_join
+from math_games.item_catalog import ItemCatalog
+
+# Long-lived caching for URLs that change whenever their content does
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def item_image_url(item_id) -> str:
+    """URL for a catalog item's image; the ETag in the query keeps long-lived caches correct."""
+    if item_id is None:
+        return ''
+    image = ItemCatalog.image_svg(item_id)
+    if image is None:
+        return ''
+    return url_for('item_image', item_id=item_id, v=image[1])
+
+
+class AssetManifest:
+    """Built image variants and page bundles (from tools/build_assets.py) keyed by source path under static/."""
+
+    def __init__(self, directory: str, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.directory = directory
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, directory: str) -> "AssetManifest":
+        """Read ``manifest.json`` from a build directory; an unbuilt tree gives an empty manifest."""
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                return cls(directory, json.load(f))
+        except (OSError, ValueError):
+            return cls(directory)
+
+    def variants(self, source: str, fmt: Optional[str] = None) -> List[Tuple[str, int]]:
+        """(path under the build directory, width) pairs, narrowest first; ``fmt`` defaults to the source format."""
+        entry = self.entries.get(source)
+        if entry is None:
+            return []
+        return [tuple(v) for v in entry['variants'].get(fmt or entry['format'], [])]
+
+    def bundle(self, source: str) -> Optional[str]:
+        """Path of the minified bundle built from a static/src file, or None if unbuilt."""
+        entry = self.entries.get(source)
+        return entry.get('path') if entry else None
+
+    def pick(self, source: str, width: int, fmt: Optional[str] = None) -> Optional[str]:
+        """Narrowest variant at least ``width`` pixels wide (the widest when none is), or None if unbuilt."""
+        variants = self.variants(source, fmt)
+        for path, variant_width in variants:
+            if variant_width >= width:
+                return path
+        return variants[-1][0] if variants else None
+
+
+def _manifest() -> AssetManifest:
+    return current_app.extensions['asset_manifest']
+
+
+def _built_url(path: str) -> str:
+    return url_for('built_asset', filename=path)
+
+
+def static_bundle_url(name: str) -> str:
+    """URL of the built bundle for ``static/src/<name>``; the source itself in debug mode or when unbuilt."""
+    source = f'src/{name}'
+    path = None if current_app.debug else _manifest().bundle(source)
+    return _built_url(path) if path else url_for('static', filename=source)
+
+
+def static_image_url(source: str, width: int) -> str:
+    """URL of the smallest built variant of ``static/<source>`` covering ``width`` pixels (the original if unbuilt)."""
+    path = _manifest().pick(source, width)
+    return _built_url(path) if path else url_for('static', filename=source)
+
+
+def static_image_srcset(source: str, fmt: Optional[str] = None) -> str:
+    """``srcset`` listing every built variant of ``static/<source>`` in one format; empty if unbuilt."""
+    return ', '.join(f'{_built_url(path)} {width}w' for path, width in _manifest().variants(source, fmt))
+
+
+def static_image_set(source: str, width: int) -> Markup:
+    """CSS ``image-set()`` offering WebP and the source format at 1x and 2x of ``width`` CSS pixels.
+
+    Declare a plain ``url()`` from :func:`static_image_url` first for browsers without ``image-set``.
+    """
+    manifest = _manifest()
+    entry = manifest.entries.get(source)
+    if entry is None:
+        return Markup('url("%s")') % url_for('static', filename=source)
+    options = []
+    for fmt in ('webp', entry['format']):
+        for density in (1, 2):
+            path = manifest.pick(source, width * density, fmt)
+            options.append(Markup('url("%s") type("image/%s") %dx') % (_built_url(path), fmt, density))
+    return Markup('image-set(%s)') % Markup(', ').join(options)
+
+
+def send_built_asset(filename: str):
+    """Serve a content-hashed build output with immutable caching, gzip-precompressed when available."""
+    directory = _manifest().directory
+    compressed = filename + '.gz'
+    compressed_path = safe_join(directory, compressed)
+    use_gzip = 'gzip' in request.accept_encodings and compressed_path is not None and os.path.isfile(compressed_path)
+    response = send_from_directory(directory, compressed if use_gzip else filename, max_age=IMMUTABLE_MAX_AGE)
+    if use_gzip:
+        response.content_encoding = 'gzip'
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,172 @@
+"""© Cigav Productions LLC
+ASGI front for the Flask app's JSON game API, for nodes holding many idle connections."""
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_cookie
+
+from .session_store import AsyncSessionStore, ServerSideSession
+
+# Endpoints served for any request, and endpoints served only for JSON posts (AJAX actions from game pages)
+API_ENDPOINTS = frozenset({'api_game_state', 'api_game_action', 'api_game_history'})
+JSON_POST_ENDPOINTS = frozenset({'game'})
+
+Response = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its request body was read."""
+
+
+def wsgi_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """WSGI environ for an ASGI HTTP scope and its full request body."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _json_error(message: str, status: int) -> Response:
+    body = ('{"error": "%s"}' % message).encode('utf-8')
+    return status, [('Content-Type', 'application/json')], body
+
+
+class AsyncGameAPI:
+    """ASGI application serving the game API endpoints of a Flask app.
+
+    Connections, request bodies and session loads and saves are handled on the event
+    loop, so an idle player costs a coroutine rather than a thread. Each request is then
+    dispatched through the Flask app (same routes, handlers, engine cache and hooks) on a
+    bounded thread pool, with session store writes deferred back to the loop. Blocking
+    session stores are called on a separate I/O pool so slow disks do not hold compute
+    threads. Paths outside the API are answered with 404.
+    """
+
+    def __init__(self, flask_app: Flask, workers: Optional[int] = None, io_workers: int = 8,
+                 max_body: int = 64 * 1024, endpoints: FrozenSet[str] = API_ENDPOINTS,
+                 json_post_endpoints: FrozenSet[str] = JSON_POST_ENDPOINTS):
+        self.flask_app = flask_app
+        self.max_body = max_body
+        self.endpoints = endpoints
+        self.json_post_endpoints = json_post_endpoints
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4),
+                                           thread_name_prefix='game-api')
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='game-api-io')
+        self.sessions = AsyncSessionStore(flask_app.session_interface.store, self.io_executor)
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            try:
+                status, headers, body = await self._handle(scope, receive)
+            except ClientDisconnected:
+                return
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+            })
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                self.io_executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """The full request body, or None when it is larger than ``max_body``."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    def _accepts(self, environ: Dict[str, Any]) -> bool:
+        adapter = self.flask_app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return False
+        if endpoint in self.endpoints:
+            return True
+        return (endpoint in self.json_post_endpoints and environ['REQUEST_METHOD'] == 'POST'
+                and environ.get('CONTENT_TYPE', '').split(';')[0].strip() == 'application/json')
+
+    async def _handle(self, scope: Dict[str, Any], receive) -> Response:
+        body = await self._read_body(receive)
+        if body is None:
+            return _json_error('Request body too large', 413)
+        environ = wsgi_environ(scope, body)
+        if not self._accepts(environ):
+            return _json_error('Not found', 404)
+        interface = self.flask_app.session_interface
+        cookie = parse_cookie(environ.get('HTTP_COOKIE', '')).get(interface.get_cookie_name(self.flask_app))
+        sid = interface.sid_from_cookie(self.flask_app, cookie)
+        data = await self.sessions.load(sid) if sid is not None else None
+        session = interface.restore_session(sid, data, defer_writes=True)
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self.executor, self._dispatch, environ, session)
+        await self.sessions.flush(session)
+        return response
+
+    def _dispatch(self, environ: Dict[str, Any], session: ServerSideSession) -> Response:
+        """Run one request through the Flask app with an already loaded session (executor thread)."""
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        ctx.session = session
+        error: Optional[BaseException] = None
+        ctx.push()
+        try:
+            try:
+                response = app.full_dispatch_request()
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            return response.status_code, response.headers.to_wsgi_list(), response.get_data()
+        finally:
+            ctx.pop(error)
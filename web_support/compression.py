@@ -0,0 +1,121 @@
+"""© Cigav Productions LLC
+Negotiated gzip/brotli response compression, reusing precompressed page shells."""
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import Flask, Response, request
+
+from .metrics import phase
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used for every client instead
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset({
+    'text/html', 'text/css', 'text/plain', 'application/json', 'application/javascript', 'image/svg+xml',
+})
+# Rendered pages are split after this tag; everything before it is the shell
+SHELL_END = b'</head>'
+# Brotli quality for per-request compression (higher levels cost far more CPU)
+BROTLI_QUALITY = 5
+
+
+class ShellCache:
+    """gzip compressors primed with page shells, so only the rest of each page is compressed per request.
+
+    A page's shell is its markup up to and including ``</head>`` (doctype, stylesheet and
+    script links, inline styles), which is identical for every render of a page. The first
+    time a shell is seen it is compressed and the compressor state kept; later responses with
+    the same shell copy that state and feed it only the remainder, producing one ordinary
+    gzip stream. Copying a compressor costs roughly as much as compressing a few KB, so
+    shells shorter than ``min_shell`` bytes are not worth caching.
+    """
+
+    def __init__(self, level: int = 6, max_entries: int = 64, min_shell: int = 3072):
+        self.level = level
+        self.max_entries = max_entries
+        self.min_shell = min_shell
+        self._entries: "OrderedDict[bytes, Tuple[bytes, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _primed(self, shell: bytes) -> Tuple[bytes, object]:
+        with self._lock:
+            entry = self._entries.get(shell)
+            if entry is not None:
+                self._entries.move_to_end(shell)
+                return entry
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        # A sync flush emits every byte of the shell, so later output only depends on the remainder
+        entry = (compressor.compress(shell) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor)
+        with self._lock:
+            self._entries[shell] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def compress(self, body: bytes) -> Optional[bytes]:
+        """gzip ``body`` reusing its shell's compressor, or None when it has no shell worth caching."""
+        end = body.find(SHELL_END)
+        if end < 0 or end + len(SHELL_END) < self.min_shell:
+            return None
+        split = end + len(SHELL_END)
+        head, primed = self._primed(body[:split])
+        compressor = primed.copy()
+        return head + compressor.compress(body[split:]) + compressor.flush()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def choose_encoding(accept_encodings, html: bool) -> Optional[str]:
+    """'br', 'gzip' or None for a request's Accept-Encoding; pages prefer gzip to reuse their shells."""
+    gzip_ok = accept_encodings['gzip'] > 0
+    if brotli is not None and accept_encodings['br'] > 0 and not (html and gzip_ok):
+        return 'br'
+    return 'gzip' if gzip_ok else None
+
+
+def compress_response(response: Response, min_size: int, level: int, shells: Optional[ShellCache]) -> Response:
+    """Compress an eligible response in place for the current request's Accept-Encoding."""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    html = response.mimetype == 'text/html'
+    encoding = choose_encoding(request.accept_encodings, html)
+    if encoding is None:
+        return response
+    with phase('compress'):
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            compressed = shells.compress(body) if html and shells is not None else None
+            if compressed is None:
+                compressed = zlib.compress(body, level, wbits=31)
+    response.set_data(compressed)
+    response.content_encoding = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ from the identity representation
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app: Flask, min_size: int = 500, level: int = 6, shell_cache: bool = True) -> Optional[ShellCache]:
+    """Compress the app's text responses of at least ``min_size`` bytes (brotli when installed, else gzip at ``level``)."""
+    shells = ShellCache(level) if shell_cache else None
+    app.extensions['compression_shells'] = shells
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, min_size, level, shells)
+
+    return shells
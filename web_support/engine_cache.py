@@ -0,0 +1,76 @@
+"""© Cigav Productions LLC
+In-process cache of live game engines, so warm requests skip rebuilding them from session state."""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class EngineCache:
+    """LRU of engines keyed by (session ID, game ID), each valid for one state revision.
+
+    An engine is checked in together with the revision token written into the session's
+    game state, and checking it out removes it, so concurrent requests never share an
+    engine and a request that fails before checking it back in leaves nothing stale.
+    A token that no longer matches the session (the state was replaced, saved by another
+    process, or restored after a worker restart) is a miss and the caller rebuilds.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 1800.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def new_revision() -> str:
+        """Token identifying one saved state; random so other processes never reuse it."""
+        return secrets.token_hex(8)
+
+    def checkout(self, key: Hashable, revision: Optional[str]) -> Optional[Any]:
+        """Remove and return the engine cached for ``key`` if it matches ``revision``."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or revision is None or entry[1] != revision or entry[0] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[2]
+
+    def checkin(self, key: Hashable, revision: str, engine: Any) -> None:
+        """Cache ``engine`` as the live engine for ``key`` at ``revision``."""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, revision, engine)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Current size and hit/miss counters."""
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def engine_state_matches(engine: Any, game_state: Dict[str, Any]) -> bool:
+    """Whether every key the engine serializes that the session state also holds has the same value."""
+    try:
+        snapshot = engine.serialize_state()
+    except Exception:
+        return False
+    for key, value in snapshot.items():
+        if key in game_state and game_state[key] != value:
+            return False
+    return True
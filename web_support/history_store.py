@@ -0,0 +1,119 @@
+"""© Cigav Productions LLC
+Append-only server-side archive for round history entries evicted from the session."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+
+class HistoryArchive(ABC):
+    """Backend that appends history entries under a key and pages through them in order."""
+
+    @abstractmethod
+    def append(self, key: str, entries: List[Dict[str, Any]]) -> None:
+        """Append JSON-compatible entries to the key's log."""
+        pass
+
+    @abstractmethod
+    def page(self, key: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return ``limit`` entries starting at ``offset`` (oldest first) and the key's total count."""
+        pass
+
+
+class MemoryHistoryArchive(HistoryArchive):
+    """In-process archive keeping the most recently written keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._logs: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, key: str, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._logs.setdefault(key, []).extend(entries)
+            self._logs.move_to_end(key)
+            while len(self._logs) > self.max_keys:
+                self._logs.popitem(last=False)
+
+    def page(self, key: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            log = self._logs.get(key, [])
+            return log[offset:offset + limit], len(log)
+
+
+class SQLiteHistoryArchive(HistoryArchive):
+    """File-backed archive shared by every process that opens the same database."""
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, cleanup_interval: float = 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._local = threading.local()
+        if hasattr(os, "register_at_fork"):
+            # SQLite connections must not be used across fork(); pre-forked workers open their own
+            os.register_at_fork(after_in_child=self._forget_connections)
+        self._last_cleanup = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "key TEXT NOT NULL, seq INTEGER NOT NULL, entry TEXT NOT NULL, created REAL NOT NULL, "
+                "PRIMARY KEY (key, seq))"
+            )
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, key: str, entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (start,) = conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM history WHERE key = ?", (key,)).fetchone()
+            conn.executemany(
+                "INSERT INTO history (key, seq, entry, created) VALUES (?, ?, ?, ?)",
+                [(key, start + i, json.dumps(entry, separators=(",", ":")), now) for i, entry in enumerate(entries)],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if now - self._last_cleanup > self.cleanup_interval:
+            self._last_cleanup = now
+            conn.execute("DELETE FROM history WHERE created < ?", (now - self.ttl,))
+
+    def page(self, key: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        # Positional, not by seq: expired rows leave gaps at the start of a key's log
+        conn = self._connect()
+        (total,) = conn.execute("SELECT COUNT(*) FROM history WHERE key = ?", (key,)).fetchone()
+        rows = conn.execute(
+            "SELECT entry FROM history WHERE key = ? ORDER BY seq LIMIT ? OFFSET ?",
+            (key, limit, offset),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows], total
+
+
+def create_history_archive(config: Dict[str, Any]) -> HistoryArchive:
+    """Build the archive selected by ``HISTORY_BACKEND`` ('memory' or 'sqlite'), defaulting to the session backend."""
+    backend = str(config.get("HISTORY_BACKEND") or config.get("SESSION_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemoryHistoryArchive()
+    if backend == "sqlite":
+        return SQLiteHistoryArchive(config.get("HISTORY_SQLITE_PATH", os.path.join("instance", "history.sqlite3")))
+    raise ValueError(f"Unknown history backend: {backend}")
@@ -0,0 +1,194 @@
+"""© Cigav Productions LLC
+Opt-in per-request phase timings, exposed as Server-Timing headers and Prometheus metrics."""
+import bisect
+import functools
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, g, has_request_context, request, session
+from flask.sessions import SessionInterface
+
+# Histogram bucket upper bounds in seconds
+BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class RequestTimer:
+    """Accumulates the time spent in each named phase of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.recorded = False
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+class _Phase:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer: RequestTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.timer.add(self.name, time.perf_counter() - self.start)
+
+
+_NO_PHASE = nullcontext()
+# Set by init_metrics; until then phase() costs a single global lookup
+_enabled = False
+
+
+def phase(name: str):
+    """Context manager timing the enclosed block as ``name`` when the current request is instrumented."""
+    if not _enabled or not has_request_context():
+        return _NO_PHASE
+    timer = g.get('_request_timer')
+    if timer is None:
+        return _NO_PHASE
+    return _Phase(timer, name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of :func:`phase`."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsRegistry:
+    """Thread-safe phase-duration histograms and request counters."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (endpoint, game, phase) -> [bucket counts..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, str, str], List[float]] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+
+    def observe(self, endpoint: str, game: str, name: str, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            hist = self._histograms.get((endpoint, game, name))
+            if hist is None:
+                hist = self._histograms[(endpoint, game, name)] = [0] * (len(self.buckets) + 1) + [0.0]
+            hist[index] += 1
+            hist[-1] += seconds
+
+    def count_request(self, endpoint: str, game: str, status: int) -> None:
+        key = (endpoint, game, str(status))
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = [
+            '# HELP math_game_request_phase_seconds Time spent in each phase of a request.',
+            '# TYPE math_game_request_phase_seconds histogram',
+        ]
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            requests = dict(self._requests)
+        for (endpoint, game, name), hist in sorted(histograms.items()):
+            labels = f'endpoint="{endpoint}",game="{game}",phase="{name}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, hist):
+                cumulative += count
+                lines.append(f'math_game_request_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += hist[len(self.buckets)]
+            lines.append(f'math_game_request_phase_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'math_game_request_phase_seconds_sum{{{labels}}} {hist[-1]:.6f}')
+            lines.append(f'math_game_request_phase_seconds_count{{{labels}}} {cumulative}')
+        lines.append('# HELP math_game_requests_total Requests served, by endpoint, game and status.')
+        lines.append('# TYPE math_game_requests_total counter')
+        for (endpoint, game, status), count in sorted(requests.items()):
+            lines.append(f'math_game_requests_total{{endpoint="{endpoint}",game="{game}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedSessionInterface(SessionInterface):
+    """Wraps a session interface to time session decode and encode, then records the request."""
+
+    def __init__(self, inner: SessionInterface, registry: MetricsRegistry, game_label: Callable[[], str]):
+        self.inner = inner
+        self.registry = registry
+        self.game_label = game_label
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def open_session(self, app, request):
+        # Sessions open before any before_request hook, so this is where the request timer starts
+        g._request_timer = RequestTimer()
+        with phase('session_decode'):
+            return self.inner.open_session(app, request)
+
+    def make_null_session(self, app):
+        return self.inner.make_null_session(app)
+
+    def is_null_session(self, obj) -> bool:
+        return self.inner.is_null_session(obj)
+
+    def save_session(self, app, session, response) -> None:
+        with phase('session_encode'):
+            self.inner.save_session(app, session, response)
+        finish_request(self.registry, response, self.game_label())
+
+
+def finish_request(registry: MetricsRegistry, response: Response, game: str) -> None:
+    """Record the request's phases once and attach its Server-Timing header."""
+    timer: Optional[RequestTimer] = g.get('_request_timer')
+    if timer is None or timer.recorded:
+        return
+    timer.recorded = True
+    response.headers['Server-Timing'] = timer.server_timing()
+    endpoint = request.endpoint or 'unmatched'
+    for name, seconds in timer.phases.items():
+        registry.observe(endpoint, game, name, seconds)
+    registry.observe(endpoint, game, 'total', time.perf_counter() - timer.start)
+    registry.count_request(endpoint, game, response.status_code)
+
+
+def init_metrics(app: Flask, game_label: Callable[[], str] = lambda: '') -> MetricsRegistry:
+    """Instrument every request of the app and serve the collected metrics at /metrics."""
+    global _enabled
+    _enabled = True
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+    app.session_interface = InstrumentedSessionInterface(app.session_interface, registry, game_label)
+
+    @app.before_request
+    def _skip_metrics_scrape():
+        if request.endpoint == 'metrics':
+            g.pop('_request_timer', None)
+
+    @app.after_request
+    def _finish_without_session(response):
+        # Requests normally finish in save_session, which runs after this hook;
+        # null sessions are never saved, so record those requests here
+        if app.session_interface.is_null_session(session._get_current_object()):
+            finish_request(registry, response, game_label())
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Collected request metrics in Prometheus text format."""
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return registry
@@ -0,0 +1,354 @@
+"""© Cigav Productions LLC
+Server-side session storage; the cookie only carries a signed, opaque session ID."""
+import asyncio
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+
+class SessionStore(ABC):
+    """Backend that persists session dictionaries by session ID."""
+
+    # Whether calls can wait on I/O (async callers run them in an executor)
+    blocking = True
+
+    @abstractmethod
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        """Return the stored session data, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def save(self, sid: str, data: Dict[str, Any], ttl: float) -> None:
+        """Store session data for ``ttl`` seconds."""
+        pass
+
+    @abstractmethod
+    def delete(self, sid: str) -> None:
+        """Remove a session."""
+        pass
+
+
+class SessionSerializer:
+    """Turns session dictionaries into blobs for stores that persist them (pickle)."""
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, blob: bytes) -> Dict[str, Any]:
+        return pickle.loads(blob)
+
+
+class GameStateSessionSerializer(SessionSerializer):
+    """Pickle serializer that packs each ``session['games']`` entry with a compact state codec.
+
+    ``encode(game_id, state)`` returns bytes and ``decode(blob)`` returns ``(game_id, state)``;
+    states the codec cannot encode are pickled as they are.
+    """
+
+    def __init__(self, encode: Callable[[str, Dict[str, Any]], bytes], decode: Callable[[bytes], Tuple[str, Dict[str, Any]]]):
+        self.encode = encode
+        self.decode = decode
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        games = data.get("games")
+        if games:
+            packed = {}
+            for game_id, state in games.items():
+                try:
+                    packed[game_id] = self.encode(game_id, state)
+                except (KeyError, TypeError, ValueError):
+                    packed[game_id] = state
+            data = dict(data, games=packed)
+        return super().dumps(data)
+
+    def loads(self, blob: bytes) -> Dict[str, Any]:
+        data = super().loads(blob)
+        games = data.get("games")
+        if games:
+            data["games"] = {
+                game_id: self.decode(state)[1] if isinstance(state, bytes) else state
+                for game_id, state in games.items()
+            }
+        return data
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store; sessions are kept by reference without serialization."""
+
+    blocking = False
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return data
+
+    def save(self, sid: str, data: Dict[str, Any], ttl: float) -> None:
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, data)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteSessionStore(SessionStore):
+    """File-backed store shared by every process that opens the same database."""
+
+    def __init__(self, path: str, cleanup_interval: float = 300.0, serializer: Optional[SessionSerializer] = None):
+        self.path = path
+        self.cleanup_interval = cleanup_interval
+        self.serializer = serializer or SessionSerializer()
+        self._local = threading.local()
+        if hasattr(os, "register_at_fork"):
+            # SQLite connections must not be used across fork(); pre-forked workers open their own
+            os.register_at_fork(after_in_child=self._forget_connections)
+        self._last_cleanup = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "sid TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT data, expires FROM sessions WHERE sid = ?", (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        blob, expires = row
+        if expires < time.time():
+            self.delete(sid)
+            return None
+        try:
+            return self.serializer.loads(blob)
+        except Exception:
+            return None
+
+    def save(self, sid: str, data: Dict[str, Any], ttl: float) -> None:
+        now = time.time()
+        blob = self.serializer.dumps(data)
+        conn = self._connect()
+        row = conn.execute("SELECT data, expires FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        # Read-only requests save the session unchanged; skip the disk write until its expiry needs extending
+        if row is None or row[0] != blob or row[1] - now < ttl / 2:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)",
+                (sid, blob, now + ttl),
+            )
+        if now - self._last_cleanup > self.cleanup_interval:
+            self._last_cleanup = now
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, sid: str) -> None:
+        self._connect().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dictionary tracked by ID instead of being shipped in the cookie."""
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, sid: str = "", new: bool = False,
+                 defer_writes: bool = False):
+        def on_update(self) -> None:
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        # Deferred sessions leave the store write to the caller: (data, ttl), or (None, 0) to delete
+        self.defer_writes = defer_writes
+        self.pending_write: Optional[Tuple[Optional[Dict[str, Any]], float]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface backed by a :class:`SessionStore`.
+
+    Nested values (e.g. ``session['games'][game_id]``) are mutated in place all
+    over the app, so any accessed session is written back at the end of the
+    request rather than relying on ``session.modified``.
+    """
+
+    salt = "server-session"
+    session_class = ServerSideSession
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    def _signer(self, app) -> Optional[Signer]:
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt=self.salt)
+
+    def _new_session(self, defer_writes: bool = False) -> ServerSideSession:
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True, defer_writes=defer_writes)
+
+    def sid_from_cookie(self, app, cookie: Optional[str]) -> Optional[str]:
+        """Session ID carried by a session cookie value, or None if it is missing or forged."""
+        signer = self._signer(app)
+        if signer is None or not cookie:
+            return None
+        try:
+            return signer.unsign(cookie).decode("utf-8")
+        except BadSignature:
+            return None
+
+    def restore_session(self, sid: Optional[str], data: Optional[Dict[str, Any]],
+                        defer_writes: bool = False) -> ServerSideSession:
+        """Session object for a cookie's ID and the data loaded for it (a fresh session without an ID)."""
+        if sid is None:
+            return self._new_session(defer_writes)
+        if data is None:
+            return self.session_class(sid=sid, new=True, defer_writes=defer_writes)
+        return self.session_class(data, sid=sid, defer_writes=defer_writes)
+
+    def open_session(self, app, request) -> Optional[ServerSideSession]:
+        if self._signer(app) is None:
+            return None
+        sid = self.sid_from_cookie(app, request.cookies.get(self.get_cookie_name(app)))
+        return self.restore_session(sid, self.store.load(sid) if sid is not None else None)
+
+    def _write(self, session: ServerSideSession, data: Optional[Dict[str, Any]], ttl: float = 0.0) -> None:
+        if session.defer_writes:
+            session.pending_write = (data, ttl)
+        elif data is None:
+            self.store.delete(session.sid)
+        else:
+            self.store.save(session.sid, data, ttl)
+
+    def save_session(self, app, session: ServerSideSession, response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified:
+                self._write(session, None)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+            return
+
+        if session.accessed or session.modified or session.new:
+            ttl = app.permanent_session_lifetime.total_seconds()
+            self._write(session, dict(session), ttl)
+
+        refresh = session.permanent and app.config["SESSION_REFRESH_EACH_REQUEST"]
+        if session.new or refresh:
+            value = self._signer(app).sign(session.sid.encode("utf-8")).decode("utf-8")
+            response.set_cookie(
+                name,
+                value,
+                expires=self.get_expiration_time(app, session),
+                httponly=httponly,
+                domain=domain,
+                path=path,
+                secure=secure,
+                samesite=samesite,
+            )
+            response.vary.add("Cookie")
+
+
+class AsyncSessionStore:
+    """Awaitable front for a :class:`SessionStore`; blocking stores run in an executor."""
+
+    def __init__(self, store: SessionStore, executor: Optional[Any] = None):
+        self.store = store
+        self.executor = executor
+
+    async def _call(self, func: Callable, *args: Any) -> Any:
+        if not self.store.blocking:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        return await self._call(self.store.load, sid)
+
+    async def save(self, sid: str, data: Dict[str, Any], ttl: float) -> None:
+        await self._call(self.store.save, sid, data, ttl)
+
+    async def delete(self, sid: str) -> None:
+        await self._call(self.store.delete, sid)
+
+    async def flush(self, session: ServerSideSession) -> None:
+        """Apply the write a deferred session recorded when it was saved, if any."""
+        if session.pending_write is None:
+            return
+        data, ttl = session.pending_write
+        session.pending_write = None
+        if data is None:
+            await self.delete(session.sid)
+        else:
+            await self.save(session.sid, data, ttl)
+
+
+def create_session_store(config: Dict[str, Any], serializer: Optional[SessionSerializer] = None) -> SessionStore:
+    """Build the session store selected by ``SESSION_BACKEND`` ('memory' or 'sqlite')."""
+    backend = str(config.get("SESSION_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemorySessionStore(max_sessions=int(config.get("SESSION_MAX_ENTRIES", 10000)))
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            config.get("SESSION_SQLITE_PATH", os.path.join("instance", "sessions.sqlite3")), serializer=serializer
+        )
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,128 @@
+"""© Cigav Productions LLC
+Template caching: persistent compiled-template bytecode and cached page fragments."""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from flask import Flask, current_app, request
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """LRU of rendered template fragments keyed by (fragment name, game ID, config).
+
+    Fragments must depend only on their key: a game's page shell and its config form
+    render the same markup for every player with the same settings. Entries stay until
+    evicted or dropped with :meth:`invalidate`.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Markup]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str, game_id: str, config: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+        """Cache key for a fragment; configs with the same settings share an entry."""
+        return name, game_id, json.dumps(config or {}, sort_keys=True, default=str)
+
+    def get(self, key: Hashable) -> Optional[Markup]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def set(self, key: Hashable, fragment: Markup) -> None:
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, game_id: Optional[str] = None) -> int:
+        """Drop every cached fragment of ``game_id`` (all games when None); return how many were dropped."""
+        with self._lock:
+            if game_id is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            stale = [key for key in self._entries if key[1] == game_id]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        """Current size and hit/miss counters."""
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache name, game_id[, config] %}...{% endcache %}``: render a block once per key.
+
+    The block is rendered normally when the app has no fragment cache or is in debug mode
+    (templates may change under it there).
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cached', args), [], [], body).set_lineno(lineno)
+
+    def _cached(self, name: str, game_id: str, config: Optional[Dict[str, Any]] = None, *, caller) -> Markup:
+        cache = current_app.extensions.get('fragment_cache')
+        if cache is None or current_app.debug:
+            return caller()
+        # URLs inside fragments include the mount point
+        key = cache.key(name, game_id, config) + (request.script_root,)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = Markup(caller())
+            cache.set(key, fragment)
+        return fragment
+
+
+def init_template_caching(app: Flask, bytecode_dir: Optional[str], fragment_entries: int = 512) -> Optional[FragmentCache]:
+    """Enable the ``{% cache %}`` tag, caching compiled templates under ``bytecode_dir`` (skipped when empty).
+
+    ``fragment_entries=0`` renders every fragment per request.
+    """
+    env = app.jinja_env
+    # Templates always need the tag to parse; the cache itself is optional
+    env.add_extension(FragmentCacheExtension)
+    if bytecode_dir:
+        try:
+            os.makedirs(bytecode_dir, exist_ok=True)
+        except OSError:
+            bytecode_dir = None
+        if bytecode_dir:
+            env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+    cache = FragmentCache(fragment_entries) if fragment_entries > 0 else None
+    app.extensions['fragment_cache'] = cache
+    return cache
+
+
+def precompile_templates(app: Flask) -> int:
+    """Compile every template (filling the bytecode cache) so forked workers share them; return the count."""
+    env = app.jinja_env
+    names = [name for name in env.list_templates() if name.endswith('.html')]
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -0,0 +1,55 @@
+"""© Cigav Productions LLC
+Production WSGI entry point.
+
+Install requirements-prod.txt, set MATH_GAME_SECRET_KEY, and run
+``gunicorn -c gunicorn.conf.py wsgi:app`` (or ``python wsgi.py``, which starts gunicorn with
+the same settings). The config preloads this module in the master process, so the game
+engines, handlers, item catalog, greedy lookup tables and compiled templates are imported and
+built once and shared copy-on-write by every forked worker."""
+import os
+import sys
+
+# Session IDs are signed with this key; web_app's development fallback is public
+if not os.environ.get('MATH_GAME_SECRET_KEY'):
+    raise RuntimeError("Set MATH_GAME_SECRET_KEY to a private random value before serving with wsgi.py")
+# Every worker process must read and write the same session store
+os.environ.setdefault('MATH_GAME_SESSION_BACKEND', 'sqlite')
+
+import math_games
+import game_handlers
+from math_games.change_game import CHANGE_DENOMS, PAY_DENOMS
+from math_games.greedy_table import GreedyTable
+from math_games.money_game import BILL_DENOMS
+from web_app import app
+from web_support import precompile_templates
+
+# Greedy breakdowns up to these amounts cover the default price ranges (money in dollars, change in cents)
+WARM_TABLES = ((BILL_DENOMS, 200), (CHANGE_DENOMS, 20000), (PAY_DENOMS, 20000))
+
+
+def warm_up() -> None:
+    """Build the lazily created shared tables and compile the templates before workers fork."""
+    for denoms, amount in WARM_TABLES:
+        GreedyTable.for_denoms(denoms).breakdown(amount)
+    precompile_templates(app)
+
+
+warm_up()
+
+
+def main(argv=None) -> int:
+    """Start gunicorn with gunicorn.conf.py, which must be installed (pip install -r requirements-prod.txt)."""
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        print("gunicorn is not installed (pip install -r requirements-prod.txt); run web_app.py for the "
+              "development server", file=sys.stderr)
+        return 1
+    config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    sys.argv = ['gunicorn', '-c', config, *(argv if argv is not None else sys.argv[1:]), 'wsgi:app']
+    run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())